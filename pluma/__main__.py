@@ -1,6 +1,7 @@
 import argparse
 import traceback
 import os
+from datetime import datetime
 from typing import Any, Callable, Optional
 
 from pluma.core.baseclasses import Logger, LogMode, LogLevel
@@ -10,13 +11,19 @@ from pluma.cli.plugins import load_plugin_modules
 
 log = Logger()
 
+# Date and time formats accepted by "--start" and "--end", as local time
+TIME_ARG_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M',
+                    '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M',
+                    '%Y-%m-%d']
+
 RUN_COMMAND = 'run'
 CHECK_COMMAND = 'check'
 TESTS_COMMAND = 'tests'
 CLEAN_COMMAND = 'clean'
 VERSION_COMMAND = 'version'
+LOG_COMMAND = 'log'
 COMMANDS = [RUN_COMMAND, CHECK_COMMAND,
-            TESTS_COMMAND, CLEAN_COMMAND, VERSION_COMMAND]
+            TESTS_COMMAND, CLEAN_COMMAND, VERSION_COMMAND, LOG_COMMAND]
 
 
 def arg_is_x(arg: Any, predicate: Callable, err_msg: Optional[str] = None):
@@ -34,6 +41,22 @@ def arg_is_dir(path, info=None):
     return arg_is_x(path, os.path.isdir, f'{f"{info} " or ""}directory does not exist: {path}')
 
 
+def arg_is_time(arg: str) -> float:
+    '''Parse a local date and time (e.g. "2021-03-04 05:06:07"), or a Unix timestamp'''
+    try:
+        return float(arg)
+    except ValueError:
+        pass
+
+    for time_format in TIME_ARG_FORMATS:
+        try:
+            return datetime.strptime(arg, time_format).timestamp()
+        except ValueError:
+            pass
+
+    raise argparse.ArgumentTypeError(f'invalid date and time: {arg}')
+
+
 def parse_arguments():
     parser = argparse.ArgumentParser(
         description='A lightweight automated testing tool for embedded devices.')
@@ -41,7 +64,8 @@ def parse_arguments():
                         help=f'command for pluma, defaults to "{RUN_COMMAND}". "{RUN_COMMAND}": Run the tests suite, '
                         f'"{CHECK_COMMAND}": validate configuration files and tests, '
                         f'"{TESTS_COMMAND}": list all tests available and selected, '
-                        f'"{CLEAN_COMMAND}": remove logs, toolchains, and built executables')
+                        f'"{CLEAN_COMMAND}": remove logs, toolchains, and built executables, '
+                        f'"{LOG_COMMAND}": extract a time window from a raw console log')
     parser.add_argument(
         '-v', '--verbose', action='store_const', const=True,
         help='prints more information related to tests and progress')
@@ -69,6 +93,20 @@ def parse_arguments():
     parser.add_argument(
         '--debug', action='store_const', const=True,
         help='enable debug information')
+    parser.add_argument(
+        '--raw-log',
+        type=lambda arg: arg_is_file(arg, 'Raw log'),
+        help=f'"{LOG_COMMAND}" command: raw console log file to read')
+    parser.add_argument(
+        '--start', type=arg_is_time,
+        help=f'"{LOG_COMMAND}" command: start of the time window, as a local date and time '
+        '(e.g. "2021-03-04 05:06:07") or a Unix timestamp. Default: start of the log')
+    parser.add_argument(
+        '--end', type=arg_is_time,
+        help=f'"{LOG_COMMAND}" command: end of the time window. Default: end of the log')
+    parser.add_argument(
+        '-o', '--output',
+        help=f'"{LOG_COMMAND}" command: file to write the data extracted to. Default: stdout')
 
     args = parser.parse_args()
     return args
@@ -112,6 +150,13 @@ def main():
             Pluma.execute_clean(args.force)
         elif command == VERSION_COMMAND:
             log.log(Pluma.version(), level=LogLevel.IMPORTANT)
+        elif command == LOG_COMMAND:
+            if not args.raw_log:
+                log.error(f'"{LOG_COMMAND}" command requires a raw log file (--raw-log)')
+                exit(-1)
+
+            Pluma.execute_log(args.raw_log, start=args.start, end=args.end,
+                              output_path=args.output)
     except TestsConfigError as e:
         log.error(
             [f'Error while parsing the tests configuration ({tests_config_path}):', str(e)])
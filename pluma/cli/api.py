@@ -3,8 +3,9 @@ import sys
 import time
 import os
 import json
+from typing import Optional
 
-from pluma.core.baseclasses import Logger, LogLevel
+from pluma.core.baseclasses import Logger, LogLevel, read_log_window
 from pluma.core.builder import TestsBuildError,  YoctoCBuilder
 from pluma.test import TestController
 from pluma.cli import PlumaContext, PlumaConfig, TestsConfig, TargetConfig
@@ -35,7 +36,8 @@ class Pluma:
         tests_config = Pluma.create_tests_config(tests_config_path, context)
         results_config = Pluma.create_results_config(tests_config)
 
-        controller = Pluma.build_test_controller(tests_config, context, show_tests_list=check_only)
+        controller = Pluma.build_test_controller(tests_config, context, show_tests_list=check_only,
+                                                 results_config=results_config)
         if check_only:
             log.log('Configuration and tests successfully validated.',
                     level=LogLevel.IMPORTANT)
@@ -80,6 +82,18 @@ class Pluma:
 
         YoctoCBuilder.clean(force)
 
+    @staticmethod
+    def execute_log(raw_log_path: str, start: Optional[float] = None,
+                    end: Optional[float] = None, output_path: Optional[str] = None):
+        '''Execute the "log" command, extracting a time window from a raw console log'''
+        data = read_log_window(raw_log_path, start=start, end=end)
+        if output_path:
+            with open(output_path, 'wb') as output:
+                output.write(data)
+        else:
+            sys.stdout.buffer.write(data)
+            sys.stdout.flush()
+
     @staticmethod
     def create_target_context(target_config_path: str) -> PlumaContext:
         env_vars = dict(os.environ)
@@ -112,12 +126,13 @@ class Pluma:
 
     @staticmethod
     def build_test_controller(tests_config: TestsConfig, target_context: PlumaContext,
-                              show_tests_list: bool) -> TestController:
+                              show_tests_list: bool,
+                              results_config: Optional[ResultsConfig] = None) -> TestController:
 
         tests_list_log_level = LogLevel.INFO if show_tests_list else LogLevel.NOTICE
         tests_config.print_tests(log_level=tests_list_log_level)
 
-        return tests_config.create_test_controller(target_context.board)
+        return tests_config.create_test_controller(target_context.board, results_config)
 
     @staticmethod
     def version() -> str:
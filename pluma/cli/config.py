@@ -67,6 +67,10 @@ class Configuration:
                 if datatype is int and isinstance(value, str):
                     value = int(value)
                     converted = True
+                elif datatype is float and isinstance(value, (int, str)) \
+                        and not isinstance(value, bool):
+                    value = float(value)
+                    converted = True
                 elif datatype is Configuration and isinstance(value, dict):
                     value = Configuration(value)
                     converted = True
@@ -1,11 +1,24 @@
+import time
+import weakref
 from abc import abstractmethod
+from typing import Optional
 
 from pluma import Board
 from pluma.test import TestBase
 
 
 class DeviceActionBase(TestBase):
+    # Start time of the last action run on each board
+    _last_started: 'weakref.WeakKeyDictionary[Board, float]' = weakref.WeakKeyDictionary()
+
+    # Start time of the action run before this one on the board, if any
+    previous_action_start: Optional[float] = None
+
     def test_body(self):
+        if self.board is not None:
+            self.previous_action_start = DeviceActionBase._last_started.get(self.board)
+            DeviceActionBase._last_started[self.board] = time.time()
+
         self.execute()
 
     @abstractmethod
@@ -2,11 +2,11 @@ import os
 import sys
 import time
 
-from typing import List, Union
+from typing import List, Optional, Union
 
-from pluma.core.baseclasses import Logger, LogLevel
+from pluma.core.baseclasses import ConsoleError, Logger, LogLevel
 from pluma import Board
-from pluma.test import TaskFailed
+from pluma.test import DeployCache, TaskFailed
 from pluma.cli import DeviceActionBase, DeviceActionRegistry
 
 log = Logger()
@@ -63,15 +63,47 @@ class WaitAction(DeviceActionBase):
 
 @DeviceActionRegistry.register('wait_for_pattern')
 class WaitForPatternAction(DeviceActionBase):
-    def __init__(self, board: Board, pattern: Union[str, List[str]], timeout: int = None):
+    '''Waits for a pattern on the console.
+
+    By default, the data received since the previous action started is
+    searched too, so that a pattern received during that action (e.g.
+    "power_on") is not missed. Output matched by earlier waits (e.g. the
+    prompt found by a previous "wait_for_pattern") is never searched again.
+    "since" can also be "now", to only search the data received from now on,
+    or a number of seconds to look back.
+    '''
+
+    def __init__(self, board: Board, pattern: Union[str, List[str]], timeout: int = None,
+                 since: Union[str, float] = None):
         super().__init__(board)
         self.pattern = pattern if isinstance(pattern, List) else [pattern]
         self.timeout = timeout if timeout else 15
+        self.since = since if since is not None else 'previous_action'
+
+        if self.since not in ['now', 'previous_action'] and (
+                isinstance(self.since, bool) or not isinstance(self.since, (int, float))
+                or self.since < 0):
+            DeviceActionBase.parsing_error(
+                '"since" must be "now", "previous_action" or a positive number of seconds, '
+                f'but got "{self.since}" instead.')
+
+    def since_time(self) -> Optional[float]:
+        '''Return the time from which data received is searched, or None for "now"'''
+        if self.since == 'now':
+            return None
+        elif self.since == 'previous_action':
+            return self.previous_action_start
+
+        return time.time() - self.since
 
     def execute(self):
-        self.board.console.read_all()
+        since_time = self.since_time()
+        if since_time is None:
+            self.board.console.read_all()
+
         matched_output = self.board.console.wait_for_match(match=self.pattern,
-                                                           timeout=self.timeout)
+                                                           timeout=self.timeout,
+                                                           since_time=since_time)
         if not matched_output:
             raise TaskFailed(
                 f'{str(self)}: Timeout reached while waiting for pattern "{self.pattern}"')
@@ -102,24 +134,77 @@ class SetAction(DeviceActionBase):
 
 @DeviceActionRegistry.register('deploy')
 class DeployAction(DeviceActionBase):
-    def __init__(self, board: Board, files: List[str], destination: str, timeout: int = 15):
+    '''Deploy files to the target, in a single transfer if the console supports it'''
+
+    def __init__(self, board: Board, files: List[str], destination: str, timeout: int = 15,
+                 compression_level: int = None, cache: bool = False):
         super().__init__(board)
         if not isinstance(files, list):
             raise ValueError(f'"files" must be a list, but instead got: {files}')
 
+        if compression_level is not None and compression_level not in range(0, 10):
+            DeviceActionBase.parsing_error('Compression level must be between 0 and 9, '
+                                           f'but got "{compression_level}" instead.')
+
         self.files = files
         self.destination = destination
         self.timeout = timeout
+        self.compression_level = compression_level
+        self.cache = cache
 
     def execute(self):
         if not self.board.console.support_file_copy:
             raise TaskFailed('Cannot deploy files, current console does not support file copy. '
                              'Use or set a different console to be able to deploy files (e.g. SSH)')
 
-        for f in self.files:
-            log.log(f'Copying {f} to target device destination {self.destination}')
-            self.board.console.copy_to_target(source=f, destination=self.destination,
-                                              timeout=self.timeout)
+        log.log(f'Copying {self.files} to target device destination {self.destination}')
+        start = time.time()
+        if self.cache:
+            copied, skipped = DeployCache.shared().deploy(
+                self.board.console, sources=self.files, destination=self.destination,
+                timeout=self.timeout, compression_level=self.compression_level,
+                test_name=str(self))
+            self.save_data(deploy_skipped_files=skipped)
+        else:
+            copied = self.board.console.copy_files_to_target(
+                sources=self.files, destination=self.destination, timeout=self.timeout,
+                compression_level=self.compression_level)
+        duration = time.time() - start
+
+        throughput = copied / duration if duration > 0 else 0
+        log.log(f'Copied {copied}B in {duration:.2f}s ({throughput / 1024:.1f}KiB/s)',
+                level=LogLevel.DEBUG)
+        self.save_data(deployed_bytes=copied, deploy_duration=duration,
+                       deploy_throughput=throughput)
+
+
+@DeviceActionRegistry.register('start_agent')
+class StartAgentAction(DeviceActionBase):
+    '''Start the target agent on the console, used to run the following commands'''
+
+    def __init__(self, board: Board, python: str = None, path: str = None, timeout: int = 10):
+        super().__init__(board)
+        self.python = python
+        self.path = path
+        self.timeout = timeout
+
+    def execute(self):
+        try:
+            self.board.console.start_agent(python=self.python, path=self.path,
+                                           timeout=self.timeout)
+        except ConsoleError as e:
+            raise TaskFailed(f'{str(self)}: Failed to start the target agent: {e}')
+
+
+@DeviceActionRegistry.register('stop_agent')
+class StopAgentAction(DeviceActionBase):
+    '''Stop the target agent, and return to the console shell'''
+
+    def execute(self):
+        try:
+            self.board.console.stop_agent()
+        except ConsoleError as e:
+            raise TaskFailed(f'{str(self)}: Failed to stop the target agent: {e}')
 
 
 class ManualDeviceActionBase(DeviceActionBase):
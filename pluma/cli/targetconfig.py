@@ -1,13 +1,15 @@
 import json
 import os
-from typing import Optional, Tuple
+import re
+from typing import List, Optional, Tuple
 from copy import deepcopy
 
-from pluma import Board, SerialConsole, SSHConsole, SoftPower, IPPowerPDU
+from pluma import Board, SerialConsole, SSHConsole, SoftPower, IPPowerPDU, TransferSettings
 from pluma.cli import Configuration, ConfigurationError, TargetConfigError, \
     PlumaContext
 from pluma.core.power import Uhubctl
-from pluma.core.baseclasses import Logger, ConsoleBase, PowerBase
+from pluma.core.baseclasses import Logger, ConsoleBase, ConsoleEngine, ConsoleWatcher, PowerBase, \
+    LogRotation, SendPacing, SerialEngine
 from pluma.core.dataclasses import SystemContext, Credentials
 
 log = Logger()
@@ -40,6 +42,7 @@ class TargetConfig:
 
         power = TargetFactory.create_power_control(
             config.pop_optional(Configuration, 'power'), ssh or serial)
+        watchers = TargetFactory.create_watchers(config.pop_optional(list, 'watchers'))
 
         config.ensure_consumed()
 
@@ -51,6 +54,9 @@ class TargetConfig:
 
         board = Board('Test board', console=consoles, power=power,
                       system=system)
+        for watcher in watchers:
+            board.add_watcher(watcher)
+
         return PlumaContext(board, variables=variables)
 
     @staticmethod
@@ -115,6 +121,87 @@ class TargetFactory:
         system_config.ensure_consumed()
         return system
 
+    @staticmethod
+    def parse_log_rotation(rotation_config: Optional[Configuration]) -> Optional[LogRotation]:
+        if not rotation_config:
+            return None
+
+        rotation = LogRotation(
+            max_bytes=rotation_config.pop_optional(int, 'max_size', context='log_rotation'),
+            interval=rotation_config.pop_optional(int, 'interval', context='log_rotation'),
+            compress=rotation_config.pop_optional(bool, 'compress', default=False,
+                                                  context='log_rotation'),
+            backup_count=rotation_config.pop_optional(int, 'backup_count',
+                                                      context='log_rotation'))
+        rotation_config.ensure_consumed()
+        return rotation
+
+    @staticmethod
+    def parse_send_pacing(pacing_config: Optional[Configuration]) -> Optional[SendPacing]:
+        if not pacing_config:
+            return None
+
+        try:
+            pacing = SendPacing(
+                chunk_size=pacing_config.pop_optional(int, 'chunk_size', default=16,
+                                                      context='send_pacing'),
+                delay=pacing_config.pop_optional(float, 'delay', default=0,
+                                                 context='send_pacing'),
+                echo=pacing_config.pop_optional(bool, 'echo', default=False,
+                                                context='send_pacing'),
+                echo_timeout=pacing_config.pop_optional(float, 'echo_timeout', default=1,
+                                                        context='send_pacing'))
+        except ValueError as e:
+            raise ConfigurationError(f'Configuration error: {e}')
+
+        pacing_config.ensure_consumed()
+        return pacing
+
+    @staticmethod
+    def parse_file_transfer(transfer_config: Optional[Configuration]) -> TransferSettings:
+        if not transfer_config:
+            return TransferSettings()
+
+        try:
+            settings = TransferSettings(
+                chunk_size=transfer_config.pop_optional(
+                    int, 'chunk_size', default=TransferSettings.chunk_size,
+                    context='file_transfer'),
+                window=transfer_config.pop_optional(
+                    int, 'window', default=TransferSettings.window, context='file_transfer'),
+                compression_level=transfer_config.pop_optional(int, 'compression_level',
+                                                               context='file_transfer'))
+        except ValueError as e:
+            raise ConfigurationError(f'Configuration error: {e}')
+
+        transfer_config.ensure_consumed()
+        return settings
+
+    @staticmethod
+    def create_watchers(watchers_config: Optional[list]) -> List[ConsoleWatcher]:
+        watchers = []
+        for watcher_config in watchers_config or []:
+            if not isinstance(watcher_config, dict):
+                raise ConfigurationError(
+                    f'Configuration error: invalid console watcher "{watcher_config}", '
+                    'must be a dictionary')
+
+            watcher_config = Configuration(watcher_config)
+            patterns = watcher_config.pop(list, 'patterns', context='watchers')
+            try:
+                watcher = ConsoleWatcher(
+                    patterns=patterns,
+                    name=watcher_config.pop_optional(str, 'name', context='watchers'),
+                    fatal=watcher_config.pop_optional(bool, 'fatal', default=False,
+                                                      context='watchers'))
+            except (ValueError, re.error) as e:
+                raise ConfigurationError(f'Configuration error: in "watchers", {e}')
+
+            watcher_config.ensure_consumed()
+            watchers.append(watcher)
+
+        return watchers
+
     @staticmethod
     def create_consoles(config: Optional[Configuration],
                         system: SystemContext) -> Tuple[Optional[ConsoleBase],
@@ -139,11 +226,39 @@ class TargetFactory:
         baudrate = serial_config.pop_optional(int,
                                               'baudrate', default=115200, context='serial console')
         logfile = serial_config.pop_optional(str, 'log_file', context='serial console')
+        background_reader = serial_config.pop_optional(bool, 'background_reader', default=False,
+                                                       context='serial console')
+        log_rotation = TargetFactory.parse_log_rotation(
+            serial_config.pop_optional(Configuration, 'log_rotation', context='serial console'))
+        engine = TargetFactory.create_serial_engine(
+            serial_config.pop_optional(str, 'engine', default='pexpect',
+                                       context='serial console'),
+            raw_logfile=logfile)
+        send_pacing = TargetFactory.parse_send_pacing(
+            serial_config.pop_optional(Configuration, 'send_pacing', context='serial console'))
+        file_transfer = TargetFactory.parse_file_transfer(
+            serial_config.pop_optional(Configuration, 'file_transfer', context='serial console'))
         serial = SerialConsole(port=port, system=system,
-                               baud=baudrate, raw_logfile=logfile)
+                               baud=baudrate, raw_logfile=logfile, engine=engine)
+        serial.file_transfer = file_transfer
+        serial.engine.background_reader = background_reader
+        serial.engine.raw_log_rotation = log_rotation
+        serial.engine.send_pacing = send_pacing
         serial_config.ensure_consumed()
         return serial
 
+    @staticmethod
+    def create_serial_engine(engine_name: str,
+                             raw_logfile: Optional[str]) -> Optional[ConsoleEngine]:
+        '''Return the engine for a serial console, or None for the default engine'''
+        if engine_name == 'pexpect':
+            return None
+        elif engine_name == 'serial':
+            return SerialEngine(raw_logfile=raw_logfile)
+
+        raise ConfigurationError(f'Configuration error: in "serial console", unknown engine '
+                                 f'"{engine_name}", expected "pexpect" or "serial"')
+
     @staticmethod
     def create_ssh(ssh_config: Optional[Configuration],
                    system: SystemContext) -> Optional[ConsoleBase]:
@@ -157,6 +272,12 @@ class TargetFactory:
         password = ssh_config.pop_optional(str, 'password', system.credentials.password,
                                            context='ssh')
         log_file = ssh_config.pop_optional(str, 'log_file', context='ssh')
+        background_reader = ssh_config.pop_optional(bool, 'background_reader', default=False,
+                                                    context='ssh')
+        log_rotation = TargetFactory.parse_log_rotation(
+            ssh_config.pop_optional(Configuration, 'log_rotation', context='ssh'))
+        connection_sharing = ssh_config.pop_optional(bool, 'connection_sharing', default=False,
+                                                     context='ssh')
         ssh_config.ensure_consumed()
 
         # Create a new system config to override default credentials
@@ -164,7 +285,11 @@ class TargetFactory:
         ssh_system.credentials.login = login
         ssh_system.credentials.password = password
 
-        return SSHConsole(target, system=ssh_system, raw_logfile=log_file)
+        ssh = SSHConsole(target, system=ssh_system, raw_logfile=log_file,
+                         connection_sharing=connection_sharing)
+        ssh.engine.background_reader = background_reader
+        ssh.engine.raw_log_rotation = log_rotation
+        return ssh
 
     @staticmethod
     def create_power_control(power_config: Optional[Configuration],
@@ -4,7 +4,8 @@ from typing import List, Optional, Union, cast
 
 from pluma.cli.resultsconfig import ResultsConfig
 from pluma.core.baseclasses import Logger, LogLevel
-from pluma.test import TestController, TestRunner, TestBase
+from pluma.test import ArtifactCollector, TestController, TestRunner, TestRunnerParallel, \
+    TestBase
 from pluma.test.stock.deffuncs import sc_run_n_iterations
 from pluma.cli import Configuration, ConfigurationError, TestsConfigError, TestDefinition,\
     TestsProvider
@@ -40,8 +41,12 @@ class TestsConfig:
 
         config.ensure_consumed()
 
-    def create_test_controller(self, board: Board) -> TestController:
-        '''Create a TestController from the configuration, and Board'''
+    def create_test_controller(self, board: Board,
+                               results: Optional[ResultsConfig] = None) -> TestController:
+        '''Create a TestController from the configuration, and Board.
+
+        Artifacts collected on failures are stored next to the "results" file.
+        '''
         if not board or not isinstance(board, Board):
             raise ValueError(
                 f'Null or invalid \'board\', which must be of type \'{Board}\'')
@@ -49,21 +54,38 @@ class TestsConfig:
         settings = self.settings_config
 
         try:
-            controller = self._create_test_controller(board, settings)
+            controller = self._create_test_controller(board, settings, results)
             settings.ensure_consumed()
         except ConfigurationError as e:
             raise TestsConfigError(e)
         else:
             return controller
 
-    def _create_test_controller(self, board: Board, settings: Configuration) -> TestController:
-        testrunner = TestRunner(
+    def _create_test_controller(self, board: Board, settings: Configuration,
+                                results: Optional[ResultsConfig]) -> TestController:
+        artifacts_folder = os.path.dirname(results.path) if results else None
+        runner_options = {}
+        runner_class = TestRunner
+        parallel_workers = settings.pop_optional(int, 'parallel_workers', context='settings')
+        if parallel_workers is not None:
+            if parallel_workers < 1:
+                raise ConfigurationError('Configuration error: "parallel_workers" must be '
+                                         f'at least 1, but got {parallel_workers}')
+
+            runner_class = TestRunnerParallel
+            runner_options['max_workers'] = parallel_workers
+
+        testrunner = runner_class(
             board=board,
             tests=TestsConfig.create_tests(
                 self.selected_tests(), board),
             email_on_fail=settings.pop_optional(bool, 'email_on_fail', default=False),
             continue_on_fail=settings.pop_optional(bool,
-                                                   'continue_on_fail', default=True)
+                                                   'continue_on_fail', default=True),
+            artifacts=TestsConfig.create_artifact_collector(
+                settings.pop_optional(Configuration, 'artifacts', context='settings'),
+                folder=artifacts_folder),
+            **runner_options
         )
 
         controller = TestController(
@@ -78,6 +100,26 @@ class TestsConfig:
 
         return controller
 
+    @staticmethod
+    def create_artifact_collector(artifacts_config: Optional[Configuration],
+                                  folder: Optional[str] = None) -> Optional[ArtifactCollector]:
+        if not artifacts_config:
+            return None
+
+        try:
+            collector = ArtifactCollector(
+                patterns=artifacts_config.pop(list, 'patterns', context='artifacts'),
+                folder=folder or None,
+                timeout=artifacts_config.pop_optional(float, 'timeout', default=120,
+                                                      context='artifacts'),
+                compression_level=artifacts_config.pop_optional(
+                    int, 'compression_level', default=6, context='artifacts'))
+        except ValueError as e:
+            raise ConfigurationError(f'Configuration error: {e}')
+
+        artifacts_config.ensure_consumed()
+        return collector
+
     def create_results_config(self, default_file: str) -> ResultsConfig:
         path = self.results_config.pop_optional(str, 'file', default=default_file)
         self.results_config.ensure_consumed()
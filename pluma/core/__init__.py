@@ -8,8 +8,10 @@ from .powerrelay import PowerRelay
 from .powermulti import PowerMulti
 from .softpower import SoftPower
 from .pdu import APCPDU, IPPowerPDU, EnergeniePDU
+from .consolefiletransfer import ConsoleFileTransfer, TransferSettings, TransferStats
 from .serialconsole import SerialConsole
 from .hostconsole import HostConsole
+from .hostconsolepool import HostConsolePool
 from .telnetconsole import TelnetConsole
 from .sshconsole import SSHConsole
 from .hub import Hub
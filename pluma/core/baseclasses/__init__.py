@@ -1,7 +1,15 @@
 from .hardwarebase import HardwareBase
 from .consoleexceptions import *
-from .consoleengine import ConsoleEngine, ConsoleType, MatchResult
+from .consolematcher import ConsoleMatcher, PatternMatcher, PatternMatch, Literal, get_matcher
+from .consolewatcher import ConsoleWatcher, WatchEvent
+from .jsonmatcher import JSONMatcher, JSONStreamScanner, JSONObjectMatch, extract_json_objects
+from .rawlogindex import RawLogIndex, read_log_window
+from .rawlogwriter import RawLogWriter, LogRotation
+from .consoleengine import ConsoleEngine, ConsoleType, MatchResult, SendPacing
 from .pexpectengine import PexpectEngine
+from .serialengine import SerialEngine
+from .asyncioengine import AsyncioEngine
+from .consoleagent import ConsoleAgent, AgentExecResult
 from .consolebase import ConsoleBase
 from .powerbase import PowerBase
 from .relaybase import RelayBase
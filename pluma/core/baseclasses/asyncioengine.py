@@ -0,0 +1,49 @@
+import asyncio
+
+from .pexpectengine import PexpectEngine
+
+
+class AsyncioEngine(PexpectEngine):
+    '''Console engine waiting for data in the asyncio event loop.
+
+    Processes and file descriptors are opened as with PexpectEngine, but the
+    asynchronous API waits for data with "loop.add_reader" on the console
+    file descriptor, instead of a thread. Reads never wait for more data,
+    so a single event loop can drive many consoles at once.
+    '''
+
+    # Only read the data already available, never block the event loop
+    READ_TIMEOUT = 0
+
+    async def wait_for_data_async(self, timeout: float) -> bool:
+        assert self.is_open
+        self._raise_watch_error()
+
+        fd = self.fileno()
+        if self.background_reader_running or fd is None:
+            return await super().wait_for_data_async(timeout)
+
+        loop = asyncio.get_event_loop()
+        readable = loop.create_future()
+
+        def on_readable():
+            if not readable.done():
+                readable.set_result(None)
+
+        loop.add_reader(fd, on_readable)
+        try:
+            await asyncio.wait_for(readable, max(timeout, 0))
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(fd)
+
+        received = self._read_from_console()
+        if not received:
+            # Readable without data (e.g. hang-up), avoid spinning
+            await asyncio.sleep(min(max(timeout, 0), 0.01))
+            return False
+
+        self._receive(received)
+        self._raise_watch_error()
+        return True
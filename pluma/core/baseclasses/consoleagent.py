@@ -0,0 +1,224 @@
+import base64
+import json
+import os
+import time
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .consoleexceptions import ConsoleAgentError
+from .logging import Logger, LogLevel
+
+log = Logger()
+
+AGENT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'targetagent.py')
+# Length of the lines used to deploy the agent, below terminal line limits
+DEPLOY_LINE_LENGTH = 512
+
+
+@dataclass
+class AgentExecResult:
+    '''Exact output and return code of a command run by the target agent'''
+    command: str
+    stdout: bytes
+    stderr: bytes
+    retcode: int
+
+
+class ConsoleAgent():
+    '''Client of the pluma agent, running on the target behind a console.
+
+    The agent (see "targetagent.py") is deployed through the console shell,
+    and started in the foreground, using "python" on the target. It then
+    answers newline-delimited JSON-RPC requests until stopped, at which point
+    the console shell is usable again.
+
+    Requests can be pipelined: "send_request" returns immediately with the
+    request id, and "wait_response" returns the response with that id.
+    '''
+
+    DEFAULT_PATH = '/tmp/pluma-agent.py'
+
+    def __init__(self, console, python: Optional[str] = None, path: Optional[str] = None):
+        self.console = console
+        self.python = python or 'python3'
+        self.path = path or self.DEFAULT_PATH
+        self.running = False
+        self._next_id = 1
+        self._pending_line = ''
+        self._responses: Dict[int, dict] = {}
+
+    def start(self, timeout: Optional[float] = None):
+        '''Deploy and start the agent, raise ConsoleAgentError if it did not start'''
+        timeout = timeout if timeout is not None else 10
+        if self.running:
+            return
+
+        with open(AGENT_SCRIPT, 'rb') as f:
+            encoded = base64.b64encode(f.read()).decode('ascii')
+
+        encoded_path = f'{self.path}.b64'
+        self.console.send(f'rm -f {encoded_path}')
+        for start in range(0, len(encoded), DEPLOY_LINE_LENGTH):
+            self.console.send(f"echo '{encoded[start:start + DEPLOY_LINE_LENGTH]}' "
+                              f'>> {encoded_path}', flush_before=False)
+
+        decode_script = 'import base64,sys;' \
+            'sys.stdout.buffer.write(base64.b64decode(sys.stdin.read()))'
+        self.console.send(f'{self.python} -c "{decode_script}" < {encoded_path} > {self.path}'
+                          f' && rm -f {encoded_path} && {self.python} {self.path}',
+                          flush_before=False)
+
+        self._pending_line = ''
+        deadline = time.time() + timeout
+        while not self._read_messages(deadline - time.time()):
+            if time.time() >= deadline:
+                raise ConsoleAgentError(f'Agent failed to start on {self.console} with '
+                                        f'"{self.python}" within {timeout}s')
+
+        self.running = True
+        log.log(f'Agent started on {self.console}', level=LogLevel.DEBUG)
+
+    def stop(self, timeout: Optional[float] = None):
+        '''Stop the agent, and return to the console shell'''
+        if not self.running:
+            return
+
+        try:
+            self.call('exit', timeout=timeout)
+        finally:
+            self.running = False
+            self._responses.clear()
+
+    def send_request(self, method: str, params: Optional[dict] = None) -> int:
+        '''Send a request without waiting for its response, and return its id'''
+        if not self.running:
+            raise ConsoleAgentError('Agent is not running')
+
+        request_id = self._next_id
+        self._next_id += 1
+        request = {'jsonrpc': '2.0', 'id': request_id, 'method': method}
+        if params:
+            request['params'] = params
+
+        self.console.engine.send_line(json.dumps(request))
+        return request_id
+
+    def wait_response(self, request_id: int, timeout: Optional[float] = None) -> Any:
+        '''Wait for the response to a request, and return its result'''
+        timeout = timeout if timeout is not None else 10
+        deadline = time.time() + timeout
+        while request_id not in self._responses:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise ConsoleAgentError(f'No response from agent to request {request_id} '
+                                        f'within {timeout}s')
+
+            self._read_messages(remaining)
+
+        return self._result(self._responses.pop(request_id))
+
+    def call(self, method: str, params: Optional[dict] = None,
+             timeout: Optional[float] = None) -> Any:
+        '''Send a request, and wait for its result'''
+        return self.wait_response(self.send_request(method, params), timeout=timeout)
+
+    def exec(self, command: str, timeout: Optional[float] = None) -> AgentExecResult:
+        '''Run a shell command on the target, and return its exact output'''
+        result = self.call('exec', {'command': command, 'timeout': timeout},
+                           timeout=self._response_timeout(timeout))
+        return self._exec_result(command, result)
+
+    def exec_many(self, commands: List[str], timeout: Optional[float] = None,
+                  stop_on_error: bool = False) -> List[AgentExecResult]:
+        '''Run shell commands in order, all sent at once.
+
+        "timeout" applies to each command. With "stop_on_error", commands
+        following a failed command are not run, and not part of the results.
+        '''
+        if not commands:
+            return []
+
+        response_timeout = self._response_timeout(timeout) * len(commands)
+        if stop_on_error:
+            requests = [{'method': 'exec', 'params': {'command': command, 'timeout': timeout}}
+                        for command in commands]
+            responses = self.call('batch', {'requests': requests, 'stop_on_error': True},
+                                  timeout=response_timeout)
+            return [self._exec_result(command, self._result(response))
+                    for command, response in zip(commands, responses)]
+
+        request_ids = [self.send_request('exec', {'command': command, 'timeout': timeout})
+                       for command in commands]
+        return [self._exec_result(command, self.wait_response(request_id, response_timeout))
+                for command, request_id in zip(commands, request_ids)]
+
+    def read_file(self, path: str, timeout: Optional[float] = None) -> bytes:
+        return base64.b64decode(self.call('read_file', {'path': path}, timeout=timeout)['data'])
+
+    def write_file(self, path: str, data: bytes, mode: Optional[int] = None,
+                   timeout: Optional[float] = None):
+        self.call('write_file', {'path': path, 'data': base64.b64encode(data).decode('ascii'),
+                                 'mode': mode}, timeout=timeout)
+
+    def stat(self, path: str, timeout: Optional[float] = None) -> Optional[dict]:
+        '''Return the size, mode, mtime, is_dir and is_file of a path, or None if missing'''
+        return self.call('stat', {'path': path}, timeout=timeout)
+
+    def check_files(self, paths: List[str], sha256: bool = False,
+                    timeout: Optional[float] = None) -> Dict[str, Optional[dict]]:
+        '''Return the size (and SHA-256) of each file, or None for missing files'''
+        return self.call('check_files', {'paths': paths, 'sha256': sha256}, timeout=timeout)
+
+    @staticmethod
+    def _response_timeout(timeout: Optional[float]) -> float:
+        # Leave time for the agent to report commands timing out
+        return timeout + 5 if timeout is not None else 3600
+
+    @staticmethod
+    def _exec_result(command: str, result: dict) -> AgentExecResult:
+        return AgentExecResult(command=command,
+                               stdout=base64.b64decode(result['stdout']),
+                               stderr=base64.b64decode(result['stderr']),
+                               retcode=result['retcode'])
+
+    @staticmethod
+    def _result(response: dict) -> Any:
+        if 'error' in response:
+            error = response['error']
+            raise ConsoleAgentError(f'Agent error: {error.get("message")}', code=error.get('code'))
+
+        return response.get('result')
+
+    def _read_messages(self, timeout: float) -> bool:
+        '''Read the messages received, return True if the agent reported it is ready'''
+        received = self.console.read_all()
+        if not received and timeout > 0:
+            self.console.engine.wait_for_data(timeout=timeout)
+            received = self.console.read_all()
+
+        lines = (self._pending_line + received).split('\n')
+        self._pending_line = lines.pop()
+        ready = False
+        for line in lines:
+            line = line.strip()
+            # Ignore anything else, such as the echo of the start command
+            if not line.startswith('{'):
+                continue
+
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+
+            if not isinstance(message, dict) or message.get('jsonrpc') != '2.0':
+                continue
+
+            if message.get('method') == 'ready':
+                ready = True
+            elif message.get('id') is not None:
+                self._responses[message['id']] = message
+            elif 'error' in message:
+                log.warning(f'Agent error: {message["error"]}')
+
+        return ready
@@ -1,18 +1,21 @@
 import time
 import json
 import os
-from typing import Optional, List, Tuple, Union
+import uuid
+from typing import Any, Callable, Optional, List, Tuple, Union
 from abc import ABC, abstractmethod
 
 from pluma.core.dataclasses import SystemContext
-from pluma.core.baseclasses import ConsoleEngine, PexpectEngine
+from pluma.core.baseclasses import (ConsoleAgent, ConsoleEngine, ConsoleMatcher, ConsoleWatcher,
+                                   JSONMatcher, Literal, MatchResult, PexpectEngine,
+                                   PatternMatcher, extract_json_objects, get_matcher)
 
 from .hardwarebase import HardwareBase
 from .logging import LogLevel
 from .consoleexceptions import (ConsoleError, ConsoleCannotOpenError,
                                 ConsoleExceptionKeywordReceivedError,
                                 ConsoleInvalidJSONReceivedError,
-                                ConsoleLoginFailedError)
+                                ConsoleLoginFailedError, ConsoleWatchError)
 
 
 class ConsoleBase(HardwareBase, ABC):
@@ -26,6 +29,8 @@ class ConsoleBase(HardwareBase, ABC):
                                               raw_logfile=raw_logfile)
         self.system = system or SystemContext()
         self._requires_login = True
+        # Target agent, used to run commands if started (see "start_agent")
+        self.agent: Optional[ConsoleAgent] = None
 
     @abstractmethod
     def open(self):
@@ -42,6 +47,8 @@ class ConsoleBase(HardwareBase, ABC):
     def close(self):
         '''Close the console.'''
         self.engine.close()
+        # The agent ends with the console session
+        self.agent = None
 
     def _on_closed(self):
         '''Executed after the console is closed.'''
@@ -58,74 +65,142 @@ class ConsoleBase(HardwareBase, ABC):
         self.require_open()
         return self.engine.read_all(preserve_read_buffer=preserve_read_buffer)
 
-    def wait_for_match(self, match: List[str], timeout=None) -> Optional[str]:
-        '''Wait a maximum duration of 'timeout' for a matching regex, and returns matched text'''
+    def add_watcher(self, watcher: ConsoleWatcher):
+        '''Search all the data received from now on with "watcher", see "ConsoleWatcher"'''
+        self.engine.add_watcher(watcher)
+
+    def remove_watcher(self, watcher: ConsoleWatcher):
+        '''Stop searching the data received with "watcher"'''
+        self.engine.remove_watcher(watcher)
+
+    def add_watch_error_listener(self, listener: Callable[[ConsoleWatchError], None]):
+        '''Call "listener" with the error of each fatal console watcher match'''
+        if listener not in self.engine.watch_error_listeners:
+            self.engine.watch_error_listeners.append(listener)
+
+    def remove_watch_error_listener(self, listener: Callable[[ConsoleWatchError], None]):
+        '''Stop calling "listener" on fatal console watcher matches'''
+        if listener in self.engine.watch_error_listeners:
+            self.engine.watch_error_listeners.remove(listener)
+
+    def post_watch_error(self, error: ConsoleWatchError):
+        '''Raise "error" into the task using the console, when it next waits for
+        or reads data, as for a fatal console watcher match on this console'''
+        self.engine.post_watch_error(error)
+
+    def wait_for_match(self, match: List[str], timeout=None, since: Optional[int] = None,
+                       since_time: Optional[float] = None) -> Optional[str]:
+        '''Wait a maximum duration of 'timeout' for a matching regex, and returns matched text.
+
+        Data not read yet is searched by default. With "since" (an absolute
+        offset, see "ConsoleEngine.reception_offset") or "since_time" (a
+        timestamp), data received from that point is searched, even if
+        already read, as far as the reception history goes, but not before
+        the end of the previous match.
+        '''
         self.require_open()
-        match_result = self.engine.wait_for_match(match=match, timeout=timeout)
+        match_result = self.engine.wait_for_match(match=match, timeout=timeout,
+                                                  since=self._since_offset(since, since_time))
         return match_result.text_matched
 
+    async def wait_for_match_async(self, match: List[str], timeout=None,
+                                   since: Optional[int] = None,
+                                   since_time: Optional[float] = None) -> Optional[str]:
+        '''Asynchronous version of "wait_for_match"'''
+        self.require_open()
+        match_result = await self.engine.wait_for_match_async(
+            match=match, timeout=timeout, since=self._since_offset(since, since_time))
+        return match_result.text_matched
+
+    def _since_offset(self, since: Optional[int], since_time: Optional[float]) -> Optional[int]:
+        if since_time is None:
+            return since
+
+        offset = self.engine.offset_at(since_time)
+        return offset if since is None else min(since, offset)
+
     def wait_for_bytes(self, timeout: Optional[float] = None,
                        sleep_time: Optional[float] = None,
                        start_bytes: int = None) -> bool:
-        '''Wait for data to be received on the console.'''
+        '''Wait for data to be received on the console.
+
+        "sleep_time" is deprecated and ignored, data is detected as soon as
+        it is received.
+        '''
         timeout = timeout if timeout is not None else 10.0
-        sleep_time = sleep_time if sleep_time is not None else 0.1
 
         self.require_open()
 
         self.engine.read_all(preserve_read_buffer=True)
         initial_byte_count = start_bytes or self.engine.reception_buffer_size
 
-        start_time = time.time()
-        while(time.time()-start_time < timeout):
-            self.engine.read_all(preserve_read_buffer=True)
-            byte_count = self.engine.reception_buffer_size
-
-            self.log(f'Waiting for data: Waited[{time.time()-start_time:.1f}/{timeout:.1f}s] '
-                     'Received[{byte_count-initial_byte_count}B]...',
-                     level=LogLevel.DEBUG)
+        self.log(f'Waiting up to {timeout:.1f}s for data...', level=LogLevel.DEBUG)
 
-            if byte_count > initial_byte_count:
-                return True
+        deadline = time.time() + timeout
+        while self.engine.reception_buffer_size <= initial_byte_count:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
 
-            time.sleep(sleep_time)
+            self.engine.wait_for_data(timeout=remaining)
 
-        return False
+        return True
 
     def wait_for_quiet(self, quiet: float = None, sleep_time: float = None,
                        timeout: float = None) -> bool:
-        '''Wait at most "timeout" for no activity during "quiet" consecutive seconds'''
+        '''Wait at most "timeout" for no activity during "quiet" consecutive seconds.
+
+        "sleep_time" is deprecated and ignored, quiet is detected as soon as
+        "quiet" seconds elapsed since the last data received.
+        '''
         self.require_open()
         quiet = quiet if quiet is not None else 0.5
-        sleep_time = sleep_time if sleep_time is not None else 0.1
         timeout = timeout if timeout is not None else 10.0
 
-        last_read_buffer_size = 0
         start = time.time()
-        now = start
         quiet_start = start
-        while(now - start < timeout):
-            time.sleep(sleep_time)
-
-            self.read_all(preserve_read_buffer=True)
-            reception_buffer_size = self.engine.reception_buffer_size
-
-            # Check if more data was received
-            now = time.time()
-            if reception_buffer_size == last_read_buffer_size:
-                if now - quiet_start > quiet:
-                    return True
-            else:
-                quiet_start = now
-
-            last_read_buffer_size = reception_buffer_size
-            log_string = ("Waiting for quiet... Waited[{:.1f}/{:.1f}s] "
-                          "Quiet[{:.1f}/{:.1f}s] Received[{:.0f}B]...")
-            self.log(log_string.format(now - start, timeout, now - quiet_start,
-                                       quiet, reception_buffer_size), level=LogLevel.DEBUG)
-
-        # Timeout
-        return False
+        while True:
+            quiet_reached, wait_time = self._check_quiet(start, quiet_start, quiet, timeout)
+            if quiet_reached is not None:
+                return quiet_reached
+
+            # Any data received restarts the quiet period
+            if self.engine.wait_for_data(timeout=wait_time):
+                quiet_start = time.time()
+
+    async def wait_for_quiet_async(self, quiet: float = None, timeout: float = None) -> bool:
+        '''Asynchronous version of "wait_for_quiet"'''
+        self.require_open()
+        quiet = quiet if quiet is not None else 0.5
+        timeout = timeout if timeout is not None else 10.0
+
+        start = time.time()
+        quiet_start = start
+        while True:
+            quiet_reached, wait_time = self._check_quiet(start, quiet_start, quiet, timeout)
+            if quiet_reached is not None:
+                return quiet_reached
+
+            if await self.engine.wait_for_data_async(timeout=wait_time):
+                quiet_start = time.time()
+
+    def _check_quiet(self, start: float, quiet_start: float, quiet: float,
+                     timeout: float) -> Tuple[Optional[bool], float]:
+        '''Return whether quiet was reached (None if undecided yet), and the time to wait'''
+        now = time.time()
+        if now - quiet_start >= quiet:
+            self.log(f'Quiet after {now - start:.2f}s, received '
+                     f'{self.engine.reception_buffer_size}B',
+                     level=LogLevel.DEBUG)
+            return True, 0
+
+        deadline = start + timeout
+        if now >= deadline:
+            self.log(f'Waiting for quiet timed out after {timeout:.1f}s',
+                     level=LogLevel.DEBUG)
+            return False, 0
+
+        return None, min(quiet_start + quiet, deadline) - now
 
     def send_and_read(self, cmd: str, timeout: Optional[float] = None,
                       sleep_time: Optional[float] = None,
@@ -142,29 +217,75 @@ class ConsoleBase(HardwareBase, ABC):
                             timeout=timeout)
         return self.read_all()
 
-    def send_and_expect(self, cmd: str, match: Union[str, List[str]],
+    async def send_and_read_async(self, cmd: str, timeout: Optional[float] = None,
+                                  quiet_time: Optional[float] = None,
+                                  send_newline: bool = True, flush_before: bool = True) -> str:
+        '''Asynchronous version of "send_and_read"'''
+        timeout = timeout if timeout is not None else 3
+        quiet_time = quiet_time if quiet_time is not None else 0.3
+
+        self.send_nonblocking(cmd, send_newline=send_newline,
+                              flush_before=flush_before)
+        await self.wait_for_quiet_async(quiet=quiet_time, timeout=timeout)
+        return self.read_all()
+
+    def send_and_expect(self, cmd: str, match: Union[str, List[str], ConsoleMatcher],
                         excepts: Union[str, List[str]] = None,
                         timeout: int = None, send_newline: bool = True,
                         flush_before: bool = True) -> Tuple[str, Optional[str]]:
-        '''Send a command/data on the console, and wait for one of "expects" patterns.'''
+        '''Send a command/data on the console, and wait for one of "expects" patterns.
+
+        "match" can also be a matcher, e.g. a "PatternMatcher" to reuse its compiled
+        patterns.
+        '''
+        matcher, excepts = self._expect_matcher(match, excepts)
+        timeout = timeout if timeout is not None else 5
+
+        self.send_nonblocking(cmd, send_newline=send_newline,
+                              flush_before=flush_before)
+
+        result = self.engine.wait_for_match(timeout=timeout, match=matcher)
+        return self._expect_result(result, matcher, excepts)
+
+    async def send_and_expect_async(self, cmd: str,
+                                    match: Union[str, List[str], ConsoleMatcher],
+                                    excepts: Union[str, List[str]] = None,
+                                    timeout: int = None, send_newline: bool = True,
+                                    flush_before: bool = True) -> Tuple[str, Optional[str]]:
+        '''Asynchronous version of "send_and_expect"'''
+        matcher, excepts = self._expect_matcher(match, excepts)
+        timeout = timeout if timeout is not None else 5
+
+        self.send_nonblocking(cmd, send_newline=send_newline,
+                              flush_before=flush_before)
+
+        result = await self.engine.wait_for_match_async(timeout=timeout, match=matcher)
+        return self._expect_result(result, matcher, excepts)
+
+    def _expect_matcher(self, match: Union[str, List[str], ConsoleMatcher],
+                        excepts: Union[str, List[str], None]) -> Tuple[ConsoleMatcher, List[str]]:
         match = match or []
         excepts = excepts or []
-        timeout = timeout if timeout is not None else 5
 
-        if isinstance(match, str):
-            match = [match]
         if isinstance(excepts, str):
             excepts = [excepts]
 
-        watches = []
-        watches.extend(match)
-        watches.extend(excepts)
+        if isinstance(match, ConsoleMatcher) and not excepts:
+            return match, excepts
 
-        self.send_nonblocking(cmd, send_newline=send_newline,
-                              flush_before=flush_before)
+        if isinstance(match, PatternMatcher):
+            match = list(match.patterns)
+        elif isinstance(match, ConsoleMatcher):
+            raise ValueError(f'Exceptions cannot be searched along with {match}')
+        elif isinstance(match, str):
+            match = [match]
 
-        result = self.engine.wait_for_match(timeout=timeout, match=watches)
+        # Compiled once for each set of patterns, and reused for later calls
+        return get_matcher(list(match) + excepts, encoding=self.engine.encoding), excepts
 
+    def _expect_result(self, result: MatchResult, matcher: ConsoleMatcher,
+                       excepts: List[str]) -> Tuple[str, Optional[str]]:
+        watches = list(matcher.patterns)
         if result.regex_matched:
             debug_match_str = f'<<matched expects={watches}>>{result.regex_matched}<</matched>>'
         else:
@@ -229,6 +350,7 @@ class ConsoleBase(HardwareBase, ABC):
         if success_match:
             matches.append(success_match)
 
+        self.require_shell()
         fail_message = f'Failed to log in with login="{username}" and password="{password}"'
         (output, matched) = self.send_and_expect('', match=matches)
         if not matched:
@@ -261,24 +383,88 @@ class ConsoleBase(HardwareBase, ABC):
 
         self.log('Login successful')
 
-    def get_json_data(self, cmd):
-        ''' Execute a command @cmd on target which generates JSON data.
-        Parse this data, and return a dict of it.'''
-
-        self.wait_for_quiet(quiet=1, sleep_time=0.5)
-        received, matched = self.send_and_expect(cmd, match='{((.|\n)*)\n}')
-
+    def get_json_data(self, cmd: str, count: int = 1, ndjson: bool = False,
+                      timeout: Optional[float] = None) -> Any:
+        '''Execute a command @cmd on target which generates JSON data.
+        Parse this data, and return a dict of it.
+
+        Returns as soon as "count" objects were received, as a list if
+        "count" is more than 1. With "ndjson", objects are one per line
+        (see "JSONStreamScanner"). Objects received after them are left
+        unread, and can be read with "wait_for_json_data".
+        '''
+        matcher = JSONMatcher(count=count, ndjson=ndjson, skip=cmd,
+                              encoding=self.engine.encoding)
+        received, matched = self.send_and_expect(cmd, match=matcher, timeout=timeout)
+        return self._json_data(received, matched, count, ndjson)
+
+    def wait_for_json_data(self, count: int = 1, ndjson: bool = False,
+                           timeout: Optional[float] = None) -> Any:
+        '''Wait for JSON data without sending a command, e.g. a NDJSON stream.
+        See "get_json_data".'''
+        matcher = JSONMatcher(count=count, ndjson=ndjson, encoding=self.engine.encoding)
+        result = self.engine.wait_for_match(match=matcher, timeout=timeout or 5)
+        received, matched = self._expect_result(result, matcher, excepts=[])
+        return self._json_data(received, matched, count, ndjson)
+
+    @staticmethod
+    def _json_data(received: str, matched: Optional[str], count: int, ndjson: bool) -> Any:
         if not matched:
             raise ConsoleInvalidJSONReceivedError(
                 f'No JSON found in command output: {received}')
 
-        data = json.loads(matched)
-        return data
+        if count == 1:
+            return json.loads(matched)
+
+        return extract_json_objects(matched, ndjson=ndjson)
+
+    def start_agent(self, python: Optional[str] = None, path: Optional[str] = None,
+                    timeout: Optional[float] = None) -> ConsoleAgent:
+        '''Deploy and start the target agent, used to run commands until stopped.
+
+        The console shell must be ready, and "python" (python3 by default)
+        available on the target. See "ConsoleAgent".
+        '''
+        self.require_open()
+        if self.agent and self.agent.running:
+            return self.agent
+
+        agent = ConsoleAgent(self, python=python, path=path)
+        agent.start(timeout=timeout)
+        self.agent = agent
+        return agent
+
+    def stop_agent(self):
+        '''Stop the target agent, and return to the console shell'''
+        agent, self.agent = self.agent, None
+        if agent:
+            agent.stop()
+
+    def require_shell(self):
+        '''Stop the target agent if running, before using the console shell directly.
+
+        The agent owns the console while running, and anything else sent
+        would corrupt its requests.
+        '''
+        if self.agent and self.agent.running:
+            self.log('Stopping the target agent to use the console shell',
+                     level=LogLevel.INFO)
+            self.stop_agent()
+
+    @property
+    def target_id(self) -> str:
+        '''Identifier of the device the console is connected to'''
+        return repr(self)
 
     @property
     def support_file_copy(self):
         return False
 
+    @property
+    def support_background_copy(self):
+        '''True if file copies use their own connection, and can run while the console is used'''
+        return False
+
     def copy_to_target(self, source, destination, timeout=30):
         raise ValueError(
             f'Console type {self} does not support copying to target')
@@ -287,6 +473,63 @@ class ConsoleBase(HardwareBase, ABC):
         raise ValueError(
             f'Console type {self} does not support copying from target')
 
+    def copy_files_to_target(self, sources: List[str], destination: str, timeout=30,
+                             compression_level: Optional[int] = None) -> int:
+        '''Copy files to the "destination" directory on the target, and return the bytes copied.
+
+        Consoles able to send all files in a single transfer override this
+        method, and use "compression_level" (1-9, None to disable) if supported.
+        Files are otherwise copied one by one with "copy_to_target".
+        '''
+        copied = 0
+        for source in sources:
+            self.copy_to_target(source=source, destination=destination, timeout=timeout)
+            copied += os.path.getsize(source)
+
+        return copied
+
+    def archive_to_host(self, patterns: List[str], destination: str, timeout=30,
+                        compression_level: int = 6) -> int:
+        '''Pull the target files matching shell glob "patterns" to "destination" on the host.
+
+        The files are stored as a single gzipped tar archive, and patterns
+        matching no file are ignored. Return the archive size. Consoles able
+        to stream the archive override this method, it is otherwise written
+        to a temporary file on the target, and copied with "copy_to_host".
+        '''
+        if not self.support_file_copy:
+            raise ValueError(f'Console type {self} does not support copying from target')
+
+        self.require_shell()
+        archive_id = uuid.uuid4().hex[:12]
+        archive = f'/tmp/pluma-archive-{archive_id}.tar.gz'
+        # Markers quoted in the command, so that its echo does not match them
+        done_marker = f'pluma-archived-{archive_id}'
+        error_marker = f'pluma-archive-error-{archive_id}'
+        command = f'{self.archive_command(patterns, compression_level)} > {archive}' \
+            f' && echo pluma-archived-"{archive_id}"' \
+            f' || echo pluma-archive-error-"{archive_id}"'
+
+        try:
+            _, matched = self.send_and_expect(
+                command, match=[Literal(done_marker), Literal(error_marker)], timeout=timeout)
+            if matched != done_marker:
+                raise ConsoleError(f'Failed to archive {patterns} on the target: '
+                                   f'{"timeout" if matched is None else "archive error"}')
+
+            self.copy_to_host(archive, destination, timeout=timeout)
+        finally:
+            self.send_and_expect(f'rm -f {archive}; echo pluma-removed-"{archive_id}"',
+                                 match=Literal(f'pluma-removed-{archive_id}'))
+
+        return os.path.getsize(destination)
+
+    @staticmethod
+    def archive_command(patterns: List[str], compression_level: int = 6) -> str:
+        '''Return the shell command writing the files matching "patterns" as a gzipped tar'''
+        # Patterns are left unquoted, to be expanded by the target shell
+        return f'tar -cf - {" ".join(patterns)} 2>/dev/null | gzip -{compression_level}'
+
     @property
     def requires_login(self):
         return self._requires_login
@@ -299,6 +542,7 @@ class ConsoleBase(HardwareBase, ABC):
             raise ConsoleError('Trying to wait for prompt, but no prompt regex set. '
                                'Set a valid prompt regex for the console')
 
+        self.require_shell()
         self.log(f'Waiting for prompt "{prompt_regex}" for {timeout}s')
         match_result = self.engine.wait_for_match(match=prompt_regex, timeout=timeout)
         if not match_result.regex_matched:
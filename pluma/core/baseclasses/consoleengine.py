@@ -1,17 +1,36 @@
+import asyncio
+import codecs
+import bisect
 import os
+import threading
+import time
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import List, IO, Optional, Union
+from select import select
+from typing import Callable, Generator, List, IO, Optional, Tuple, Union
 
-from pluma.utils import datetime_to_timestamp
-from .consoleexceptions import ConsoleCannotOpenError
-from .logging import Logger
+from serial import Serial
+
+from pluma.utils import datetime_to_timestamp, RingBuffer
+from .consoleexceptions import ConsoleCannotOpenError, ConsoleWatchError
+from .consolematcher import ConsoleMatcher, MatchSearch, get_matcher
+from .consolewatcher import ConsoleWatcher, WatchEvent
+from .rawlogwriter import LogRotation, RawLogWriter
+from .logging import Logger, LogLevel
 
 log = Logger()
 
+DEFAULT_RING_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Data received within this duration is indexed as received at once, in seconds
+RECEPTION_TIME_RESOLUTION = 0.01
+# Maximum number of entries in the reception time index
+RECEPTION_TIME_INDEX_SIZE = 65536
+
 
 class ConsoleType(Enum):
     Process = 0
@@ -25,9 +44,56 @@ class MatchResult:
     text_received: str
 
 
+@dataclass(frozen=True)
+class SendPacing:
+    '''Pacing of the data sent, for targets dropping data received too fast.
+
+    Data is sent in chunks of "chunk_size" bytes, with "delay" seconds
+    between them. With "echo", each chunk is only sent once the previous one
+    was echoed by the target, waiting at most "echo_timeout" seconds.
+    '''
+    chunk_size: int = 16
+    delay: float = 0
+    echo: bool = False
+    echo_timeout: float = 1
+
+    def __post_init__(self):
+        if self.chunk_size < 1:
+            raise ValueError('Send pacing "chunk_size" must be a positive number of bytes, '
+                             f'but got {self.chunk_size}')
+        if self.delay < 0 or self.echo_timeout <= 0:
+            raise ValueError('Send pacing "delay" and "echo_timeout" must be positive, '
+                             f'but got {self.delay} and {self.echo_timeout}')
+
+
+@dataclass
+class _WatchState:
+    watcher: ConsoleWatcher
+    # Absolute offsets up to which data was searched, and from which a new match can start
+    searched_end: int
+    match_start: int
+
+
 class ConsoleEngine(ABC):
+    '''Base class for the transport of console data.
+
+    All data received is stored as bytes in a bounded reception buffer, of at
+    most "ring_buffer_size" bytes, and decoded only when text is requested.
+    The buffer is filled when reading or waiting for data, or continuously by
+    a thread if "background_reader" is enabled. Data received is also
+    searched by the console watchers added (see "ConsoleWatcher").
+
+    The buffer keeps a history of the data received, already read or not,
+    indexed by absolute offset and by time of reception (see "offset_at").
+    Matches can be searched in it from a chosen offset (see "wait_for_match").
+    '''
+
+    # Maximum time the background reader waits for data before checking if it should stop
+    READER_POLL_INTERVAL = 0.1
+
     def __init__(self, linesep: Optional[str] = None, encoding: Optional[str] = None,
-                 raw_logfile: Optional[str] = None):
+                 raw_logfile: Optional[str] = None, background_reader: bool = False,
+                 ring_buffer_size: Optional[int] = None):
         timestamp = datetime_to_timestamp(datetime.now())
         default_raw_logfile = os.path.join(
             '/tmp', 'pluma',
@@ -36,25 +102,52 @@ class ConsoleEngine(ABC):
         self.linesep = linesep or '\n'
         self.encoding = encoding or 'ascii'
         self.raw_logfile = raw_logfile or default_raw_logfile
-        self._raw_logfile_io = None
+        # Optional rotation of the raw log file, for long running sessions
+        self.raw_log_rotation: Optional[LogRotation] = None
+        self._raw_logfile_io: Optional[RawLogWriter] = None
         self._console_type = None
-        self._reception_buffer = ''
+
+        self._reception_buffer = RingBuffer(ring_buffer_size or DEFAULT_RING_BUFFER_SIZE)
+        # Absolute offset of the first byte received but not read yet
+        self._read_offset = 0
+        # Absolute offset of the end of the last match, searches never start before it
+        self._last_match_end = 0
+        self._reception_condition = threading.Condition()
+        # Time of reception, and absolute offset, of the data received
+        self._reception_times: List[float] = []
+        self._reception_offsets: List[int] = []
+
+        # Console watchers, and error of the last fatal match not raised yet
+        self._watches: List[_WatchState] = []
+        self._watch_error: Optional[ConsoleWatchError] = None
+        # Called with the error of each fatal match, e.g. to abort tasks using other consoles
+        self.watch_error_listeners: List[Callable[[ConsoleWatchError], None]] = []
+
+        # Optional pacing of the data sent, and throughput of the last paced send, in B/s
+        self.send_pacing: Optional[SendPacing] = None
+        self.last_send_throughput: Optional[float] = None
+
+        # Optional thread draining the console continuously into the reception buffer
+        self.background_reader = background_reader
+        self._reader_thread: Optional[threading.Thread] = None
+        self._reader_stop = threading.Event()
 
     @property
     def console_type(self):
         return self._console_type
 
+    @property
+    def raw_log_writer(self) -> Optional[RawLogWriter]:
+        '''Writer of the raw log file while the console is open, to log other console data'''
+        return self._raw_logfile_io
+
     def open(self, console_cmd: Optional[str] = None, console_fd: Optional[int] = None):
         if (console_cmd is None and console_fd is None) or (
                 console_cmd is not None and console_fd is not None):
             raise ValueError('Either "console_cmd" or "console_fd" must be provided.')
 
         if self.raw_logfile:
-            dirpath = os.path.dirname(self.raw_logfile)
-            if dirpath:
-                os.makedirs(dirpath, exist_ok=True)
-
-            self._raw_logfile_io = open(self.raw_logfile, 'wb')
+            self._raw_logfile_io = RawLogWriter(self.raw_logfile, rotation=self.raw_log_rotation)
 
         try:
             if console_cmd is not None:
@@ -68,8 +161,18 @@ class ConsoleEngine(ABC):
 
             assert self.is_open
         except Exception:
+            if self._raw_logfile_io:
+                self._raw_logfile_io.close()
+                self._raw_logfile_io = None
             raise ConsoleCannotOpenError
 
+        if self.background_reader:
+            self.start_background_reader()
+
+    def open_serial(self, serial: Serial):
+        '''Open an opened pyserial port as the console'''
+        self.open(console_fd=serial.fileno())
+
     @abstractmethod
     def _open_process(self, command: str, log_file: Optional[IO] = None):
         '''Open a console by spawning a process'''
@@ -85,16 +188,17 @@ class ConsoleEngine(ABC):
 
     def close(self):
         '''Close the console.'''
-        if not self.is_open:
-            return
+        if self.is_open:
+            self.stop_background_reader()
 
-        if self.console_type is ConsoleType.Process:
-            self._close_process()
-        elif self.console_type is ConsoleType.FileDescriptor:
-            self._close_fd()
-        else:
-            raise Exception(f'Unknown console_type {self.console_type}')
+            if self.console_type is ConsoleType.Process:
+                self._close_process()
+            elif self.console_type is ConsoleType.FileDescriptor:
+                self._close_fd()
+            else:
+                raise Exception(f'Unknown console_type {self.console_type}')
 
+        # Also done if the console closed on its own (e.g. process exited)
         if self._raw_logfile_io:
             self._raw_logfile_io.close()
             self._raw_logfile_io = None
@@ -119,38 +223,490 @@ class ConsoleEngine(ABC):
         '''Send data and a line break on the console.'''
         self.send(data+self.linesep)
 
+    def fileno(self) -> Optional[int]:
+        '''Return the file descriptor used to read from the console, if any'''
+        return None
+
+    @property
+    def background_reader_running(self) -> bool:
+        '''Return whether the background reader thread is draining the console'''
+        return bool(self._reader_thread and self._reader_thread.is_alive())
+
+    def start_background_reader(self):
+        '''Start draining the console continuously into the reception buffer'''
+        assert self.is_open
+        if self.background_reader_running:
+            return
+
+        self._reader_stop.clear()
+        self._reader_thread = threading.Thread(target=self._background_reader_loop,
+                                               name=f'{self.__class__.__name__}-reader',
+                                               daemon=True)
+        self._reader_thread.start()
+
+    def stop_background_reader(self):
+        '''Stop the background reader, keeping data received but not read yet'''
+        if not self._reader_thread:
+            return
+
+        self._reader_stop.set()
+        self._reader_thread.join()
+        self._reader_thread = None
+
+    @contextmanager
+    def background_reader_paused(self):
+        '''Context manager stopping the background reader temporarily,
+        to let something else read directly from the console'''
+        was_running = self.background_reader_running
+        self.stop_background_reader()
+        try:
+            yield
+        finally:
+            if was_running and self.is_open:
+                self.start_background_reader()
+
+    def _background_reader_loop(self):
+        while not self._reader_stop.is_set() and self.is_open:
+            if not self._wait_readable(self.READER_POLL_INTERVAL):
+                continue
+
+            data = self._read_from_console()
+            if not data:
+                # Readable without data (e.g. hang-up), avoid spinning
+                time.sleep(self.READER_POLL_INTERVAL)
+                continue
+
+            self._receive(data)
+
+    def _wait_readable(self, timeout: float) -> bool:
+        '''Wait at most "timeout" for data to be readable on the console'''
+        fd = self.fileno()
+        if fd is None:
+            time.sleep(min(timeout, 0.01))
+            return True
+
+        try:
+            readable, __, __ = select([fd], [], [], timeout)
+        except (OSError, ValueError):
+            return False
+
+        return bool(readable)
+
+    def _receive(self, data: bytes):
+        '''Store data received from the console, search it with the watchers,
+        and notify waiting readers'''
+        if not data:
+            return
+
+        with self._reception_condition:
+            self._index_reception_time()
+            self._reception_buffer.append(data)
+            pending_error = self._watch_error
+            events = self._search_watchers() if self._watches else []
+            new_error = self._watch_error if self._watch_error is not pending_error else None
+            self._reception_condition.notify_all()
+
+        for event in events:
+            self._on_watch_event(event)
+
+        if new_error:
+            for listener in list(self.watch_error_listeners):
+                try:
+                    listener(new_error)
+                except Exception as e:
+                    log.error(f'Console watch error listener failed: {e}')
+
+    def _index_reception_time(self):
+        '''Index the time of the data about to be received. Requires the reception lock.'''
+        now = time.time()
+        times, offsets = self._reception_times, self._reception_offsets
+        if times and now - times[-1] < RECEPTION_TIME_RESOLUTION:
+            return
+
+        times.append(now)
+        offsets.append(self._reception_buffer.end)
+
+        # Drop the oldest entries, once out of the buffer or too many
+        if len(offsets) > RECEPTION_TIME_INDEX_SIZE:
+            del times[:RECEPTION_TIME_INDEX_SIZE // 4]
+            del offsets[:RECEPTION_TIME_INDEX_SIZE // 4]
+        elif len(offsets) > 1024 and offsets[1024] <= self._reception_buffer.start:
+            index = bisect.bisect_right(offsets, self._reception_buffer.start) - 1
+            del times[:index]
+            del offsets[:index]
+
+    @property
+    def reception_offset(self) -> int:
+        '''Absolute offset of the next byte to be received'''
+        with self._reception_condition:
+            return self._reception_buffer.end
+
+    def offset_at(self, timestamp: float) -> int:
+        '''Return the absolute offset of the first byte received at or after "timestamp".
+
+        The offset is earlier by up to "RECEPTION_TIME_RESOLUTION" seconds of
+        data received, and is at most the oldest offset still in the history.
+        '''
+        with self._reception_condition:
+            times, offsets = self._reception_times, self._reception_offsets
+            index = bisect.bisect_right(times, timestamp) - 1
+            if index < 0 or timestamp - times[index] >= RECEPTION_TIME_RESOLUTION:
+                index += 1
+
+            offset = offsets[index] if index < len(offsets) else self._reception_buffer.end
+            return max(offset, self._reception_buffer.start)
+
+    @property
+    def watchers(self) -> List[ConsoleWatcher]:
+        '''Console watchers searching the data received'''
+        with self._reception_condition:
+            return [watch.watcher for watch in self._watches]
+
+    def add_watcher(self, watcher: ConsoleWatcher):
+        '''Search the data received from now on with "watcher"'''
+        with self._reception_condition:
+            if any(watch.watcher is watcher for watch in self._watches):
+                return
+
+            end = self._reception_buffer.end
+            self._watches.append(_WatchState(watcher=watcher, searched_end=end, match_start=end))
+
+    def remove_watcher(self, watcher: ConsoleWatcher):
+        '''Stop searching the data received with "watcher"'''
+        with self._reception_condition:
+            self._watches = [watch for watch in self._watches if watch.watcher is not watcher]
+
+    def _search_watchers(self) -> List[WatchEvent]:
+        '''Search the data received with the watchers. Requires the reception lock.'''
+        events = []
+        for watch in self._watches:
+            # Only new data is searched, along with the overlap of matches spanning chunks
+            start = max(self._reception_buffer.start, watch.match_start,
+                        watch.searched_end - watch.watcher.matcher.overlap)
+            data = self._reception_buffer.read(start)
+            for found in watch.watcher.search(data,
+                                              new_data_start=max(0, watch.searched_end - start)):
+                event = watch.watcher.record(found.pattern, self.decode(found.text),
+                                             offset=start + found.start)
+                events.append(event)
+                watch.match_start = start + found.end
+                if watch.watcher.fatal and not self._watch_error:
+                    self._watch_error = ConsoleWatchError(event)
+
+            watch.searched_end = self._reception_buffer.end
+
+        return events
+
+    def _on_watch_event(self, event: WatchEvent):
+        log.log(f'{self.__class__.__name__}: console watcher {event.watcher.name} matched '
+                f'"{event.text.strip()}"', level=LogLevel.WARNING if event.watcher.fatal
+                else LogLevel.INFO)
+
+        if event.watcher.callback:
+            try:
+                event.watcher.callback(event)
+            except Exception as e:
+                log.error(f'Console watcher {event.watcher.name} callback failed: {e}')
+
+    def post_watch_error(self, error: ConsoleWatchError):
+        '''Raise "error" into the task using the console, as for a fatal match on it'''
+        with self._reception_condition:
+            if not self._watch_error:
+                self._watch_error = error
+            self._reception_condition.notify_all()
+
+    def _raise_watch_error(self):
+        '''Raise the error of a fatal watcher match, once, unless already raised
+        by another console it was posted to'''
+        with self._reception_condition:
+            error, self._watch_error = self._watch_error, None
+
+        if error and not error.raised:
+            error.raised = True
+            raise error
+
+    def _receive_from_console(self):
+        '''Read data pending on the console, unless the background reader does'''
+        if not self.background_reader_running:
+            self._receive(self._read_from_console())
+
+    def wait_for_data(self, timeout: float) -> bool:
+        '''Wait at most "timeout" for new data to be received on the console.
+
+        Data received is kept in the reception buffer. Return True as soon as
+        data is received, or False if none was received before the timeout.
+        Raise a "ConsoleWatchError" if a fatal console watcher matched.
+        '''
+        assert self.is_open
+        self._raise_watch_error()
+
+        if self.background_reader_running:
+            with self._reception_condition:
+                initial_end = self._reception_buffer.end
+                received = self._reception_condition.wait_for(
+                    lambda: self._reception_buffer.end > initial_end or self._watch_error,
+                    max(timeout, 0))
+            self._raise_watch_error()
+            return bool(received)
+
+        if not self._wait_readable(max(timeout, 0)):
+            return False
+
+        received = self._read_from_console()
+        if not received:
+            if self.fileno() is not None:
+                # Readable without data (e.g. hang-up), avoid spinning
+                time.sleep(min(max(timeout, 0), 0.01))
+            return False
+
+        self._receive(received)
+        self._raise_watch_error()
+        return True
+
+    def _write_paced(self, data: bytes, write: Callable[[bytes], None]):
+        '''Write data with "write", paced as set by "send_pacing"'''
+        pacing = self.send_pacing
+        if not pacing:
+            write(data)
+            return
+
+        start = time.time()
+        with self._reception_condition:
+            echo_end = self._reception_buffer.end
+        wait_for_echo = pacing.echo
+
+        for chunk_start in range(0, len(data), pacing.chunk_size):
+            if chunk_start and pacing.delay:
+                time.sleep(pacing.delay)
+
+            chunk = data[chunk_start:chunk_start + pacing.chunk_size]
+            write(chunk)
+            if wait_for_echo:
+                echo_end = self._wait_for_echo(chunk, echo_end, pacing.echo_timeout)
+                if echo_end is None:
+                    # Not echoing (e.g. echo disabled), do not wait for the next chunks
+                    log.warning(f'{self.__class__.__name__}: no echo received within '
+                                f'{pacing.echo_timeout}s, sending without waiting for echo')
+                    wait_for_echo = False
+
+        duration = time.time() - start
+        self.last_send_throughput = len(data) / duration if duration > 0 else None
+        log.debug(f'{self.__class__.__name__}: sent {len(data)}B in {duration:.3f}s'
+                  + (f' ({self.last_send_throughput:.0f}B/s)'
+                     if self.last_send_throughput else ''))
+
+    def _wait_for_echo(self, chunk: bytes, since: int, timeout: float) -> Optional[int]:
+        '''Wait for the echo of "chunk" received after "since", without consuming it.
+
+        Return the absolute offset of the end of the echo, or None on timeout.
+        Line breaks are echoed differently by terminals, so only the last line
+        of the chunk is looked for, or any data if the chunk is line breaks only.
+        '''
+        lines = [line for line in chunk.replace(b'\r', b'\n').split(b'\n') if line]
+        expected = lines[-1] if lines else b''
+
+        deadline = time.time() + timeout
+        while True:
+            self._receive_from_console()
+            with self._reception_condition:
+                search_start = max(since, self._reception_buffer.start)
+                received = self._reception_buffer.read(search_start)
+
+            found = received.find(expected)
+            if found >= 0 and (expected or received):
+                return search_start + found + max(len(expected), 1)
+
+            remaining = deadline - time.time()
+            if remaining <= 0 or not self.is_open:
+                return None
+
+            self.wait_for_data(min(remaining, self.READER_POLL_INTERVAL))
+
+    def _unread_start(self) -> int:
+        '''Return the absolute offset of the data not read yet. Requires the reception lock.'''
+        if self._read_offset < self._reception_buffer.start:
+            log.debug(f'{self.__class__.__name__}: reception buffer full, '
+                      f'{self._reception_buffer.start - self._read_offset}B discarded')
+            self._read_offset = self._reception_buffer.start
+
+        return self._read_offset
+
+    def _unread(self) -> bytes:
+        '''Return the data received but not read yet. Requires the reception lock.'''
+        return self._reception_buffer.read(self._unread_start())
+
+    def _decode_complete(self, data: bytes) -> Tuple[str, int]:
+        '''Decode data, leaving out an incomplete trailing multi-byte character.
+
+        Return the text decoded, and the number of bytes it was decoded from.
+        '''
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        text = decoder.decode(data, final=False)
+        pending, __ = decoder.getstate()
+        return text, len(data) - len(pending)
+
     def read_all(self, preserve_read_buffer: bool = False):
         '''Read and return all data available on the console'''
         assert self.is_open
 
-        self._reception_buffer += self._read_from_console()
-        received = self._reception_buffer
-
-        if not preserve_read_buffer:
-            if self._reception_buffer.strip():
-                log.debug(f'<<flushed>>{self._reception_buffer}<</flushed>>')
-            self._reception_buffer = ''
+        self._receive_from_console()
+        self._raise_watch_error()
+        with self._reception_condition:
+            received, size = self._decode_complete(self._unread())
+            if not preserve_read_buffer:
+                self._read_offset += size
+                if received.strip():
+                    log.debug(f'<<flushed>>{received}<</flushed>>')
 
         return received
 
     @abstractmethod
-    def _read_from_console(self) -> str:
+    def _read_from_console(self) -> bytes:
         '''Read and return all data available on the console'''
 
-    @abstractmethod
-    def wait_for_match(self, match: Union[str, List[str]],
-                       timeout: Optional[int] = None) -> MatchResult:
-        '''Wait a maximum duration of 'timeout' for a matching regex'''
+    @property
+    def default_match_timeout(self) -> float:
+        '''Time waiting for a match when no timeout is given'''
+        return 0
+
+    def wait_for_match(self, match: Union[str, List[str], ConsoleMatcher],
+                       timeout: Optional[float] = None,
+                       since: Optional[int] = None) -> MatchResult:
+        '''Wait a maximum duration of 'timeout' for a matching regex.
+
+        "match" can be a pattern, a list of patterns, or a matcher (e.g. "PatternMatcher").
+        Data is searched incrementally as it is received, and consumed up to
+        the end of the match. Nothing is consumed if no match is found.
+
+        Data not read yet is searched by default, or with "since", all the
+        data from this absolute offset (see "reception_offset" and
+        "offset_at"), read already or not, as far as the history goes, but
+        not before the end of the previous match.
+        '''
+        steps = self._match_steps(match, timeout, since)
+        try:
+            while True:
+                self.wait_for_data(next(steps))
+        except StopIteration as done:
+            return done.value
+
+    async def wait_for_match_async(self, match: Union[str, List[str], ConsoleMatcher],
+                                   timeout: Optional[float] = None,
+                                   since: Optional[int] = None) -> MatchResult:
+        '''Asynchronous version of "wait_for_match"'''
+        steps = self._match_steps(match, timeout, since)
+        try:
+            while True:
+                await self.wait_for_data_async(next(steps))
+        except StopIteration as done:
+            return done.value
+
+    def _match_steps(self, match: Union[str, List[str], ConsoleMatcher],
+                     timeout: Optional[float],
+                     since: Optional[int]) -> Generator[float, None, MatchResult]:
+        '''Search for a match as data is received, for "wait_for_match" and its
+        asynchronous version.
+
+        Yield the time to wait for data before searching again, and return
+        the result once matched, timed out, or closed.
+        '''
+        assert self.is_open
+
+        timeout = timeout or self.default_match_timeout
+        matcher = get_matcher(match, encoding=self.encoding)
+        search = matcher.start_search()
+        log.debug(f'Waiting up to {timeout}s for patterns: {list(matcher.patterns)}...')
+
+        deadline = time.time() + timeout
+        # Absolute offset up to which the data received has been searched
+        searched_end = 0
+        eof = False
+        self._receive_from_console()
+        while True:
+            result, searched_end = self._search_unread(matcher, search, searched_end, since)
+            remaining = deadline - time.time()
+            if result:
+                return result
+
+            if remaining <= 0 or eof:
+                log.debug('No match found before timeout or EOF')
+                return self._unmatched_result(since)
+
+            if self.is_open:
+                yield min(remaining, self.READER_POLL_INTERVAL)
+            else:
+                # Closed on its own (e.g. process exited), search the data left to read
+                self._receive_from_console()
+                eof = True
+
+    def _search_unread(self, matcher: ConsoleMatcher, search: MatchSearch, searched_end: int,
+                       since: Optional[int] = None) -> Tuple[Optional[MatchResult], int]:
+        '''Search the data received and not read yet, or since "since", past what was
+        already searched, with the "search" of "matcher" started by the wait.
+
+        Consume the data up to the end of the match if found. Return the
+        result, or None if not found, and the absolute offset up to which
+        the data was searched.
+        '''
+        with self._reception_condition:
+            start = self._search_start(since)
+            # Only new data is searched, along with the overlap of matches spanning it,
+            # and one more byte so that anchors do not match at the start of the window
+            window_start = max(start, searched_end - matcher.overlap - 1)
+            data = self._reception_buffer.read(window_start)
+            found = search(data, new_data_start=max(0, searched_end - window_start),
+                           offset=window_start)
+            if not found:
+                return None, window_start + len(data)
+
+            end = window_start + found.end
+            self._read_offset = max(self._read_offset, end)
+            self._last_match_end = max(self._last_match_end, end)
+            log.debug(f'Matched {found.pattern}')
+            return (MatchResult(regex_matched=found.pattern,
+                                text_matched=self.decode(found.text),
+                                text_received=self.decode(self._reception_buffer.read(start,
+                                                                                      end))),
+                    end)
+
+    def _unmatched_result(self, since: Optional[int] = None) -> MatchResult:
+        '''Result of a wait without match, with the data searched'''
+        with self._reception_condition:
+            received = self._reception_buffer.read(self._search_start(since))
+
+        return MatchResult(regex_matched=None, text_matched=None,
+                           text_received=self.decode(received))
+
+    def _search_start(self, since: Optional[int] = None) -> int:
+        '''Absolute offset from which matches are searched. Requires the reception lock.'''
+        if since is None:
+            return self._unread_start()
+
+        # Data up to the end of a previous match is not searched again, so that the
+        # same output (e.g. a prompt) does not match successive waits
+        return max(since, self._last_match_end, self._reception_buffer.start)
+
+    async def wait_for_data_async(self, timeout: float) -> bool:
+        '''Asynchronous version of "wait_for_data".
+
+        Waits in a thread of the event loop executor by default, engines
+        able to wait in the event loop itself should override it.
+        '''
+        return await asyncio.get_event_loop().run_in_executor(None, self.wait_for_data, timeout)
 
     @property
     def reception_buffer_size(self) -> int:
-        '''Size of the reception buffer for the console'''
-        return len(self._reception_buffer)
+        '''Size of the reception buffer for the console, in bytes'''
+        with self._reception_condition:
+            return self._reception_buffer.end - max(self._read_offset,
+                                                    self._reception_buffer.start)
 
     @property
     def reception_buffer(self) -> str:
         '''Content of the reception buffer'''
-        return self._reception_buffer
+        with self._reception_condition:
+            received, __ = self._decode_complete(self._unread())
+            return received
 
     @abstractmethod
     def interact(self):
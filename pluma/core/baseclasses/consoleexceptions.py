@@ -16,3 +16,21 @@ class ConsoleExceptionKeywordReceivedError(ConsoleError):
 
 class ConsoleInvalidJSONReceivedError(ConsoleError):
     pass
+
+
+class ConsoleAgentError(ConsoleError):
+    '''Error returned by the target agent, or failure to communicate with it'''
+
+    def __init__(self, message: str, code: int = None):
+        super().__init__(message)
+        self.code = code
+
+
+class ConsoleWatchError(ConsoleError):
+    '''Fatal pattern received on the console, found by a console watcher'''
+
+    def __init__(self, event):
+        super().__init__(f'Console watcher {event.watcher.name} matched "{event.text.strip()}"')
+        self.event = event
+        # Set once raised, so that an error posted to several consoles fails a single task
+        self.raised = False
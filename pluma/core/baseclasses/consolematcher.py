@@ -0,0 +1,161 @@
+import re
+import sys
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable, Optional, Tuple, Union
+
+from pluma.utils import AhoCorasick
+
+try:
+    from re import _parser as sre_parse  # type: ignore
+except ImportError:
+    import sre_parse  # type: ignore
+
+
+class Literal(str):
+    '''Pattern matched as a literal string, rather than as a regex.
+
+    Literals are all searched at once with an Aho-Corasick automaton, which
+    scales to large sets of keywords (e.g. kernel failure messages).
+    '''
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({super().__repr__()})'
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    pattern: str
+    start: int
+    end: int
+    text: bytes
+
+
+# Search of a single wait, called as "ConsoleMatcher.search", and with "offset",
+# the absolute offset of the data in the console stream
+MatchSearch = Callable[..., Optional[PatternMatch]]
+
+
+class ConsoleMatcher(ABC):
+    '''Base of the matchers searched by console waits in the bytes received.
+
+    Matchers are immutable, and can be shared between consoles and threads.
+    A wait searches the data with the function returned by "start_search",
+    which keeps the state of that search, if any. The data given to it is
+    the new data, preceded by at least "overlap" bytes already searched.
+    '''
+    patterns: Tuple[str, ...]
+    # Length of the data already searched to search again with new data
+    overlap: int
+
+    @abstractmethod
+    def search(self, data: bytes, new_data_start: int = 0) -> Optional[PatternMatch]:
+        '''Return the earliest match in "data", or None'''
+
+    def start_search(self) -> MatchSearch:
+        '''Return the function searching the data of a single wait'''
+        def search(data: bytes, new_data_start: int = 0,
+                   offset: int = 0) -> Optional[PatternMatch]:
+            return self.search(data, new_data_start=new_data_start)
+
+        return search
+
+
+class PatternMatcher(ConsoleMatcher):
+    '''Set of regex patterns compiled once, and searched incrementally in received bytes.
+
+    Patterns are matched against the raw bytes received with "re.DOTALL", as
+    pexpect does. When the data searched extends data already searched, only
+    the new data is scanned, along with an overlap long enough to find the
+    matches spanning both. This overlap is the maximum length of a match for
+    bounded patterns. Patterns whose match length is not bounded (e.g.
+    "abc.*def") search all the data again, as pexpect does, unless
+    "search_window" bounds the overlap, e.g. for patterns matching short
+    texts in large outputs.
+
+    Patterns given as "Literal" are matched as literal strings, all in a
+    single pass, and can be mixed with regex patterns.
+
+    Matchers are immutable, and can be shared between consoles and threads.
+    Use `get_matcher` to reuse matchers already compiled.
+    '''
+
+    def __init__(self, patterns: Iterable[str], encoding: Optional[str] = None,
+                 search_window: Optional[int] = None):
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        self.encoding = encoding or 'ascii'
+        self.search_window = search_window
+
+        self._compiled = [(index, re.compile(pattern.encode(self.encoding), re.DOTALL))
+                          for index, pattern in enumerate(self.patterns)
+                          if not isinstance(pattern, Literal)]
+        self._literal_indexes = [index for index, pattern in enumerate(self.patterns)
+                                 if isinstance(pattern, Literal)]
+        self._literals = AhoCorasick(self.patterns[index].encode(self.encoding)
+                                     for index in self._literal_indexes)
+
+        self.overlap = max([self._max_match_length(compiled) for __, compiled in self._compiled]
+                           + [self._windowed(self._literals.max_length)])
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}{list(self.patterns)}'
+
+    def _max_match_length(self, compiled: 're.Pattern') -> int:
+        __, max_width = sre_parse.parse(compiled.pattern, compiled.flags).getwidth()
+        return self._windowed(sys.maxsize if max_width >= sre_parse.MAXREPEAT else max_width)
+
+    def _windowed(self, length: int) -> int:
+        return length if self.search_window is None else min(length, self.search_window)
+
+    def search(self, data: bytes, new_data_start: int = 0) -> Optional[PatternMatch]:
+        '''Return the earliest match in "data", or None.
+
+        "data" before "new_data_start" is expected to have been searched
+        already, with no match found, and is only partially searched again.
+        Ties between patterns are resolved in the order of the patterns.
+        '''
+        search_start = max(0, new_data_start - self.overlap)
+
+        # Earliest match found, as (start, pattern index, end)
+        best = None
+        for index, compiled in self._compiled:
+            found = compiled.search(data, search_start)
+            if found and (best is None or (found.start(), index) < best[:2]):
+                best = (found.start(), index, found.end())
+
+        if self._literal_indexes:
+            found_literal = self._literals.search(data, search_start)
+            if found_literal:
+                start, end, literal_index = found_literal
+                index = self._literal_indexes[literal_index]
+                if best is None or (start, index) < best[:2]:
+                    best = (start, index, end)
+
+        if not best:
+            return None
+
+        start, index, end = best
+        return PatternMatch(pattern=self.patterns[index], start=start, end=end,
+                            text=data[start:end])
+
+
+@lru_cache(maxsize=256)
+def _cached_matcher(patterns: Tuple[Tuple[bool, str], ...], encoding: str) -> PatternMatcher:
+    return PatternMatcher((Literal(pattern) if is_literal else pattern
+                           for is_literal, pattern in patterns), encoding=encoding)
+
+
+def get_matcher(match: Union[str, Iterable[str], ConsoleMatcher],
+                encoding: Optional[str] = None) -> ConsoleMatcher:
+    '''Return a matcher for patterns, reusing the matchers recently compiled'''
+    if isinstance(match, ConsoleMatcher):
+        return match
+
+    if isinstance(match, str):
+        match = [match]
+
+    # A literal is equal to the same string as a regex, keep them apart in the cache
+    key = tuple((isinstance(pattern, Literal), str(pattern)) for pattern in match)
+    return _cached_matcher(key, encoding or 'ascii')
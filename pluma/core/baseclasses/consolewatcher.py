@@ -0,0 +1,90 @@
+import time
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterable, List, Optional
+
+from .consolematcher import PatternMatch, PatternMatcher
+
+# Maximum length of a watcher match spanning data already searched and new data,
+# so that unbounded patterns (e.g. "Oops.*") do not search all the history again
+WATCHER_SEARCH_WINDOW = 4096
+
+
+@dataclass(frozen=True)
+class WatchEvent:
+    '''Match of a console watcher, at the absolute offset "offset" of the console stream'''
+    watcher: 'ConsoleWatcher'
+    pattern: str
+    text: str
+    offset: int
+    time: float
+
+
+class ConsoleWatcher():
+    '''Patterns searched in all the data received by the consoles it is added to.
+
+    Data is searched by the console engine as it is received, whoever reads
+    it (background reader, or a task waiting for data), whether or not it is
+    read later. Each match is recorded in "events" (the last "max_events"),
+    and passed to "callback" if set. With "fatal", a "ConsoleWatchError" is
+    raised into the task using the console, as soon as it waits for data or
+    reads it, e.g. to abort a long command on a kernel panic.
+
+    Watchers added to a board ("Board.add_watcher") raise fatal errors into
+    the tasks using any console of the board, e.g. a test running over SSH
+    on a kernel panic printed on serial, and the test runner fails the task
+    running if it did not use a console since. Data is only searched once
+    received: a console no task reads (e.g. serial while testing over SSH)
+    requires a background reader. Waits on consoles without a background
+    reader only raise the error once data is received or they time out.
+
+    Matches of unbounded patterns (e.g. "Oops.*") spanning several reads
+    are only found within "WATCHER_SEARCH_WINDOW" bytes. Callbacks are
+    called from the thread receiving the data, and must not block. A
+    watcher can be added to several consoles.
+    '''
+
+    def __init__(self, patterns: Iterable[str], name: Optional[str] = None,
+                 fatal: bool = False, callback: Optional[Callable[[WatchEvent], None]] = None,
+                 encoding: Optional[str] = None, max_events: int = 1000):
+        self.matcher = PatternMatcher(patterns, encoding=encoding,
+                                      search_window=WATCHER_SEARCH_WINDOW)
+        if not self.matcher.patterns:
+            raise ValueError('A console watcher requires at least one pattern')
+
+        self.name = name or ', '.join(self.matcher.patterns)
+        self.fatal = fatal
+        self.callback = callback
+        self.events: Deque[WatchEvent] = deque(maxlen=max_events)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.name}]'
+
+    def search(self, data: bytes, new_data_start: int = 0) -> List[PatternMatch]:
+        '''Return the successive matches in "data", which do not overlap.
+
+        As with "PatternMatcher.search", data before "new_data_start" was
+        already searched, and is only partially searched again.
+        '''
+        matches = []
+        offset = 0
+        while True:
+            found = self.matcher.search(data[offset:] if offset else data,
+                                        new_data_start=max(0, new_data_start - offset))
+            if not found:
+                return matches
+
+            matches.append(PatternMatch(pattern=found.pattern, start=offset + found.start,
+                                        end=offset + found.end, text=found.text))
+            # Empty matches must not be found again at the same offset
+            offset += max(found.end, found.start + 1)
+            if offset >= len(data):
+                return matches
+
+    def record(self, pattern: str, text: str, offset: int) -> WatchEvent:
+        '''Record a match, and return its event'''
+        event = WatchEvent(watcher=self, pattern=pattern, text=text, offset=offset,
+                           time=time.time())
+        self.events.append(event)
+        return event
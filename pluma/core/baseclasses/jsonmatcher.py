@@ -0,0 +1,272 @@
+import json
+import re
+
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from .consolematcher import ConsoleMatcher, MatchSearch, PatternMatch
+
+# Next byte of interest, outside an object, in an object, and in a string
+_OUTSIDE_REGEX = re.compile(rb'\{')
+_OBJECT_REGEX = re.compile(rb'[{}"\n]')
+_STRING_REGEX = re.compile(rb'["\\\n]')
+
+
+@dataclass(frozen=True)
+class JSONObjectMatch:
+    '''Decoded JSON object, and its offsets in the data scanned'''
+    value: Any
+    start: int
+    end: int
+
+
+class JSONStreamScanner():
+    '''Incremental extractor of the JSON objects in a stream of bytes.
+
+    Data is fed as it is received, and scanned once, in linear time. Braces
+    are tracked, ignoring those in strings, to find where top-level objects
+    start and end, and each object is then decoded with
+    "JSONDecoder.raw_decode". Anything between objects (e.g. the command
+    echo, prompts or logs) is ignored. An object which fails to decode, or
+    has a string spanning lines, is skipped, and scanning resumes just after
+    its opening brace.
+
+    With "ndjson", objects cannot span lines, so that a line with unbalanced
+    braces does not hide the following lines.
+    '''
+
+    def __init__(self, ndjson: bool = False, encoding: Optional[str] = None):
+        self.ndjson = ndjson
+        self.encoding = encoding or 'utf-8'
+        self.objects: List[JSONObjectMatch] = []
+        self._decoder = json.JSONDecoder()
+        self._buffer = bytearray()
+        # Absolute offset of the start of the buffer, and of the next byte to scan
+        self._base = 0
+        self._position = 0
+        self._reset_object()
+
+    @property
+    def scanned(self) -> int:
+        '''Number of bytes fed so far'''
+        return self._base + len(self._buffer)
+
+    @property
+    def pending_start(self) -> int:
+        '''Offset of the object being scanned, or of the end of the data scanned'''
+        return self._base
+
+    def feed(self, data: bytes) -> List[JSONObjectMatch]:
+        '''Scan data received, and return the objects it completed'''
+        self._buffer += data
+        found_count = len(self.objects)
+
+        while True:
+            found = self._next_byte()
+            if found is None:
+                break
+
+            byte = self._buffer[found - self._base]
+            self._position = found + 1
+            if self._object_start is None:
+                self._object_start = found
+                self._depth = 1
+            elif self._in_string:
+                if byte == ord('\\'):
+                    self._position += 1
+                elif byte == ord('"'):
+                    self._in_string = False
+                else:
+                    self._skip_object()
+            elif byte == ord('"'):
+                self._in_string = True
+            elif byte == ord('{'):
+                self._depth += 1
+            elif byte == ord('}'):
+                self._depth -= 1
+                if self._depth == 0:
+                    self._decode_object(end=found + 1)
+            elif self.ndjson:
+                self._skip_object()
+
+        self._discard_scanned()
+        return self.objects[found_count:]
+
+    def _next_byte(self) -> Optional[int]:
+        if self._object_start is None:
+            regex = _OUTSIDE_REGEX
+        elif self._in_string:
+            regex = _STRING_REGEX
+        else:
+            regex = _OBJECT_REGEX
+
+        found = regex.search(self._buffer, self._position - self._base)
+        return self._base + found.start() if found else None
+
+    def _decode_object(self, end: int):
+        start = self._object_start
+        text = self._buffer[start - self._base:end - self._base].decode(self.encoding,
+                                                                      errors='replace')
+        try:
+            value, decoded_end = self._decoder.raw_decode(text)
+        except ValueError:
+            decoded_end = None
+
+        if decoded_end != len(text):
+            self._skip_object()
+            return
+
+        self.objects.append(JSONObjectMatch(value=value, start=start, end=end))
+        self._reset_object()
+
+    def _skip_object(self):
+        self._position = self._object_start + 1
+        self._reset_object()
+
+    def _reset_object(self):
+        self._object_start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+
+    def _discard_scanned(self):
+        # Keep the data of the object being scanned only
+        keep_from = self._object_start if self._object_start is not None else self._position
+        keep_from = min(keep_from, self.scanned)
+        del self._buffer[:keep_from - self._base]
+        self._base = keep_from
+
+
+class JSONMatcher(ConsoleMatcher):
+    '''Matcher of "count" JSON objects, searched incrementally in received bytes.
+
+    The match spans from the start of the first object to the end of the
+    last one. The scan state is kept by the search of each wait (see
+    "start_search"), so that each byte is only scanned once. If "skip" is
+    given (e.g. the command sent), it is ignored if the data starts with it,
+    so that a JSON command echo is not matched.
+    '''
+
+    def __init__(self, count: int = 1, ndjson: bool = False, skip: Optional[str] = None,
+                 encoding: Optional[str] = None):
+        if count < 1:
+            raise ValueError(f'JSON objects count must be at least 1, but got {count}')
+
+        self.count = count
+        self.ndjson = ndjson
+        self.patterns = (f'<{count} JSON object(s)>',)
+        self.encoding = encoding or 'ascii'
+        # Searches keep the data of the objects spanning several reads
+        self.overlap = 0
+        self.skip = skip.encode(self.encoding) if skip else None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.count}]'
+
+    def search(self, data: bytes, new_data_start: int = 0) -> Optional[PatternMatch]:
+        '''Return the match in "data", scanned entirely, or None'''
+        return self.start_search()(data)
+
+    def start_search(self) -> MatchSearch:
+        return _JSONSearch(self).search
+
+
+class _JSONSearch():
+    '''Scan state of a "JSONMatcher" search, by absolute offset in the console stream.
+
+    Only the data not scanned yet is fed to the scanner. The data of the
+    objects found, and of the object being scanned, is kept for the text of
+    the match. If data was dropped before being scanned (e.g. by the
+    reception buffer), the scan starts again after it.
+    '''
+
+    def __init__(self, matcher: JSONMatcher):
+        self.matcher = matcher
+        self._scanner = JSONStreamScanner(ndjson=matcher.ndjson, encoding=matcher.encoding)
+        # Absolute offset of the first byte fed to the scanner, once the text to skip is known
+        self._scan_start: Optional[int] = None
+        # Data received until then, which may be the start of the text to skip
+        self._head = bytearray()
+        self._head_start: Optional[int] = None
+        # Data from the first object found, or from the object being scanned
+        self._kept = bytearray()
+        self._kept_start = 0
+
+    def search(self, data: bytes, new_data_start: int = 0,
+               offset: int = 0) -> Optional[PatternMatch]:
+        '''Search "data", at the absolute offset "offset". The match start is
+        negative if the first object started before "data".'''
+        if self._scan_start is None:
+            new_data = self._skip_head(data, offset)
+            if new_data is None:
+                return None
+        else:
+            fed_end = self._scan_start + self._scanner.scanned
+            if fed_end < offset:
+                self._restart_scan(offset)
+                fed_end = offset
+            new_data = data[fed_end - offset:]
+
+        return self._feed(new_data, offset)
+
+    def _skip_head(self, data: bytes, offset: int) -> Optional[bytes]:
+        '''Return the data to scan, after the text to skip, or None until known'''
+        head_end = self._head_start + len(self._head) if self._head_start is not None else None
+        if head_end is None or head_end < offset:
+            self._head, self._head_start = bytearray(), offset
+            head_end = offset
+        self._head += data[head_end - offset:]
+
+        skip_end = self._skip_end(bytes(self._head))
+        if skip_end is None:
+            return None
+
+        self._restart_scan(self._head_start + skip_end)
+        new_data = bytes(self._head[skip_end:])
+        self._head = bytearray()
+        return new_data
+
+    def _skip_end(self, head: bytes) -> Optional[int]:
+        '''Return the offset after the text to skip, or None until known'''
+        skip = self.matcher.skip
+        if not skip:
+            return 0
+
+        stripped = head.lstrip()
+        if stripped.startswith(skip):
+            return len(head) - len(stripped) + len(skip)
+
+        # Data received so far may be the start of the text to skip
+        return None if skip.startswith(stripped) else 0
+
+    def _restart_scan(self, scan_start: int):
+        self._scanner = JSONStreamScanner(ndjson=self.matcher.ndjson,
+                                          encoding=self.matcher.encoding)
+        self._scan_start = scan_start
+        self._kept = bytearray()
+        self._kept_start = scan_start
+
+    def _feed(self, new_data: bytes, offset: int) -> Optional[PatternMatch]:
+        self._kept += new_data
+        self._scanner.feed(new_data)
+
+        objects = self._scanner.objects
+        count = self.matcher.count
+        if len(objects) >= count:
+            start = self._scan_start + objects[0].start
+            end = self._scan_start + objects[count - 1].end
+            return PatternMatch(pattern=self.matcher.patterns[0], start=start - offset,
+                                end=end - offset,
+                                text=bytes(self._kept[start - self._kept_start:
+                                                      end - self._kept_start]))
+
+        keep_from = self._scan_start + (objects[0].start if objects
+                                        else self._scanner.pending_start)
+        del self._kept[:keep_from - self._kept_start]
+        self._kept_start = keep_from
+        return None
+
+
+def extract_json_objects(text: str, ndjson: bool = False) -> List[Any]:
+    '''Return the JSON objects found in text'''
+    scanner = JSONStreamScanner(ndjson=ndjson)
+    return [found.value for found in scanner.feed(text.encode(scanner.encoding))]
@@ -1,9 +1,10 @@
 import datetime
 import os
 import textwrap
+import threading
 
 from enum import Enum, IntEnum
-from typing import Iterable, Union, Optional, Type
+from typing import Iterable, List, Union, Optional, Type
 from pluma.utils import datetime_to_timestamp
 
 from .hierarchy import hier_setter
@@ -82,6 +83,9 @@ class Logger(Singleton):
 
     Handles the text formatting and what to output
     based on log levels and log mode.
+
+    The output can be held by each thread (see `hold`), so that the output
+    of threads running concurrently does not interleave.
     '''
 
     def __init__(self):
@@ -90,8 +94,26 @@ class Logger(Singleton):
 
         self._initialized = True
         self.mode = LogMode.NORMAL
-        self.held = False
-        self.log_buffer = ''
+        # Buffers of the output held by the current thread, innermost last
+        self._thread_state = threading.local()
+        self._print_lock = threading.Lock()
+
+    @property
+    def _held_buffers(self) -> List[str]:
+        if not hasattr(self._thread_state, 'buffers'):
+            self._thread_state.buffers = []
+        return self._thread_state.buffers
+
+    @property
+    def held(self) -> bool:
+        '''True if the output of the current thread is held'''
+        return bool(self._held_buffers)
+
+    @property
+    def log_buffer(self) -> str:
+        '''Output held by the current thread, in the innermost hold'''
+        buffers = self._held_buffers
+        return buffers[-1] if buffers else ''
 
     def log(self, message: Union[str, Iterable[str]], color: str = None,
             bold: bool = False, newline: bool = True, indent: int = 0,
@@ -149,21 +171,35 @@ class Logger(Singleton):
         if newline:
             message += os.linesep
 
-        if self.held and not bypass_hold:
-            self.log_buffer += message
+        # Output bypassing the hold only bypasses the innermost one
+        self._write(message, depth=-2 if bypass_hold else -1, flush=not newline)
+
+    def _write(self, message: str, depth: int, flush: bool = False):
+        buffers = self._held_buffers
+        if len(buffers) >= -depth:
+            buffers[depth] += message
         else:
-            print(message, end='', flush=not newline)
+            with self._print_lock:
+                print(message, end='', flush=flush)
 
     def hold(self):
-        '''Hold the log output until `release` is called.'''
-        self.held = True
+        '''Hold the log output of the current thread until `release` is called.
+
+        Holds can be nested, each release flushing the output held since
+        the matching hold to the enclosing hold, if any.
+        '''
+        self._held_buffers.append('')
 
     def release(self):
         '''Flush the log, and restore log output to normal.'''
-        self.held = False
-        if self.log_buffer:
-            self._log(self.log_buffer)
-        self.log_buffer = ''
+        buffers = self._held_buffers
+        if not buffers:
+            return
+
+        message = buffers.pop()
+        if message:
+            # Printed with a line break as when not nested, enclosing holds get it as is
+            self._write(message if buffers else message + os.linesep, depth=-1)
 
 
 class Logging():
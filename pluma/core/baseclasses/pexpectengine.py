@@ -1,21 +1,34 @@
+import fcntl
+import struct
+import termios
 import pexpect
 import pexpect.fdpexpect
 
-from typing import List, IO, Optional, Union
+from typing import IO, Optional
 
-from pluma.core.baseclasses import ConsoleEngine, MatchResult
-from .logging import Logger
+from pluma.core.baseclasses import ConsoleEngine
 
-log = Logger()
+DEFAULT_READ_CHUNK_SIZE = 64 * 1024
 
 
 class PexpectEngine(ConsoleEngine):
+    # Time to wait for more data before considering the console drained
+    READ_TIMEOUT = 0.01
+
     def __init__(self, linesep: Optional[str] = None, encoding: Optional[str] = None,
-                 raw_logfile: Optional[str] = None):
+                 raw_logfile: Optional[str] = None, read_chunk_size: Optional[int] = None,
+                 background_reader: bool = False, ring_buffer_size: Optional[int] = None):
         super().__init__(linesep=linesep, encoding=encoding,
-                         raw_logfile=raw_logfile)
+                         raw_logfile=raw_logfile, background_reader=background_reader,
+                         ring_buffer_size=ring_buffer_size)
+        self.read_chunk_size = read_chunk_size if read_chunk_size is not None \
+            else DEFAULT_READ_CHUNK_SIZE
         self._pex = None
 
+        if self.read_chunk_size < 1:
+            raise ValueError('"read_chunk_size" must be a positive number of bytes, '
+                             f'but got {self.read_chunk_size}')
+
     def _open_process(self, command: str, log_file: Optional[IO] = None):
         self._pex = pexpect.spawn(command, timeout=0.01, logfile=log_file)
 
@@ -28,6 +41,9 @@ class PexpectEngine(ConsoleEngine):
     def is_open(self):
         return bool(self._pex and self._pex.isalive())
 
+    def fileno(self) -> Optional[int]:
+        return self._pex.child_fd if self._pex else None
+
     def _close_fd(self):
         self._pex.close()
         self._pex = None
@@ -38,7 +54,10 @@ class PexpectEngine(ConsoleEngine):
 
     def send(self, data: str):
         assert self.is_open
-        self._pex.send(data)
+        if self.send_pacing:
+            self._write_paced(self.encode(data), self._pex.send)
+        else:
+            self._pex.send(data)
 
     def send_control(self, char: str):
         assert self.is_open
@@ -53,61 +72,49 @@ class PexpectEngine(ConsoleEngine):
         code = bytes([code_ascii_value])
         self._pex.send(code)
 
-    def _read_from_console(self) -> str:
-        received = ''
+    def _bytes_available(self) -> int:
+        '''Return the number of bytes ready to be read, or 0 if unknown'''
+        try:
+            raw_count = fcntl.ioctl(self._pex.child_fd, termios.FIONREAD,
+                                    struct.pack('I', 0))
+        except OSError:
+            return 0
+
+        return struct.unpack('I', raw_count)[0]
+
+    def _read_from_console(self) -> bytes:
+        # Read everything already pending in chunks of at most "read_chunk_size",
+        # and only wait for more data once the console has been drained.
+        # Stop once the reception buffer would be full, to not discard data.
+        if not self._pex:
+            return b''
+
+        chunks = []
+        received_size = 0
         try:
-            while 1:
-                received += self.decode(
-                    self._pex.read_nonblocking(1, 0.01))
+            while received_size < self._reception_buffer.capacity:
+                chunk_size = min(self.read_chunk_size,
+                                 self._reception_buffer.capacity - received_size)
+                available = self._bytes_available()
+                if available:
+                    chunks.append(self._pex.read_nonblocking(
+                        min(available, chunk_size), 0))
+                else:
+                    chunks.append(self._pex.read_nonblocking(
+                        chunk_size, self.READ_TIMEOUT))
+                received_size += len(chunks[-1])
         except pexpect.TIMEOUT:
             pass
         except pexpect.EOF:
             pass
 
-        return received
+        return b''.join(chunks)
 
-    def wait_for_match(self, match: Union[str, List[str]],
-                       timeout: Optional[int] = None) -> MatchResult:
-        '''Wait a maximum duration of 'timeout' for a matching regex'''
-        assert self.is_open
-
-        timeout = timeout or self._pex.timeout
-
-        if isinstance(match, str):
-            match = [match]
-
-        log.debug(f'Waiting up to {timeout}s for patterns: {match}...')
-
-        matched_regex = None
-        try:
-            index = self._pex.expect(match, timeout)
-            matched_regex = match[index]
-        except pexpect.EOF:
-            pass
-        except pexpect.TIMEOUT:
-            pass
-
-        if matched_regex:
-            log.debug(f'Matched {matched_regex}')
-        else:
-            log.debug('No match found before timeout or EOF')
-
-        # Pexpect exposes received via '.before'
-        matched_text: Optional[bytes]
-        received: bytes = self._pex.before if self._pex.before is not None else bytes()
-        if matched_regex:
-            matched_text = self._pex.after
-            received += matched_text
-        else:
-            matched_regex = None
-            matched_text = None
-
-        text_matched = self.decode(matched_text) if matched_text else None
-        text_received = self.decode(received)
-
-        return MatchResult(regex_matched=matched_regex, text_matched=text_matched,
-                           text_received=text_received)
+    @property
+    def default_match_timeout(self) -> float:
+        return self._pex.timeout if self._pex else 0
 
     def interact(self):
         assert self.is_open
-        self._pex.interact()
+        with self.background_reader_paused():
+            self._pex.interact()
@@ -0,0 +1,144 @@
+import bisect
+import gzip
+import mmap
+import os
+import struct
+
+from typing import Optional, Tuple
+
+INDEX_EXTENSION = '.idx'
+INDEX_MAGIC = b'PLMIDX01'
+# Entry: timestamp (seconds since epoch), byte offset in the log
+INDEX_ENTRY = struct.Struct('<dQ')
+
+DEFAULT_INDEX_INTERVAL_BYTES = 4096
+DEFAULT_INDEX_INTERVAL_TIME = 1.0
+
+
+def index_path(log_path: str) -> str:
+    '''Return the path of the index of a raw log file'''
+    return log_path + INDEX_EXTENSION
+
+
+class RawLogIndexWriter():
+    '''Writer of the sidecar index of a raw log, mapping timestamps to byte offsets.
+
+    An entry is added for a chunk of data if at least "interval_bytes" were
+    written, or "interval_time" seconds elapsed, since the last entry.
+    Timestamps never decrease, even if the system clock goes backwards, to
+    keep the index sorted.
+    '''
+
+    def __init__(self, path: str, append: bool = False,
+                 interval_bytes: Optional[int] = None, interval_time: Optional[float] = None):
+        self.path = path
+        self.interval_bytes = interval_bytes or DEFAULT_INDEX_INTERVAL_BYTES
+        self.interval_time = interval_time or DEFAULT_INDEX_INTERVAL_TIME
+        self._last_entry: Optional[Tuple[float, int]] = None
+
+        append = append and os.path.isfile(self.path) and os.path.getsize(self.path) > 0
+        self._file = open(self.path, 'ab' if append else 'wb')
+        if append:
+            with RawLogIndex(self.path) as index:
+                self._last_entry = index.entry(len(index) - 1) if len(index) else None
+        else:
+            self._file.write(INDEX_MAGIC)
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def add(self, timestamp: float, offset: int):
+        '''Index a chunk of data written at "offset" of the log, at "timestamp"'''
+        if self._last_entry:
+            last_timestamp, last_offset = self._last_entry
+            timestamp = max(timestamp, last_timestamp)
+            if (offset - last_offset < self.interval_bytes
+                    and timestamp - last_timestamp < self.interval_time):
+                return
+
+        self._file.write(INDEX_ENTRY.pack(timestamp, offset))
+        self._last_entry = (timestamp, offset)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class RawLogIndex():
+    '''Sidecar index of a raw log, memory mapped and searched in O(log n)'''
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(self.path, 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f'"{self.path}" is not a raw log index')
+
+            size = os.fstat(f.fileno()).st_size
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+                if size > len(INDEX_MAGIC) else None
+
+        self._count = (size - len(INDEX_MAGIC)) // INDEX_ENTRY.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, position: int) -> float:
+        '''Timestamp of an entry, to bisect the index'''
+        return self.entry(position)[0]
+
+    def entry(self, position: int) -> Tuple[float, int]:
+        '''Return the (timestamp, offset) entry at "position"'''
+        if not 0 <= position < self._count:
+            raise IndexError(f'Index entry {position} out of range')
+
+        return INDEX_ENTRY.unpack_from(self._map, len(INDEX_MAGIC) + position * INDEX_ENTRY.size)
+
+    def start_offset(self, timestamp: float) -> int:
+        '''Return the offset from which the data received at "timestamp" onwards is logged'''
+        position = bisect.bisect_right(self, timestamp) - 1
+        return self.entry(position)[1] if position >= 0 else 0
+
+    def end_offset(self, timestamp: float) -> Optional[int]:
+        '''Return the offset up to which the data received until "timestamp" is logged,
+        or None if it extends to the end of the log'''
+        position = bisect.bisect_right(self, timestamp)
+        return self.entry(position)[1] if position < self._count else None
+
+    def close(self):
+        if self._map:
+            self._map.close()
+            self._map = None
+
+
+def read_log_window(log_path: str, start: Optional[float] = None,
+                    end: Optional[float] = None) -> bytes:
+    '''Return the data of a raw log received between the timestamps "start" and "end".
+
+    The log index is used to seek directly to the window, which is extended
+    to the nearest index entries. Gzipped logs are supported, but are
+    decompressed up to the window.
+    '''
+    with RawLogIndex(index_path(log_path)) as index:
+        start_offset = index.start_offset(start) if start is not None else 0
+        end_offset = index.end_offset(end) if end is not None else None
+
+    if log_path.endswith('.gz'):
+        with gzip.open(log_path, 'rb') as f:
+            f.seek(start_offset)
+            return f.read(end_offset - start_offset if end_offset is not None else -1)
+
+    with open(log_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as log_map:
+            return log_map[start_offset:end_offset]
@@ -0,0 +1,237 @@
+import gzip
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from pluma.utils import datetime_to_timestamp
+from .logging import Logger
+from .rawlogindex import RawLogIndexWriter, index_path
+
+log = Logger()
+
+DEFAULT_MAX_QUEUE_SIZE = 4096
+
+
+@dataclass
+class LogRotation:
+    '''Rotation policy of a raw log file.
+
+    The log is rotated once it reaches "max_bytes", or after "interval"
+    seconds, whichever comes first. Rotated segments are kept next to the
+    log file, and optionally gzipped. Only the last "backup_count" segments
+    are kept, if set.
+    '''
+    max_bytes: Optional[int] = None
+    interval: Optional[float] = None
+    compress: bool = False
+    backup_count: Optional[int] = None
+
+
+class RawLogWriter():
+    '''File-like writer for raw console logs, writing to disk from a thread.
+
+    Writes are queued and return immediately, so the console never waits on
+    the disk. If the queue is full, the data is dropped and counted in
+    "dropped_bytes" rather than blocking. A single writer can be shared by
+    several sources (e.g. an engine and an interactive session).
+
+    If "index" is enabled, a sidecar index mapping the time data was received
+    to its offset in the log is written along with each log segment. See
+    "read_log_window" to extract the data from a time window.
+    '''
+
+    # Maximum time waiting for data before checking if the log should be rotated
+    POLL_INTERVAL = 1
+
+    def __init__(self, path: str, rotation: Optional[LogRotation] = None,
+                 append: bool = False, max_queue_size: Optional[int] = None,
+                 index: bool = True):
+        self.path = path
+        self.rotation = rotation or LogRotation()
+        self.dropped_bytes = 0
+
+        dirpath = os.path.dirname(self.path)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
+
+        self._file = open(self.path, 'ab' if append else 'wb')
+        self._size = self._file.tell()
+        self._segment_start = time.time()
+
+        # Only index regular files, not devices such as /dev/null
+        self.index = index and os.path.isfile(self.path)
+        self._index = RawLogIndexWriter(index_path(self.path), append=append) \
+            if self.index else None
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size or DEFAULT_MAX_QUEUE_SIZE)
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer_loop,
+                                        name=f'{self.__class__.__name__}-{os.path.basename(path)}',
+                                        daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, data: bytes) -> int:
+        '''Queue data to be written to the log, without waiting for the disk'''
+        if self._closed or not data:
+            return 0
+
+        try:
+            self._queue.put_nowait((time.time(), bytes(data)))
+        except queue.Full:
+            self.dropped_bytes += len(data)
+
+        return len(data)
+
+    def flush(self):
+        '''Does nothing, data is written by the writer thread. See "sync".'''
+
+    def sync(self, timeout: Optional[float] = None) -> bool:
+        '''Wait for the data queued so far to be written to the log file.
+
+        Return False if the data was not written within "timeout".
+        '''
+        if self._closed or not self._thread.is_alive():
+            return self._closed
+
+        written = threading.Event()
+        try:
+            self._queue.put(written, timeout=timeout)
+        except queue.Full:
+            return False
+
+        return written.wait(timeout)
+
+    def close(self):
+        '''Write the data queued, and close the log file'''
+        if self._closed:
+            return
+
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _writer_loop(self):
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.POLL_INTERVAL)
+                except queue.Empty:
+                    self._rotate_if_needed(0)
+                    continue
+
+                if item is None:
+                    break
+                elif isinstance(item, threading.Event):
+                    self._flush()
+                    item.set()
+                else:
+                    self._write(*item)
+        finally:
+            self._file.close()
+            if self._index:
+                self._index.close()
+            # Release anyone waiting for data to be written
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _flush(self):
+        self._file.flush()
+        if self._index:
+            self._index.flush()
+
+    def _write(self, timestamp: float, data: bytes):
+        self._rotate_if_needed(len(data))
+        try:
+            if self._index:
+                self._index.add(timestamp, self._size)
+            self._file.write(data)
+            # Keep the log up to date once the queue is drained
+            if self._queue.empty():
+                self._flush()
+        except OSError as e:
+            if not self.dropped_bytes:
+                log.warning(f'Failed to write raw log file "{self.path}": {e}')
+            self.dropped_bytes += len(data)
+            return
+
+        self._size += len(data)
+
+    def _rotate_if_needed(self, incoming_size: int):
+        if self._size == 0:
+            return
+
+        max_bytes = self.rotation.max_bytes
+        interval = self.rotation.interval
+        if (max_bytes and self._size + incoming_size > max_bytes) or (
+                interval and time.time() - self._segment_start >= interval):
+            try:
+                self._rotate()
+            except OSError as e:
+                log.warning(f'Failed to rotate raw log file "{self.path}": {e}')
+                if self._file.closed:
+                    self._file = open(self.path, 'ab')
+                if self._index and self._index.closed:
+                    self._index = RawLogIndexWriter(index_path(self.path), append=True)
+                # Carry on in the current file, without retrying for every write
+                self._size = 0
+                self._segment_start = time.time()
+
+    def _rotate(self):
+        self._file.close()
+        if self._index:
+            self._index.close()
+
+        segment = self._segment_path()
+        os.rename(self.path, segment)
+        final_segment = segment + '.gz' if self.rotation.compress else segment
+        if self._index:
+            os.rename(index_path(self.path), index_path(final_segment))
+
+        if self.rotation.compress:
+            with open(segment, 'rb') as source, gzip.open(final_segment, 'wb') as destination:
+                shutil.copyfileobj(source, destination)
+            os.remove(segment)
+
+        self._file = open(self.path, 'wb')
+        if self._index:
+            self._index = RawLogIndexWriter(index_path(self.path))
+        self._size = 0
+        self._segment_start = time.time()
+
+        if self.rotation.backup_count is not None:
+            for old_segment in self.segments()[:-self.rotation.backup_count or None]:
+                os.remove(old_segment)
+                if os.path.exists(index_path(old_segment)):
+                    os.remove(index_path(old_segment))
+
+    def _segment_path(self) -> str:
+        base = f'{self.path}.{datetime_to_timestamp(datetime.now())}'
+        segment = base
+        index = 1
+        while os.path.exists(segment) or os.path.exists(segment + '.gz'):
+            segment = f'{base}-{index}'
+            index += 1
+
+        return segment
+
+    def segments(self) -> List[str]:
+        '''Return the rotated segments of the log file, oldest first'''
+        dirpath = os.path.dirname(self.path) or '.'
+        pattern = re.compile(re.escape(os.path.basename(self.path))
+                             + r'\.\d{4}(-\d{2}){5}(-\d+)?(\.gz)?$')
+        segments = [os.path.join(dirpath, name) for name in os.listdir(dirpath)
+                    if pattern.match(name)]
+        return sorted(segments, key=lambda segment: (os.path.getmtime(segment), segment))
@@ -0,0 +1,128 @@
+from typing import IO, Optional
+
+from serial import Serial, SerialException
+
+from .consoleengine import ConsoleEngine, SendPacing
+from .consoleexceptions import ConsoleError
+from .pexpectengine import DEFAULT_READ_CHUNK_SIZE
+
+# Default time waiting for a match, as for file descriptors opened with PexpectEngine
+DEFAULT_MATCH_TIMEOUT = 0.5
+
+
+class SerialEngine(ConsoleEngine):
+    '''Console engine working directly on a pyserial port.
+
+    Data pending is read in bulk, based on "in_waiting", without the extra
+    buffering and polling of pexpect. Data sent can be paced for targets
+    without flow control, with "send_pacing", or its shorthand
+    "write_chunk_size" bytes per chunk with "write_delay" seconds between
+    them. Writes give up after "write_timeout" seconds, using pyserial's own
+    timeout.
+    '''
+
+    def __init__(self, linesep: Optional[str] = None, encoding: Optional[str] = None,
+                 raw_logfile: Optional[str] = None, read_chunk_size: Optional[int] = None,
+                 write_chunk_size: Optional[int] = None, write_delay: Optional[float] = None,
+                 write_timeout: Optional[float] = None, background_reader: bool = False,
+                 ring_buffer_size: Optional[int] = None):
+        super().__init__(linesep=linesep, encoding=encoding,
+                         raw_logfile=raw_logfile, background_reader=background_reader,
+                         ring_buffer_size=ring_buffer_size)
+        self.read_chunk_size = read_chunk_size if read_chunk_size is not None \
+            else DEFAULT_READ_CHUNK_SIZE
+        self.write_timeout = write_timeout
+        self._serial: Optional[Serial] = None
+        self._log_file: Optional[IO] = None
+
+        if self.read_chunk_size < 1:
+            raise ValueError('"read_chunk_size" must be a positive number of bytes, '
+                             f'but got {self.read_chunk_size}')
+
+        if write_chunk_size is not None:
+            self.send_pacing = SendPacing(chunk_size=write_chunk_size, delay=write_delay or 0)
+
+    def open_serial(self, serial: Serial):
+        self._serial = serial
+        if self.write_timeout is not None:
+            self._serial.write_timeout = self.write_timeout
+
+        self.open(console_fd=serial.fileno())
+
+    def _open_process(self, command: str, log_file: Optional[IO] = None):
+        raise ValueError(f'{self.__class__.__name__} can only open serial ports')
+
+    def _open_fd(self, fd: int, log_file: Optional[IO] = None):
+        if not self._serial or self._serial.fileno() != fd:
+            raise ValueError(f'{self.__class__.__name__} must be opened with "open_serial"')
+
+        self._log_file = log_file
+
+    @property
+    def is_open(self):
+        return bool(self._serial and self._serial.is_open)
+
+    def fileno(self) -> Optional[int]:
+        return self._serial.fileno() if self.is_open else None
+
+    def _close_fd(self):
+        self._serial.close()
+        self._serial = None
+        self._log_file = None
+
+    def _close_process(self):
+        self._close_fd()
+
+    def send(self, data: str):
+        assert self.is_open
+        self._write(self.encode(data))
+
+    def send_control(self, char: str):
+        assert self.is_open
+        if len(char) > 1:
+            raise ValueError('Only a single character can be sent as control code, '
+                             f'but got {char}')
+
+        code_ascii_value = ord(char.upper()) - ord('A') + 1
+        if code_ascii_value not in range(1, 27):
+            raise AttributeError('Control character must be A-Z')
+
+        self._write(bytes([code_ascii_value]))
+
+    def _write(self, data: bytes):
+        self._write_paced(data, self._serial.write)
+
+    def _read_from_console(self) -> bytes:
+        # Read everything pending, in chunks of at most "read_chunk_size",
+        # stopping once the reception buffer would be full.
+        if not self.is_open:
+            return b''
+
+        chunks = []
+        received_size = 0
+        try:
+            while received_size < self._reception_buffer.capacity:
+                available = self._serial.in_waiting
+                if not available:
+                    break
+
+                chunks.append(self._serial.read(min(
+                    available, self.read_chunk_size,
+                    self._reception_buffer.capacity - received_size)))
+                received_size += len(chunks[-1])
+        except (SerialException, OSError):
+            pass
+
+        received = b''.join(chunks)
+        if received and self._log_file:
+            self._log_file.write(received)
+
+        return received
+
+    @property
+    def default_match_timeout(self) -> float:
+        return DEFAULT_MATCH_TIMEOUT
+
+    def interact(self):
+        raise ConsoleError(f'{self.__class__.__name__} does not support interactive '
+                           'sessions, use the console "interact" instead')
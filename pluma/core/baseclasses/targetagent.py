@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+'''Pluma target agent, deployed and started on the target by "ConsoleAgent".
+
+Reads newline-delimited JSON-RPC 2.0 requests on stdin, and writes one
+response per line on stdout. Requests are handled in order, and responses
+carry the request "id". Binary data is base64 encoded.
+
+Commands run in a single shell kept across requests, so that the working
+directory, variables and functions set by a command are seen by the next
+ones, as in a console shell.
+
+This script only uses the Python standard library, and supports Python 3.5
+onwards, as found on targets.
+'''
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import select
+import shlex
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+VERSION = 1
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class RequestError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def encode(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def decode(text):
+    return base64.b64decode(text.encode('ascii'))
+
+
+class Shell(object):
+    '''Shell kept across commands, started again if it exits (e.g. "exit" command)'''
+
+    def __init__(self):
+        self.process = None
+
+    def start(self):
+        self.process = subprocess.Popen(['/bin/sh'], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                        start_new_session=True)
+
+    def close(self):
+        if self.process and self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            self.process.wait()
+
+        self.process = None
+
+    def run(self, command, timeout=None, input=None):
+        '''Run the command in the shell, and return its stdout, stderr and return code'''
+        if not self.process or self.process.poll() is not None:
+            self.start()
+
+        files = []
+        try:
+            files.append(write_temp_file(command.encode() + b'\n'))
+            stdin = '/dev/null'
+            if input is not None:
+                files.append(write_temp_file(input))
+                stdin = files[-1]
+
+            # Markers printed once the command is done, preceded by a line break
+            # in case the command output does not end with one
+            token = 'pluma-{}'.format(binascii.hexlify(os.urandom(8)).decode())
+            line = '. {} < {}; printf "\\n{} %d\\n" $?; printf "\\n{}\\n" >&2\n'.format(
+                shlex.quote(files[0]), shlex.quote(stdin), token, token)
+            self.process.stdin.write(line.encode())
+            self.process.stdin.flush()
+            return self._read_result(token.encode(), timeout)
+        except (BrokenPipeError, RequestError):
+            self.close()
+            raise
+        finally:
+            for path in files:
+                os.remove(path)
+
+    def _read_result(self, token, timeout):
+        deadline = time.time() + timeout if timeout is not None else None
+        stdout_fd, stderr_fd = self.process.stdout.fileno(), self.process.stderr.fileno()
+        outputs = {stdout_fd: b'', stderr_fd: b''}
+        stdout_end = re.compile(b'\n' + token + b' (\\d+)\n$')
+        stderr_end = b'\n' + token + b'\n'
+        open_fds = set(outputs)
+        while open_fds:
+            found = stdout_end.search(outputs[stdout_fd])
+            if found and outputs[stderr_fd].endswith(stderr_end):
+                return (outputs[stdout_fd][:found.start()], outputs[stderr_fd][:-len(stderr_end)],
+                        int(found.group(1)))
+
+            remaining = deadline - time.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise RequestError(SERVER_ERROR, 'Command timed out after {}s'.format(timeout))
+
+            readable, __, __ = select.select(list(open_fds), [], [], remaining)
+            for fd in readable:
+                data = os.read(fd, 65536)
+                if data:
+                    outputs[fd] += data
+                else:
+                    open_fds.discard(fd)
+
+        # The shell exited, as the command did (e.g. "exit")
+        retcode = self.process.wait()
+        self.process = None
+        return outputs[stdout_fd], outputs[stderr_fd], retcode
+
+
+SHELL = Shell()
+
+
+def write_temp_file(content):
+    fd, path = tempfile.mkstemp(prefix='pluma-agent-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+
+    return path
+
+
+def exec_command(command, timeout=None, input=None, cwd=None):
+    data = decode(input) if input is not None else None
+    if cwd is not None:
+        # Run on its own, without changing the directory of the shell
+        kwargs = {'input': data} if data is not None else {'stdin': subprocess.DEVNULL}
+        try:
+            process = subprocess.run(command, shell=True, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, timeout=timeout, cwd=cwd,
+                                     **kwargs)
+        except subprocess.TimeoutExpired:
+            raise RequestError(SERVER_ERROR, 'Command timed out after {}s'.format(timeout))
+
+        stdout, stderr, retcode = process.stdout, process.stderr, process.returncode
+    else:
+        stdout, stderr, retcode = SHELL.run(command, timeout=timeout, input=data)
+
+    return {'stdout': encode(stdout), 'stderr': encode(stderr), 'retcode': retcode}
+
+
+def read_file(path, offset=0, size=-1):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return {'data': encode(f.read(size))}
+
+
+def write_file(path, data, mode=None, append=False):
+    content = decode(data)
+    with open(path, 'ab' if append else 'wb') as f:
+        f.write(content)
+    if mode is not None:
+        os.chmod(path, mode)
+
+    return {'size': len(content)}
+
+
+def stat(path):
+    try:
+        result = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return {'size': result.st_size, 'mode': result.st_mode, 'mtime': result.st_mtime,
+            'is_dir': os.path.isdir(path), 'is_file': os.path.isfile(path)}
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def check_files(paths, sha256=False):
+    '''Return the size (and hash) of each file, or None for missing files'''
+    results = {}
+    for path in paths:
+        if not os.path.isfile(path):
+            results[path] = None
+            continue
+
+        results[path] = {'size': os.path.getsize(path)}
+        if sha256:
+            results[path]['sha256'] = file_hash(path)
+
+    return results
+
+
+def batch(requests, stop_on_error=False):
+    '''Handle requests in order, stopping at the first failure if "stop_on_error"'''
+    responses = []
+    for request in requests:
+        response = handle_request(request)
+        responses.append(response)
+        failed = 'error' in response or (
+            isinstance(response.get('result'), dict) and response['result'].get('retcode'))
+        if stop_on_error and failed:
+            break
+
+    return responses
+
+
+METHODS = {
+    'exec': exec_command,
+    'read_file': read_file,
+    'write_file': write_file,
+    'stat': stat,
+    'check_files': check_files,
+    'batch': batch,
+    'ping': lambda: {'version': VERSION},
+    'exit': lambda: None,
+}
+
+
+def handle_request(request):
+    request_id = request.get('id') if isinstance(request, dict) else None
+    try:
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            raise RequestError(INVALID_REQUEST, 'Invalid request')
+
+        method = METHODS.get(request['method'])
+        if not method:
+            raise RequestError(METHOD_NOT_FOUND, 'Unknown method "{}"'.format(request['method']))
+
+        params = request.get('params') or {}
+        try:
+            result = method(**params)
+        except TypeError as e:
+            raise RequestError(INVALID_PARAMS, str(e))
+
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+    except RequestError as e:
+        error = {'code': e.code, 'message': str(e)}
+    except OSError as e:
+        error = {'code': SERVER_ERROR, 'message': str(e)}
+
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': error}
+
+
+def write_message(message):
+    sys.stdout.write(json.dumps(message) + '\n')
+    sys.stdout.flush()
+
+
+def disable_echo(fd):
+    '''Disable the echo and line editing of a terminal, and return a function restoring them'''
+    try:
+        import termios
+        attributes = termios.tcgetattr(fd)
+    except (ImportError, OSError):
+        return lambda: None
+
+    raw = list(attributes)
+    raw[3] &= ~(termios.ECHO | termios.ICANON)
+    raw[6] = list(raw[6])
+    raw[6][termios.VMIN] = 1
+    raw[6][termios.VTIME] = 0
+    termios.tcsetattr(fd, termios.TCSANOW, raw)
+    return lambda: termios.tcsetattr(fd, termios.TCSADRAIN, attributes)
+
+
+def main():
+    fd = sys.stdin.fileno()
+    restore_terminal = disable_echo(fd)
+    try:
+        write_message({'jsonrpc': '2.0', 'method': 'ready',
+                       'params': {'version': VERSION, 'pid': os.getpid()}})
+
+        pending = b''
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+
+            # Consoles may end lines with "\r", "\n" or both
+            lines = (pending + data).replace(b'\r', b'\n').split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                if not line.strip():
+                    continue
+
+                try:
+                    request = json.loads(line.decode('utf-8'))
+                except ValueError as e:
+                    write_message({'jsonrpc': '2.0', 'id': None,
+                                   'error': {'code': PARSE_ERROR, 'message': str(e)}})
+                    continue
+
+                write_message(handle_request(request))
+                if isinstance(request, dict) and request.get('method') == 'exit':
+                    return
+    finally:
+        restore_terminal()
+
+
+if __name__ == '__main__':
+    main()
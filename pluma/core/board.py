@@ -1,9 +1,10 @@
 import time
-from typing import Dict, Optional, Union
+from typing import Dict, List, Optional, Union
 
 from pluma.core.dataclasses import SystemContext
-from pluma.core.baseclasses import ConsoleBase, HardwareBase, PowerBase, StorageBase
-from pluma.core import ConsoleExceptionKeywordReceivedError, \
+from pluma.core.baseclasses import ConsoleBase, ConsoleWatcher, HardwareBase, PowerBase, \
+    StorageBase
+from pluma.core import ConsoleExceptionKeywordReceivedError, ConsoleWatchError, \
     BoardFieldInstanceIsNoneError, BoardBootValidationError
 
 
@@ -21,6 +22,10 @@ class Board(HardwareBase):
 
         self._current_console_name: Optional[str] = None
         self._consoles: Dict[str, ConsoleBase] = {}
+        # Watchers added to all the consoles of the board
+        self._watchers: List[ConsoleWatcher] = []
+        # Error of the last fatal watcher match, not raised by the board yet
+        self._watch_error: Optional[ConsoleWatchError] = None
         self.consoles = console
         self.system = system or SystemContext()
 
@@ -80,8 +85,55 @@ class Board(HardwareBase):
                     raise ValueError(f'Console "{console_name}" ({console}) is null or '
                                      'not an instance of ConsoleBase')
 
+            for console in new_consoles.values():
+                for watcher in self._watchers:
+                    console.add_watcher(watcher)
+                console.add_watch_error_listener(self._on_watch_error)
+
+        for console in (self._consoles or {}).values():
+            if not new_consoles or console not in new_consoles.values():
+                console.remove_watch_error_listener(self._on_watch_error)
+
         self._consoles = new_consoles
 
+    @property
+    def watchers(self) -> List[ConsoleWatcher]:
+        return list(self._watchers)
+
+    def add_watcher(self, watcher: ConsoleWatcher):
+        '''Add a console watcher to all the consoles of the board, see "ConsoleWatcher"'''
+        if watcher not in self._watchers:
+            self._watchers.append(watcher)
+
+        for console in self.consoles.values():
+            console.add_watcher(watcher)
+
+    def remove_watcher(self, watcher: ConsoleWatcher):
+        '''Remove a console watcher from all the consoles of the board'''
+        if watcher in self._watchers:
+            self._watchers.remove(watcher)
+
+        for console in self.consoles.values():
+            console.remove_watcher(watcher)
+
+    def _on_watch_error(self, error: ConsoleWatchError):
+        '''Propagate a fatal watcher match on one console to all the consoles'''
+        self._watch_error = error
+        for console in self.consoles.values():
+            console.post_watch_error(error)
+
+    def raise_watch_error(self):
+        '''Raise the error of the last fatal watcher match on any console of the
+        board, unless already raised by a console waiting for or reading data.
+
+        Used to fail a task which did not use the consoles of the board after
+        the match, e.g. a test running on the host.
+        '''
+        error, self._watch_error = self._watch_error, None
+        if error and not error.raised:
+            error.raised = True
+            raise error
+
     def get_console(self, console_name: str = None) -> Optional[ConsoleBase]:
         '''Get a specific console from the Board.'''
         if console_name:
@@ -107,7 +159,7 @@ class Board(HardwareBase):
             if not bootstr:
                 bootstr = prompt
             elif isinstance(bootstr, list):
-                bootstr.append(prompt)
+                bootstr = bootstr + [prompt]
             else:
                 bootstr = [bootstr, prompt]
 
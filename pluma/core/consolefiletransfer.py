@@ -0,0 +1,421 @@
+import binascii
+import gzip
+import os
+import re
+import shlex
+import stat
+import time
+import uuid
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .baseclasses import ConsoleBase, Literal, Logger, LogLevel
+
+log = Logger()
+
+# Terminal input buffer size of the target (Linux), chunks in flight must fit in
+TTY_INPUT_BUFFER_SIZE = 4096
+
+# Lines ending an upload, or cancelling it
+UPLOAD_END_LINE = 'pluma-end'
+UPLOAD_ABORT_LINE = 'pluma-abort'
+
+
+def _cksum_table() -> List[int]:
+    table = []
+    for byte in range(256):
+        crc = byte << 24
+        for __ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+
+    return table
+
+
+_CKSUM_TABLE = _cksum_table()
+
+
+def posix_cksum(data: bytes) -> int:
+    '''Return the CRC of data, as computed by the POSIX "cksum" command'''
+    crc = 0
+    table = _CKSUM_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ table[(crc >> 24) ^ byte]
+
+    length = len(data)
+    while length:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ table[(crc >> 24) ^ (length & 0xFF)]
+        length >>= 8
+
+    return ~crc & 0xFFFFFFFF
+
+
+@dataclass(frozen=True)
+class TransferSettings:
+    '''Settings of file transfers over a console shell (see "ConsoleFileTransfer").
+
+    Files are sent in chunks of "chunk_size" bytes, with at most "window"
+    chunks sent and not acknowledged yet. Chunk lines must fit in the target
+    terminal input buffer (4096 bytes on Linux) "window" times, see
+    "in_flight_size". "compression_level" (1-9) gzips the data transferred,
+    None to disable.
+    '''
+    chunk_size: int = 768
+    window: int = 3
+    compression_level: Optional[int] = None
+    max_retries: int = 10
+
+    def __post_init__(self):
+        if self.chunk_size < 1 or self.window < 1:
+            raise ValueError('File transfer "chunk_size" and "window" must be positive, '
+                             f'but got {self.chunk_size} and {self.window}')
+        if self.compression_level is not None and self.compression_level not in range(1, 10):
+            raise ValueError('File transfer "compression_level" must be between 1 and 9, '
+                             f'but got {self.compression_level}')
+
+    @property
+    def in_flight_size(self) -> int:
+        '''Maximum bytes sent and not acknowledged yet, as chunk lines'''
+        # Index (up to 8 digits), CRC, length, base64 data, separators and newline
+        line_size = 8 + 10 + len(str(self.chunk_size)) + 4 * -(-self.chunk_size // 3) + 4
+        return self.window * line_size
+
+
+@dataclass(frozen=True)
+class TransferStats:
+    '''Size of the file transferred, and console usage of the transfer'''
+    size: int
+    transferred: int
+    duration: float
+    retransmitted_chunks: int
+
+    @property
+    def throughput(self) -> float:
+        '''Effective throughput, in file bytes per second'''
+        return self.size / self.duration if self.duration > 0 else 0
+
+
+class ConsoleFileTransfer():
+    '''Transfer of files over a console shell, for consoles without file copy (e.g. serial).
+
+    Data is sent base64 encoded, in chunks carrying their index and POSIX
+    CRC (as computed by "cksum"), checked on reception. Uploads are
+    pipelined: up to "window" chunks are sent ahead, the target
+    acknowledging each line with the index of the next chunk it expects.
+    Rejected chunks are sent again from there (go-back-N), as are chunks not
+    acknowledged in time. Downloads are streamed by the target, and chunks
+    failing their check are requested again. The whole file CRC is checked
+    at the end of each transfer.
+
+    Requires "base64", "cksum", "dd" (downloads) and "gzip" (compression)
+    on the target, as provided by coreutils or busybox.
+    '''
+
+    # Time without acknowledgement after which unacknowledged chunks are sent again
+    ACK_TIMEOUT = 3
+
+    def __init__(self, console: ConsoleBase, settings: Optional[TransferSettings] = None,
+                 timeout: Optional[float] = None):
+        self.console = console
+        self.settings = settings or TransferSettings()
+        self.timeout = timeout if timeout is not None else 30
+        self._pending_line = ''
+
+    def upload(self, source: str, destination: str) -> TransferStats:
+        '''Copy the "source" host file to "destination" on the target (file or directory)'''
+        self.console.require_shell()
+        start = time.time()
+        deadline = start + self.timeout
+        with open(source, 'rb') as f:
+            data = f.read()
+
+        payload = self._compress(data)
+        chunk_size = self.settings.chunk_size
+        lines = []
+        for index, chunk_start in enumerate(range(0, len(payload), chunk_size)):
+            chunk = payload[chunk_start:chunk_start + chunk_size]
+            lines.append(f'{index} {posix_cksum(chunk)} {len(chunk)} '
+                         + binascii.b2a_base64(chunk, newline=False).decode('ascii'))
+
+        transfer_id = uuid.uuid4().hex[:12]
+        mode = stat.S_IMODE(os.stat(source).st_mode)
+        self._start(self._upload_script(transfer_id, destination, os.path.basename(source),
+                                        mode),
+                    transfer_id, deadline)
+
+        try:
+            transferred, retransmitted = self._send_chunks(lines, transfer_id, source, deadline)
+        except Exception:
+            self.console.engine.send_line(UPLOAD_ABORT_LINE)
+            raise
+
+        self.console.engine.send_line(UPLOAD_END_LINE)
+        result = self.console.engine.wait_for_match(
+            match=[r'pluma-done-' + transfer_id + r'=\d+ \d+',
+                   Literal(f'pluma-error-{transfer_id}')],
+            timeout=max(deadline - time.time(), 1))
+        expected_done = f'pluma-done-{transfer_id}={posix_cksum(data)} {len(data)}'
+        if result.text_matched != expected_done:
+            raise IOError(f'Failed to upload {source} to {self.console}: '
+                          f'expected "{expected_done}", got "{result.text_matched}"')
+
+        return self._stats(source, len(data), transferred, start, retransmitted)
+
+    def make_directory(self, path: str):
+        '''Create the "path" directory on the target, with its parents if missing'''
+        self.console.require_shell()
+        transfer_id = uuid.uuid4().hex[:12]
+        result = self.console.send_and_expect(
+            f'mkdir -p {shlex.quote(path)} && echo pluma-mkdir-"{transfer_id}" '
+            f'|| echo pluma-error-"{transfer_id}"',
+            match=[Literal(f'pluma-mkdir-{transfer_id}'), Literal(f'pluma-error-{transfer_id}')],
+            timeout=self.timeout)
+        if result[1] != f'pluma-mkdir-{transfer_id}':
+            raise IOError(f'Failed to create directory "{path}" on {self.console}')
+
+    def _send_chunks(self, lines: List[str], transfer_id: str, source: str,
+                     deadline: float) -> Tuple[int, int]:
+        '''Send the chunk lines, and return the bytes sent and the number of chunks sent again'''
+        ack_regex = re.compile(r'pluma-ack-' + transfer_id + r'=(\d+)')
+        transferred = 0
+        retransmitted = 0
+        retries = 0
+        # Index of the first chunk not acknowledged, and of the next chunk to send
+        base = 0
+        next_index = 0
+        # Indexes of the chunks sent, in order, not acknowledged yet, and number of
+        # acknowledgements still expected for chunks sent before going back
+        in_flight: List[int] = []
+        stale_acks = 0
+        last_progress = time.time()
+        while base < len(lines):
+            while next_index < len(lines) and next_index < base + self.settings.window:
+                self.console.engine.send_line(lines[next_index])
+                transferred += len(lines[next_index]) + 1
+                in_flight.append(next_index)
+                next_index += 1
+
+            for line in self._read_lines(min(deadline, last_progress + self.ACK_TIMEOUT)):
+                acked = ack_regex.search(line)
+                if not acked:
+                    continue
+
+                expected = int(acked.group(1))
+                if stale_acks:
+                    stale_acks -= 1
+                    answered = None
+                else:
+                    answered = in_flight.pop(0) if in_flight else None
+
+                if expected > base:
+                    base = expected
+                    retries = 0
+                    last_progress = time.time()
+                elif answered == base:
+                    # Chunk rejected, send it again with the chunks following it
+                    retransmitted += next_index - base
+                    next_index = base
+                    stale_acks = len(in_flight)
+                    in_flight.clear()
+                    retries = self._retry(retries, source)
+
+            now = time.time()
+            if now >= deadline:
+                raise TimeoutError(f'Timeout uploading {source} to {self.console} '
+                                   f'after {self.timeout}s, {base}/{len(lines)} chunks sent')
+
+            if base < len(lines) and now >= last_progress + self.ACK_TIMEOUT:
+                log.debug(f'No acknowledgement for chunk {base} of {source}, sending again')
+                retransmitted += next_index - base
+                next_index = base
+                stale_acks = len(in_flight)
+                in_flight.clear()
+                last_progress = now
+                retries = self._retry(retries, source)
+
+        return transferred, retransmitted
+
+    def download(self, source: str, destination: str) -> TransferStats:
+        '''Copy the "source" target file to "destination" on the host (file or directory)'''
+        self.console.require_shell()
+        start = time.time()
+        deadline = start + self.timeout
+        transfer_id = uuid.uuid4().hex[:12]
+        compressed_path = f'${{TMPDIR:-/tmp}}/pluma-{transfer_id}.gz'
+        level = self.settings.compression_level
+        path = compressed_path if level else shlex.quote(source)
+
+        prepare = f'gzip -c -{level} {shlex.quote(source)} > {compressed_path} && ' \
+            if level else ''
+        chunks: Dict[int, bytes] = {}
+        size, file_crc, transferred = self._download_pass(
+            transfer_id, path, prepare, None, chunks, deadline)
+
+        chunk_count = -(-size // self.settings.chunk_size)
+        retransmitted = 0
+        retries = 0
+        missing = [index for index in range(chunk_count) if index not in chunks]
+        while missing:
+            retries = self._retry(retries, source)
+            retransmitted += len(missing)
+            __, __, pass_transferred = self._download_pass(
+                transfer_id, path, '', missing[:64], chunks, deadline)
+            transferred += pass_transferred
+            missing = [index for index in range(chunk_count) if index not in chunks]
+
+        if level:
+            self.console.send(f'rm -f {compressed_path}', flush_before=False)
+
+        payload = b''.join(chunks[index] for index in range(chunk_count))
+        if posix_cksum(payload) != file_crc or len(payload) != size:
+            raise IOError(f'Failed to download {source} from {self.console}: '
+                          'file checksum mismatch')
+
+        data = gzip.decompress(payload) if level else payload
+        if os.path.isdir(destination):
+            destination = os.path.join(destination, os.path.basename(source))
+        with open(destination, 'wb') as f:
+            f.write(data)
+
+        return self._stats(source, len(data), transferred, start, retransmitted)
+
+    def _upload_script(self, transfer_id: str, destination: str, name: str,
+                       mode: int) -> str:
+        # Markers are quoted in the script, so that its echo does not match them.
+        # The terminal echo is disabled while receiving, to save the return bandwidth.
+        # The file gets the mode of the source before being moved in place.
+        if self.settings.compression_level:
+            finalize = (f'gunzip -c < "$t" > "$t.u" && rm -f "$t" && chmod {mode:o} "$t.u" '
+                        '&& mv "$t.u" "$d"')
+        else:
+            finalize = f'chmod {mode:o} "$t" && mv "$t" "$d"'
+
+        return (f'd={shlex.quote(destination)}; [ -d "$d" ] && d="$d"/{shlex.quote(name)}; '
+                f't="$d.pluma-{transfer_id}"; : > "$t" && {{ stty -echo 2>/dev/null; n=0; '
+                f'echo pluma-ready-"{transfer_id}"; '
+                'while IFS= read -r l; do set -- $l; '
+                f'if [ "$1" = {UPLOAD_END_LINE} ]; then break; fi; '
+                f'if [ "$1" = {UPLOAD_ABORT_LINE} ]; then n=-1; break; fi; '
+                'if [ "$1" = "$n" ] && printf %s "$4" | base64 -d > "$t.c" 2>/dev/null '
+                '&& [ "$(cksum < "$t.c")" = "$2 $3" ]; '
+                'then cat "$t.c" >> "$t"; n=$((n+1)); fi; '
+                f'echo pluma-ack-"{transfer_id}"=$n; done; stty echo 2>/dev/null; '
+                f'rm -f "$t.c"; if [ $n -ge 0 ]; then {finalize}; '
+                f'echo pluma-done-"{transfer_id}"=$(cksum < "$d"); else rm -f "$t"; fi; }} '
+                f'|| echo pluma-error-"{transfer_id}"')
+
+    def _download_script(self, transfer_id: str, path: str, prepare: str,
+                         indexes: Optional[List[int]]) -> str:
+        chunk_size = self.settings.chunk_size
+        temp = f'"${{TMPDIR:-/tmp}}/pluma-{transfer_id}.c"'
+        body = (f'echo pluma-chunk-"{transfer_id}"=$i; '
+                f'dd if="$f" of={temp} bs={chunk_size} skip=$i count=1 2>/dev/null; '
+                f'cksum < {temp}; base64 < {temp}')
+        if indexes is None:
+            loop = f'i=0; while [ $((i*{chunk_size})) -lt $s ]; do {body}; i=$((i+1)); done'
+        else:
+            loop = f'for i in {" ".join(str(index) for index in indexes)}; do {body}; done'
+
+        return (f'f={path}; if {prepare}[ -f "$f" ] && [ -r "$f" ]; then s=$(wc -c < "$f"); '
+                f'echo pluma-size-"{transfer_id}"=$s; {loop}; rm -f {temp}; '
+                f'echo pluma-end-"{transfer_id}"=$(cksum < "$f"); '
+                f'else echo pluma-error-"{transfer_id}"; fi')
+
+    def _download_pass(self, transfer_id: str, path: str, prepare: str,
+                       indexes: Optional[List[int]], chunks: Dict[int, bytes],
+                       deadline: float):
+        '''Receive the chunks streamed by the target, and return the file size and CRC'''
+        self._pending_line = ''
+        self.console.send(self._download_script(transfer_id, path, prepare, indexes))
+
+        marker_regex = re.compile(r'pluma-(size|chunk|end|error)-' + transfer_id
+                                  + r'(?:=(\d+)(?: (\d+))?)?')
+        size = None
+        # Index, CRC line and base64 lines of the chunk being received
+        current: Optional[list] = None
+        transferred = 0
+        while True:
+            if time.time() >= deadline:
+                raise TimeoutError(f'Timeout downloading {path} from {self.console} '
+                                   f'after {self.timeout}s')
+
+            for line in self._read_lines(deadline):
+                transferred += len(line) + 1
+                marker = marker_regex.search(line)
+                if not marker:
+                    if current is not None:
+                        current.append(line)
+                    continue
+
+                kind, value, extra = marker.groups()
+                if current is not None:
+                    self._store_chunk(current, chunks)
+                    current = None
+
+                if kind == 'error':
+                    raise IOError(f'Failed to download {path} from {self.console}: '
+                                  'file not found or not readable')
+                elif kind == 'size':
+                    size = int(value)
+                elif kind == 'chunk':
+                    current = [int(value)]
+                elif kind == 'end':
+                    return size, int(value), transferred
+
+    def _store_chunk(self, current: list, chunks: Dict[int, bytes]):
+        index, lines = current[0], current[1:]
+        try:
+            crc, length = (int(value) for value in lines[0].split())
+            chunk = binascii.a2b_base64(''.join(lines[1:]))
+        except (IndexError, ValueError, binascii.Error):
+            log.debug(f'Invalid chunk {index} received')
+            return
+
+        if len(chunk) == length and posix_cksum(chunk) == crc:
+            chunks[index] = chunk
+        else:
+            log.debug(f'Chunk {index} failed its check')
+
+    def _start(self, script: str, transfer_id: str, deadline: float):
+        self._pending_line = ''
+        result = self.console.send_and_expect(
+            script, match=[Literal(f'pluma-ready-{transfer_id}'),
+                           Literal(f'pluma-error-{transfer_id}')],
+            timeout=max(deadline - time.time(), 1))
+        if result[1] != f'pluma-ready-{transfer_id}':
+            raise IOError(f'Failed to start the file transfer on {self.console}: '
+                          f'{result[0]}')
+
+    def _read_lines(self, deadline: float) -> List[str]:
+        '''Return the complete lines received, waiting at most until "deadline" for some'''
+        received = self.console.read_all()
+        if not received and deadline > time.time():
+            self.console.engine.wait_for_data(timeout=min(deadline - time.time(), 0.5))
+            received = self.console.read_all()
+
+        lines = (self._pending_line + received).split('\n')
+        self._pending_line = lines.pop()
+        return [line.strip() for line in lines]
+
+    def _compress(self, data: bytes) -> bytes:
+        if not self.settings.compression_level:
+            return data
+
+        return gzip.compress(data, compresslevel=self.settings.compression_level)
+
+    def _retry(self, retries: int, source: str) -> int:
+        if retries >= self.settings.max_retries:
+            raise IOError(f'Failed to transfer {source} with {self.console}: '
+                          f'too many errors')
+
+        return retries + 1
+
+    def _stats(self, source: str, size: int, transferred: int, start: float,
+               retransmitted: int) -> TransferStats:
+        stats = TransferStats(size=size, transferred=transferred, duration=time.time() - start,
+                              retransmitted_chunks=retransmitted)
+        log.log(f'Transferred {source} ({size}B) in {stats.duration:.2f}s '
+                f'({stats.throughput / 1024:.1f}KiB/s, {transferred}B on the console, '
+                f'{retransmitted} chunks sent again)', level=LogLevel.DEBUG)
+        return stats
@@ -1,6 +1,6 @@
 from .baseclasses.consolebase import ConsoleError,\
     ConsoleCannotOpenError, ConsoleLoginFailedError, ConsoleExceptionKeywordReceivedError,\
-    ConsoleInvalidJSONReceivedError
+    ConsoleInvalidJSONReceivedError, ConsoleWatchError
 from .baseclasses.storagebase import StorageError
 from .boardexceptions import BoardError, BoardBootValidationError, \
     BoardFieldInstanceIsNoneError
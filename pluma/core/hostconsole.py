@@ -1,11 +1,12 @@
-from .baseclasses import ConsoleBase
+from .baseclasses import ConsoleBase, ConsoleEngine
 from .dataclasses import SystemContext
 
 
 class HostConsole(ConsoleBase):
-    def __init__(self, command, system: SystemContext = None, raw_logfile: str = None):
+    def __init__(self, command, system: SystemContext = None, raw_logfile: str = None,
+                 engine: ConsoleEngine = None):
         self.command = command
-        super().__init__(system=system, raw_logfile=raw_logfile)
+        super().__init__(system=system, raw_logfile=raw_logfile, engine=engine)
 
         self._requires_login = False
 
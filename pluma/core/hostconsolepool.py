@@ -0,0 +1,156 @@
+import atexit
+import os
+import shlex
+import threading
+import uuid
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from .baseclasses import ConsoleError, Literal, Logger, LogLevel
+from .hostconsole import HostConsole
+
+log = Logger()
+
+HEALTH_CHECK_TOKEN = 'pluma-healthy-'
+# Variable set in the shells started for each user of a pooled shell
+SESSION_VARIABLE = 'PLUMA_POOL_SESSION'
+
+
+class HostConsolePool():
+    '''Pool of long-lived host shells, reused instead of spawning one per use.
+
+    A shell is used by one user at a time, from "acquire" to "release", or
+    within a "session". Each user gets a child shell of the pooled shell,
+    exited on release, so that the variables, options, traps and working
+    directory it sets are not seen by the next users. When released, the
+    pooled shell must answer a command within "health_check_timeout", or it
+    is closed (e.g. if a command is still running). Closed shells are
+    discarded, and new ones spawned on demand.
+    '''
+
+    _shared: Dict[str, 'HostConsolePool'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, command: str = 'sh', max_idle: int = 4,
+                 health_check_timeout: float = 2):
+        self.command = command
+        self.max_idle = max_idle
+        self.health_check_timeout = health_check_timeout
+        self.cwd = os.getcwd()
+        self.spawned = 0
+        self._idle: List[HostConsole] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, command: str = 'sh') -> 'HostConsolePool':
+        '''Return the pool of "command" shells, shared by all its users in this process'''
+        with cls._shared_lock:
+            if command not in cls._shared:
+                if not cls._shared:
+                    atexit.register(cls.close_shared)
+                cls._shared[command] = cls(command)
+
+            return cls._shared[command]
+
+    @classmethod
+    def close_shared(cls):
+        '''Close the idle shells of all shared pools'''
+        with cls._shared_lock:
+            for pool in cls._shared.values():
+                pool.close()
+
+    def acquire(self) -> HostConsole:
+        '''Return an open shell for exclusive use, until released'''
+        while True:
+            with self._lock:
+                console = self._idle.pop() if self._idle else None
+
+            if not console:
+                break
+
+            if self._start_session(console):
+                return console
+
+            log.log(f'Discarding closed host console {console}', level=LogLevel.DEBUG)
+            console.close()
+
+        console = HostConsole(self.command)
+        console.open()
+        with self._lock:
+            self.spawned += 1
+
+        if not self._start_session(console):
+            console.close()
+            raise ConsoleError(f'Failed to start a shell session on host console {console}')
+
+        return console
+
+    def release(self, console: HostConsole):
+        '''Return a shell to the pool, or close it if unhealthy or not needed'''
+        if self._is_healthy(console):
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(console)
+                    return
+
+        console.close()
+
+    @contextmanager
+    def session(self) -> Iterator[HostConsole]:
+        '''Context manager acquiring a shell, and releasing it on exit'''
+        console = self.acquire()
+        try:
+            yield console
+        finally:
+            self.release(console)
+
+    def close(self):
+        '''Close all idle shells'''
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for console in idle:
+            console.close()
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    def _start_session(self, console: HostConsole) -> bool:
+        '''Start the child shell of a user, and return True once it answers'''
+        if not console.is_open:
+            return False
+
+        try:
+            console.send(f'{SESSION_VARIABLE}=1 {self.command}')
+            return self._check(console, f'cd {shlex.quote(self.cwd)}')
+        except ConsoleError as e:
+            log.log(f'Host console {console} session failed to start: {e}',
+                    level=LogLevel.DEBUG)
+            return False
+
+    def _is_healthy(self, console: HostConsole) -> bool:
+        if not console.is_open:
+            return False
+
+        try:
+            if console.agent:
+                console.stop_agent()
+
+            # Exit the child shell of the user, if still running, but never the pooled shell
+            console.send(f'[ -z "${SESSION_VARIABLE}" ] || exit')
+            return self._check(console, 'true')
+        except ConsoleError as e:
+            log.log(f'Host console {console} health check failed: {e}', level=LogLevel.DEBUG)
+            return False
+
+    def _check(self, console: HostConsole, command: str) -> bool:
+        '''Run a command, and return True if the shell answered in time'''
+        # Marker quoted in the command, so that its echo does not match it
+        check_id = uuid.uuid4().hex[:12]
+        _, matched = console.send_and_expect(
+            f'{command} && echo {HEALTH_CHECK_TOKEN}"{check_id}"',
+            match=Literal(HEALTH_CHECK_TOKEN + check_id), timeout=self.health_check_timeout)
+        return matched is not None
+
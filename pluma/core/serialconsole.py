@@ -1,19 +1,36 @@
+import os
+import posixpath
+
+from dataclasses import replace
+from typing import List, Optional
+
 from serial import Serial
 from nanocom import Nanocom
 
-from .baseclasses import ConsoleBase, LogLevel
+from .baseclasses import ConsoleBase, ConsoleEngine, LogLevel
+from .consolefiletransfer import ConsoleFileTransfer, TransferSettings, TransferStats
 from .dataclasses import SystemContext
 
 
 class SerialConsole(ConsoleBase):
+    '''Console on a serial port.
+
+    Files are copied through the target shell (see "ConsoleFileTransfer"),
+    with the settings in "file_transfer".
+    '''
+
     def __init__(self, port, baud, encoding=None, linesep=None,
-                 raw_logfile=None, system: SystemContext = None):
+                 raw_logfile=None, system: SystemContext = None,
+                 engine: ConsoleEngine = None):
         self.port = port
         self.baud = baud
         self._timeout = 0.001
         self._ser = None
+        self.file_transfer = TransferSettings()
+        # Statistics of the last file copy
+        self.last_transfer: Optional[TransferStats] = None
         super().__init__(encoding=encoding, linesep=linesep,
-                         raw_logfile=raw_logfile, system=system)
+                         raw_logfile=raw_logfile, system=system, engine=engine)
 
     def __repr__(self):
         return "SerialConsole[{}]".format(self.port)
@@ -30,7 +47,7 @@ class SerialConsole(ConsoleBase):
             timeout=self._timeout
         )
 
-        self.engine.open(console_fd=self._ser.fileno())
+        self.engine.open_serial(self._ser)
 
         if not self.is_open:
             raise RuntimeError(f'Failed to open serial port {self.port}')
@@ -50,6 +67,41 @@ class SerialConsole(ConsoleBase):
         self._ser = None
         self.log("Closed serial", level=LogLevel.DEBUG)
 
+    @property
+    def support_file_copy(self):
+        return True
+
+    def copy_to_target(self, source, destination, timeout=30):
+        self.require_open()
+        transfer = ConsoleFileTransfer(self, settings=self.file_transfer, timeout=timeout)
+        # Destination is a directory if ending with a "/", or else a file path
+        directory = destination if destination.endswith('/') else posixpath.dirname(destination)
+        if directory:
+            transfer.make_directory(directory)
+
+        self.last_transfer = transfer.upload(source, destination)
+
+    def copy_to_host(self, source, destination, timeout=30):
+        self.require_open()
+        self.last_transfer = ConsoleFileTransfer(
+            self, settings=self.file_transfer, timeout=timeout).download(source, destination)
+
+    def copy_files_to_target(self, sources: List[str], destination: str, timeout=30,
+                             compression_level: Optional[int] = None) -> int:
+        self.require_open()
+        settings = self.file_transfer
+        if compression_level:
+            settings = replace(settings, compression_level=compression_level)
+
+        transfer = ConsoleFileTransfer(self, settings=settings, timeout=timeout)
+        transfer.make_directory(destination)
+        copied = 0
+        for source in sources:
+            self.last_transfer = transfer.upload(source, destination)
+            copied += os.path.getsize(source)
+
+        return copied
+
     def interact(self, exit_char=None):
         '''
         Take interactive control of a SerialConsole.
@@ -65,29 +117,31 @@ class SerialConsole(ConsoleBase):
         self.log('Starting interactive console')
         print(f'Press {exit_char} to exit')
 
-        com = self._logging_Nanocom(self.engine.raw_logfile, self._ser,
+        com = self._logging_Nanocom(self.engine.raw_log_writer, self._ser,
                                     exit_character=exit_char)
 
-        com.start()
-        try:
-            com.join()
-        except KeyboardInterrupt:
-            pass
-        finally:
-            self.log('Exiting interactive console...')
-            com.close()
+        with self.engine.background_reader_paused():
+            com.start()
+            try:
+                com.join()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.log('Exiting interactive console...')
+                com.close()
 
     class _logging_Nanocom(Nanocom):
         '''
         This class just slightly modifies Nanocom to get it to log
         received data to a file.
         This is done so that the text from the interactive session
-        is written to the raw logfile, along with everything else.
+        is written to the raw logfile, along with everything else,
+        through the engine's raw log writer.
         The reader() method is copy-pasted from Nanocom and modified.
         '''
 
-        def __init__(self, logfile, *args, **kwargs):
-            self.logfile = logfile
+        def __init__(self, log_writer, *args, **kwargs):
+            self.log_writer = log_writer
             Nanocom.__init__(self, *args, **kwargs)
 
         def reader(self):
@@ -96,8 +150,8 @@ class SerialConsole(ConsoleBase):
                     data = self.serial.read(self.serial.in_waiting or 1)
                     if data:
                         self.console.write_bytes(data)
-                        with open(self.logfile, 'ab') as f:
-                            f.write(data)
+                        if self.log_writer:
+                            self.log_writer.write(data)
             except Exception:
                 self.alive = False
                 self.console.cancel()
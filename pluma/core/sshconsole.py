@@ -1,13 +1,32 @@
+import gzip
+import os
+import shlex
+import shutil
 import subprocess
+import tarfile
+import tempfile
 
-from pluma.core.baseclasses import ConsoleCannotOpenError
+from typing import List, Optional
+
+from pluma.core.baseclasses import ConsoleCannotOpenError, LogLevel
 from .hostconsole import HostConsole
 from .dataclasses import SystemContext
 
 
 class SSHConsole(HostConsole):
-    def __init__(self, target: str, system: SystemContext, raw_logfile: str = None):
+    '''Console over SSH, with file copies using scp, or a tar stream for batches.
+
+    With "connection_sharing" enabled, the console connection becomes an SSH
+    ControlMaster when opened. File copies and extra commands (see
+    "ssh_command") are then multiplexed over it, without a new handshake.
+    The shared connection is closed along with the console.
+    '''
+
+    def __init__(self, target: str, system: SystemContext, raw_logfile: str = None,
+                 connection_sharing: bool = False):
         self.target = target
+        self.connection_sharing = connection_sharing
+        self._control_dir: Optional[str] = None
 
         if not target:
             raise ValueError("A host/target must be provided for an SSH console")
@@ -15,20 +34,51 @@ class SSHConsole(HostConsole):
         if not system.credentials.login:
             raise ValueError("A login must be provided for an SSH console")
 
+        super().__init__(self._console_command(system), system=system,
+                         raw_logfile=raw_logfile)
+
+    def _console_command(self, system: Optional[SystemContext] = None) -> str:
+        system = system or self.system
         login = system.credentials.login
         password = system.credentials.password
 
         if not password:
-            command = f'ssh {login}@{target} -o StrictHostKeyChecking=no'
+            command = f'ssh {login}@{self.target} -o StrictHostKeyChecking=no'
         else:
             command = \
-                f'sshpass -p {password} ssh {login}@{target}' \
+                f'sshpass -p {password} ssh {login}@{self.target}' \
                 ' -o PreferredAuthentications=password' \
                 ' -o PubkeyAuthentication=no -o StrictHostKeyChecking=no'
 
-        super().__init__(command, system=system, raw_logfile=raw_logfile)
+        if self.control_path:
+            command += ' ' + ' '.join(self._control_options(master=True))
+
+        return command
+
+    @property
+    def control_path(self) -> Optional[str]:
+        '''Path of the ControlMaster socket, if the connection is shared'''
+        return os.path.join(self._control_dir, 'control') if self._control_dir else None
+
+    def _control_options(self, master: bool = False) -> List[str]:
+        if not self.control_path:
+            return []
+
+        # The master is kept in the background until closed with the console,
+        # even if the console session itself ends.
+        return ['-o', f'ControlPath={self.control_path}',
+                '-o', f'ControlMaster={"auto" if master else "no"}',
+                '-o', 'ControlPersist=yes' if master else 'ControlPersist=no']
+
+    def _auth_command(self) -> List[str]:
+        password = self.system.credentials.password
+        return ['sshpass', '-p', password] if password else []
 
     def open(self):
+        if self.connection_sharing and not self._control_dir:
+            self._control_dir = tempfile.mkdtemp(prefix='pluma-ssh-')
+        self.command = self._console_command()
+
         try:
             super().open()
             self.wait_for_prompt(timeout=5)
@@ -36,6 +86,44 @@ class SSHConsole(HostConsole):
             self.close()
             raise ConsoleCannotOpenError
 
+    def close(self):
+        super().close()
+        self._close_control_master()
+
+    def _close_control_master(self):
+        if not self._control_dir:
+            return
+
+        if os.path.exists(self.control_path):
+            self.log(f'Closing shared SSH connection to {self.target}', level=LogLevel.DEBUG)
+            subprocess.run(['ssh', '-o', f'ControlPath={self.control_path}', '-O', 'exit',
+                            f'{self.system.credentials.login}@{self.target}'],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        shutil.rmtree(self._control_dir, ignore_errors=True)
+        self._control_dir = None
+
+    def ssh_command(self, remote_command: Optional[str] = None) -> List[str]:
+        '''Return the arguments of an ssh command running "remote_command" on the target.
+
+        The shared connection is used if the console is open with
+        "connection_sharing".
+        '''
+        command = self._auth_command() + ['ssh']
+        if self.system.credentials.password:
+            command += ['-o', 'PreferredAuthentications=password',
+                        '-o', 'PubkeyAuthentication=no']
+        command += ['-o', 'StrictHostKeyChecking=no'] + self._control_options()
+        command.append(f'{self.system.credentials.login}@{self.target}')
+        if remote_command:
+            command.append(remote_command)
+
+        return command
+
+    @property
+    def target_id(self) -> str:
+        return f'ssh://{self.system.credentials.login}@{self.target}'
+
     @property
     def support_file_copy(self):
         return True
@@ -49,13 +137,80 @@ class SSHConsole(HostConsole):
                               f'{self.system.credentials.login}@{self.target}:{destination}',
                               timeout=timeout)
 
+    def copy_files_to_target(self, sources: List[str], destination: str, timeout=30,
+                             compression_level: Optional[int] = None) -> int:
+        '''Copy files to the "destination" directory on the target, in a single tar stream.
+
+        The archive is streamed to "tar" on the target over a single ssh
+        channel, gzipped if "compression_level" (1-9) is set. Return the
+        bytes copied, before compression.
+        '''
+        tar_options = '-xzof' if compression_level else '-xof'
+        remote_command = f'mkdir -p {shlex.quote(destination)} && ' \
+            f'tar {tar_options} - -C {shlex.quote(destination)}'
+        command_list = self.ssh_command(remote_command)
+
+        process = subprocess.Popen(command_list, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        copied = 0
+        error = None
+        try:
+            stream = gzip.GzipFile(fileobj=process.stdin, mode='wb',
+                                   compresslevel=compression_level) \
+                if compression_level else process.stdin
+            with tarfile.open(fileobj=stream, mode='w|') as archive:
+                for source in sources:
+                    archive.add(source, arcname=os.path.basename(source), recursive=False)
+                    copied += os.path.getsize(source)
+            if stream is not process.stdin:
+                stream.close()
+            output, _ = process.communicate(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            error = e
+            process.kill()
+            output, _ = process.communicate()
+
+        if error or process.returncode != 0:
+            raise Exception(
+                f'Failed to copy (tar) {sources} to "{destination}".\n'
+                f'  Command {" ".join(command_list)} failed with error:\n'
+                f'    "{error or ""}{output.decode(errors="replace")}"')
+
+        return copied
+
+    @property
+    def support_background_copy(self):
+        return True
+
+    def archive_to_host(self, patterns: List[str], destination: str, timeout=30,
+                        compression_level: int = 6) -> int:
+        '''Pull the files matching "patterns" as a gzipped tar, streamed over a single ssh
+        channel, without using the console session.'''
+        command_list = self.ssh_command(self.archive_command(patterns, compression_level))
+
+        error = None
+        with open(destination, 'wb') as archive:
+            try:
+                process = subprocess.run(command_list, stdout=archive, stderr=subprocess.PIPE,
+                                         timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                error = e
+
+        if error or process.returncode != 0:
+            output = '' if error else process.stderr.decode(errors='replace')
+            raise Exception(
+                f'Failed to archive (tar) {patterns} to "{destination}".\n'
+                f'  Command {" ".join(command_list)} failed with error:\n'
+                f'    "{error or ""}{output}"')
+
+        return os.path.getsize(destination)
+
     def _scp_copy(self, scp_source, scp_destination, timeout=30):
-        command = f'scp {scp_source} {scp_destination}'
-        if self.system.credentials.password:
-            command = f'sshpass -p {self.system.credentials.password} {command}'
+        command_list = self._auth_command() + ['scp'] + self._control_options() \
+            + [scp_source, scp_destination]
+        command = ' '.join(command_list)
 
         try:
-            command_list = command.split()
             subprocess.check_output(command_list, stderr=subprocess.STDOUT)
         except subprocess.CalledProcessError as e:
             raise Exception(
@@ -1,7 +1,7 @@
 import math
 import os
 
-from pluma.test import TestBase, TaskFailed
+from pluma.test import CommandRunner, TestBase, TaskFailed
 
 
 class MemorySize(TestBase):
@@ -20,7 +20,11 @@ class MemorySize(TestBase):
         if not console:
             raise TaskFailed('No console available')
 
-        received = console.send_and_read('cat /proc/meminfo')
+        agent = CommandRunner.running_agent(console)
+        if agent:
+            received = agent.read_file('/proc/meminfo').decode(errors='replace')
+        else:
+            received = console.send_and_read('cat /proc/meminfo')
         available_mb = None
         total_mb = None
 
@@ -6,7 +6,7 @@ import concurrent.futures
 from pluma.core.baseclasses import Logger
 from pluma.core.sshconsole import SSHConsole
 from pluma.test import ShellTest, TaskFailed
-from pluma import Board, HostConsole
+from pluma import Board, HostConsolePool
 
 
 log = Logger()
@@ -61,7 +61,8 @@ class IperfBandwidth(NetworkingTestBase):
             # Wait for the server to start
             time.sleep(2)
             command = f'iperf -c {self.target} --time {self.duration}'
-            self.run_commands(console=HostConsole('sh'), scripts=[command])
+            with HostConsolePool.shared().session() as console:
+                self.run_commands(console=console, scripts=[command])
 
             target_output = iperf_server.result()
 
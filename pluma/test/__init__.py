@@ -3,9 +3,12 @@ from .testbase import TestBase
 from .testgroup import TestList, TestGroup, GroupedTest
 from .session import Session
 from .plan import Plan
-from .testrunner import TestRunner
+from .artifactcollector import ArtifactCollector
+from .testrunner import TestRunnerBase, TestRunner, TestRunnerParallel
 from .unittest import deferred_function
 from .testcontroller import TestController
-from .commandrunner import CommandRunner
+from .framedoutput import FramedCommandResult, FramedOutputDecoder
+from .commandrunner import CommandRunner, CommandResult
+from .deploycache import DeployCache
 from .shelltest import ShellTest
 from .executabletest import ExecutableTest
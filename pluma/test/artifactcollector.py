@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+import time
+from typing import Callable, List, Optional
+
+from pluma.core.baseclasses import ConsoleBase, LogLevel
+from pluma.core.board import Board
+
+
+class ArtifactCollector():
+    '''Collect files from the target (logs, core dumps...) when a task fails.
+
+    "patterns" are shell globs on the target (e.g. "/var/log", "/tmp/core.*"),
+    pulled as a single gzipped tar archive (see "ConsoleBase.archive_to_host")
+    and written to "folder", or the current directory. If one of the board
+    consoles can copy files while another is in use (e.g. SSH), archives are
+    pulled in the background, and testing continues meanwhile. They are
+    otherwise pulled with the current console, before testing continues.
+    '''
+
+    def __init__(self, patterns: List[str], folder: Optional[str] = None,
+                 timeout: float = 120, compression_level: int = 6):
+        if not patterns:
+            raise ValueError('At least one artifact pattern must be provided')
+
+        if not 1 <= compression_level <= 9:
+            raise ValueError(
+                f'Compression level must be between 1 and 9, but got {compression_level}')
+
+        self.patterns = list(patterns)
+        self.folder = folder
+        self.timeout = timeout
+        self.compression_level = compression_level
+        # Archives successfully pulled
+        self.collected: List[str] = []
+        self._threads: List[threading.Thread] = []
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def collect(self, board: Board, name: str,
+                on_collected: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        '''Start pulling the artifacts from the board, and return the archive path.
+
+        Return None if no console of the board can copy files. "on_collected"
+        is called with the archive path once pulled, and not if pulling failed.
+        '''
+        console = self.select_console(board)
+        if not console:
+            board.log('No console able to copy files from the target, '
+                      'skipping artifacts collection', level=LogLevel.WARNING)
+            return None
+
+        destination = self._destination(name)
+        if not console.support_background_copy:
+            self._archive(board, console, destination, on_collected)
+            return destination
+
+        thread = threading.Thread(target=self._archive,
+                                  args=(board, console, destination, on_collected),
+                                  name=f'ArtifactCollector-{name}', daemon=True)
+        with self._lock:
+            self._threads.append(thread)
+        thread.start()
+        return destination
+
+    def wait(self, timeout: Optional[float] = None):
+        '''Wait for the archives being pulled in the background'''
+        with self._lock:
+            threads, self._threads = self._threads, []
+
+        deadline = time.time() + timeout if timeout is not None else None
+        for thread in threads:
+            thread.join(max(0, deadline - time.time()) if deadline else None)
+
+    @staticmethod
+    def select_console(board: Board) -> Optional[ConsoleBase]:
+        '''Return the console used to pull artifacts, preferring background copies'''
+        consoles = [console for console in board.consoles.values()
+                    if console.support_file_copy]
+
+        for console in consoles:
+            if console.support_background_copy:
+                return console
+
+        return board.console if board.console in consoles else None
+
+    def _destination(self, name: str) -> str:
+        with self._lock:
+            self._count += 1
+            count = self._count
+
+        name = re.sub(r'[^\w.-]+', '_', name).strip('_')
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        return os.path.join(self.folder or '.',
+                            f'pluma-artifacts-{timestamp}-{count}-{name}.tar.gz')
+
+    def _archive(self, board: Board, console: ConsoleBase, destination: str,
+                 on_collected: Optional[Callable[[str], None]]):
+        board.log(f'Collecting artifacts {self.patterns} to "{destination}"',
+                  level=LogLevel.INFO)
+        start = time.time()
+        try:
+            size = console.archive_to_host(self.patterns, destination, timeout=self.timeout,
+                                           compression_level=self.compression_level)
+        except Exception as e:
+            board.log(f'Failed to collect artifacts to "{destination}": {e}',
+                      level=LogLevel.ERROR, color='red')
+            return
+
+        with self._lock:
+            self.collected.append(destination)
+
+        if on_collected:
+            on_collected(destination)
+
+        board.log(f'Collected artifacts to "{destination}" ({size} bytes in '
+                  f'{time.time() - start:.1f}s)', level=LogLevel.INFO)
@@ -1,22 +1,64 @@
 import os
 import re
+import shlex
+import time
+import uuid
+from dataclasses import dataclass
 from typing import List, Optional
 
-from pluma.core.baseclasses import ConsoleBase, Logger
+from pluma.core.baseclasses import (ConsoleAgent, ConsoleAgentError, ConsoleBase, Logger,
+                                   PatternMatcher, Literal)
 from pluma.test import TestingException, TaskFailed
+from .framedoutput import FramedCommandResult, FramedOutputDecoder, framed_command
 
 log = Logger()
 
+RETCODE_TOKEN = 'pluma-retcode='
+# Compiled once, and shared by all commands run. Return codes are short, so that
+# large outputs are not searched again as they are received.
+RETCODE_MATCHER = PatternMatcher([RETCODE_TOKEN + r'-?\d+'], search_window=64)
+
+# Markers around each command of a batch, followed by a batch identifier
+BATCH_BEGIN_TOKEN = 'pluma-begin-'
+BATCH_END_TOKEN = 'pluma-end-'
+BATCH_DONE_TOKEN = 'pluma-done-'
+# Longest line sent for a batch, as terminals in canonical mode truncate longer lines
+MAX_BATCH_LINE_LENGTH = 2048
+
+
+@dataclass
+class CommandResult:
+    '''Output and return code of a command'''
+    command: str
+    output: str
+    retcode: int
+
 
 class CommandRunner():
     @staticmethod
-    def run(test_name: str, console: ConsoleBase, command: str, timeout: float = None) -> str:
-        '''Run a command in a Shell context'''
-        retcode_token = 'pluma-retcode='
+    def run(test_name: str, console: ConsoleBase, command: str, timeout: float = None,
+            framed: bool = False) -> str:
+        '''Run a command in a Shell context
+
+        With "framed", the output is read exactly, and stderr follows stdout
+        (see "run_framed"). This is always the case if the console target
+        agent is running. "timeout" defaults to 10 seconds.
+        '''
+        if framed or CommandRunner.running_agent(console):
+            result = CommandRunner.run_framed(test_name=test_name, console=console,
+                                              command=command, timeout=timeout)
+            output = (result.stdout + result.stderr).decode(console.engine.encoding,
+                                                            errors='replace')
+            if result.retcode != 0:
+                CommandRunner.log_error(test_name=test_name, sent=command, output=output,
+                                        error=f'Command "{command}" returned with exit code '
+                                        f'{result.retcode}')
+            return output
+
         base_command = command
-        command += f' ; echo {retcode_token}$?'
+        command += f' ; echo {RETCODE_TOKEN}$?'
         output, matched = console.send_and_expect(
-            command, timeout=10, match=retcode_token+r'-?\d+')
+            command, timeout=timeout if timeout is not None else 10, match=RETCODE_MATCHER)
 
         if not matched:
             CommandRunner.log_error(test_name=test_name, sent=command, output=output,
@@ -25,7 +67,7 @@ class CommandRunner():
                                     ' in a shell, set "runs_in_shell" to "false".')
 
         output = re.sub(re.escape(matched) + r'$', '', output)
-        retcode_match = re.search(retcode_token+r'(-?\d+)', matched)
+        retcode_match = re.search(RETCODE_TOKEN + r'(-?\d+)', matched)
         if not retcode_match:
             raise TestingException('Failed to find return code value')
 
@@ -46,9 +88,195 @@ class CommandRunner():
 
         return output
 
+    @staticmethod
+    def run_batch(test_name: str, console: ConsoleBase, commands: List[str],
+                  timeout: float = None, stop_on_error: bool = False) -> List[CommandResult]:
+        '''Run commands in a Shell context, sending them all at once.
+
+        Commands are sent in a single line, each wrapped in begin and end
+        markers carrying its return code, and their outputs are split from
+        the console output once they all completed. Batches are split if the
+        line would be too long. With "stop_on_error", commands following a
+        failed command are not run, and not part of the results.
+        "timeout" applies to each command, and defaults to 10 seconds.
+        If the console target agent is running, commands are sent to it
+        instead, pipelined.
+        '''
+        timeout = timeout if timeout is not None else 10
+
+        agent = CommandRunner.running_agent(console)
+        if agent:
+            return CommandRunner._run_agent_batch(test_name=test_name, agent=agent,
+                                                  commands=commands, timeout=timeout,
+                                                  stop_on_error=stop_on_error)
+
+        results = []
+        for batch in CommandRunner._split_batches(commands):
+            batch_results = CommandRunner._run_single_batch(
+                test_name=test_name, console=console, commands=batch,
+                timeout=timeout * len(batch), stop_on_error=stop_on_error)
+            results += batch_results
+
+            if stop_on_error and (len(batch_results) < len(batch)
+                                  or batch_results[-1].retcode != 0):
+                break
+
+        return results
+
+    @staticmethod
+    def _run_agent_batch(test_name: str, agent: ConsoleAgent, commands: List[str],
+                         timeout: float, stop_on_error: bool) -> List[CommandResult]:
+        try:
+            agent_results = agent.exec_many(commands, timeout=timeout,
+                                            stop_on_error=stop_on_error)
+        except ConsoleAgentError as e:
+            CommandRunner.log_error(test_name=test_name, sent=os.linesep.join(commands),
+                                    output='', error=f'Agent failed to run the commands: {e}')
+
+        encoding = agent.console.engine.encoding
+        results = [CommandResult(command=result.command,
+                                 output=(result.stdout + result.stderr).decode(
+                                     encoding, errors='replace').strip(),
+                                 retcode=result.retcode)
+                   for result in agent_results]
+
+        for result in results:
+            log.log(CommandRunner.format_command_log(sent=result.command, output=result.output))
+
+        return results
+
+    @staticmethod
+    def _split_batches(commands: List[str]) -> List[List[str]]:
+        batches = []
+        batch_length = 0
+        for command in commands:
+            # Quoting and markers overhead
+            command_length = len(shlex.quote(command)) + 100
+            if not batches or batch_length + command_length > MAX_BATCH_LINE_LENGTH:
+                batches.append([])
+                batch_length = 0
+
+            batches[-1].append(command)
+            batch_length += command_length
+
+        return batches
+
+    @staticmethod
+    def _batch_line(batch_id: str, commands: List[str], stop_on_error: bool) -> str:
+        # Markers are quoted in the line sent, so that its echo does not match them
+        def begin(index):
+            return f'echo {BATCH_BEGIN_TOKEN}"{batch_id}"-{index}'
+
+        def end(index, retcode):
+            return f'echo {BATCH_END_TOKEN}"{batch_id}"-{index}={retcode}'
+
+        line = ''
+        if stop_on_error:
+            # "$?" in the "else" branch is the return code of the condition
+            for index, command in enumerate(commands):
+                line += f'{begin(index)}; if eval {shlex.quote(command)}; then {end(index, 0)}; '
+            line += ' '.join(f'else {end(index, "$?")}; fi;'
+                             for index in reversed(range(len(commands))))
+        else:
+            for index, command in enumerate(commands):
+                line += f'{begin(index)}; eval {shlex.quote(command)}; {end(index, "$?")}; '
+
+        return line + f'echo {BATCH_DONE_TOKEN}"{batch_id}"'
+
+    @staticmethod
+    def _run_single_batch(test_name: str, console: ConsoleBase, commands: List[str],
+                          timeout: float, stop_on_error: bool) -> List[CommandResult]:
+        batch_id = uuid.uuid4().hex[:12]
+        line = CommandRunner._batch_line(batch_id, commands, stop_on_error)
+
+        output, matched = console.send_and_expect(
+            line, timeout=timeout, match=Literal(BATCH_DONE_TOKEN + batch_id))
+
+        if not matched:
+            CommandRunner.log_error(test_name=test_name, sent=os.linesep.join(commands),
+                                    output=output,
+                                    error='No response within timeout, or device failed to '
+                                    'complete the batch of commands')
+
+        results = []
+        for match in re.finditer(re.escape(BATCH_BEGIN_TOKEN + batch_id) + r'-(\d+)\r?\n'
+                                 r'(.*?)' + re.escape(BATCH_END_TOKEN + batch_id)
+                                 + r'-\1=(-?\d+)', output, re.DOTALL):
+            index = int(match.group(1))
+            results.append(CommandResult(command=commands[index],
+                                         output=match.group(2).strip(),
+                                         retcode=int(match.group(3))))
+
+        for result in results:
+            log.log(CommandRunner.format_command_log(sent=result.command, output=result.output))
+
+        return results
+
+    @staticmethod
+    def run_framed(test_name: str, console: ConsoleBase, command: str,
+                   timeout: float = None) -> FramedCommandResult:
+        '''Run a command in a Shell context, and return its exact stdout, stderr and return code.
+
+        The output is sent base64 encoded by the target (see "framed_command"),
+        and decoded as it is received, so that any output, including binary
+        data or the command text itself, is returned as is. If the console
+        target agent is running, the command is run by the agent instead.
+        '''
+        timeout = timeout if timeout is not None else 10
+        agent = CommandRunner.running_agent(console)
+        if agent:
+            try:
+                agent_result = agent.exec(command, timeout=timeout)
+            except ConsoleAgentError as e:
+                CommandRunner.log_error(test_name=test_name, sent=command, output='',
+                                        error=f'Agent failed to run the command: {e}')
+
+            result = FramedCommandResult(command=command, stdout=agent_result.stdout,
+                                         stderr=agent_result.stderr,
+                                         retcode=agent_result.retcode)
+            log.log(CommandRunner.format_command_log(
+                sent=command, output=result.stdout.decode(errors='replace')))
+            return result
+
+        frame_id = uuid.uuid4().hex[:12]
+        decoder = FramedOutputDecoder(frame_id)
+
+        console.send_nonblocking(framed_command(command, frame_id))
+
+        deadline = time.time() + timeout
+        try:
+            while not decoder.done:
+                decoder.feed(console.read_all())
+                remaining = deadline - time.time()
+                if decoder.done or remaining <= 0:
+                    break
+
+                console.engine.wait_for_data(timeout=remaining)
+        except ValueError as e:
+            CommandRunner.log_error(test_name=test_name, sent=command, output='',
+                                    error=f'Failed to decode the command output: {e}')
+
+        if not decoder.done:
+            CommandRunner.log_error(test_name=test_name, sent=command, output='',
+                                    error='No response within timeout, or device failed to '
+                                    'send the command output')
+
+        result = FramedCommandResult(command=command, stdout=decoder.stdout,
+                                     stderr=decoder.stderr, retcode=decoder.retcode)
+        log.log(CommandRunner.format_command_log(
+            sent=command, output=result.stdout.decode(errors='replace')))
+        return result
+
+    @staticmethod
+    def running_agent(console: ConsoleBase) -> Optional[ConsoleAgent]:
+        '''Return the console target agent if running, None otherwise'''
+        agent = getattr(console, 'agent', None)
+        return agent if isinstance(agent, ConsoleAgent) and agent.running else None
+
     @staticmethod
     def run_raw(test_name: str, console: ConsoleBase, command: str, timeout: int = None) -> str:
         '''Run a command with minimal assumptions regarding the context'''
+        console.require_shell()
         output = console.send_and_read(command, timeout=timeout, quiet_time=timeout)
         output = CommandRunner.cleanup_command_output(command, output)
 
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shlex
+import tempfile
+import threading
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pluma.core.baseclasses import ConsoleBase, Logger, LogLevel
+from pluma.test import CommandRunner
+
+log = Logger()
+
+SHA256SUM_LINE = re.compile(r'^([0-9a-fA-F]{64}) [ *](.+)$', re.MULTILINE)
+
+
+class DeployCache():
+    '''Cache of the files deployed to targets, to skip those already up to date.
+
+    The content hash of each file deployed is recorded, keyed by target and
+    destination path. When deploying again, files recorded with the same
+    hash are checked on the target with a single "sha256sum" command, and
+    only the files missing or different are copied. Host file hashes are
+    cached too, and only computed again when a file is modified.
+
+    The cache is stored in "path", and persists across pluma invocations.
+    '''
+
+    DEFAULT_PATH = Path.home()/'.cache'/'pluma'/'deploy-cache.json'
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    _shared: Dict[str, 'DeployCache'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or self.DEFAULT_PATH)
+        self._lock = threading.RLock()
+        self._host_files: Dict[str, dict] = {}
+        self._targets: Dict[str, Dict[str, str]] = {}
+        self._load()
+
+    @classmethod
+    def shared(cls, path: Optional[str] = None) -> 'DeployCache':
+        '''Return the cache stored in "path", shared by all its users in this process'''
+        path = str(path or cls.DEFAULT_PATH)
+        with cls._shared_lock:
+            if path not in cls._shared:
+                cls._shared[path] = cls(path)
+
+            return cls._shared[path]
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                content = json.load(f)
+            self._host_files = content.get('host_files', {})
+            self._targets = content.get('targets', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            log.warning(f'Ignoring invalid deploy cache "{self.path}": {e}')
+
+    def save(self):
+        '''Write the cache to disk'''
+        with self._lock:
+            content = {'host_files': self._host_files, 'targets': self._targets}
+
+            dirpath = os.path.dirname(self.path) or '.'
+            os.makedirs(dirpath, exist_ok=True)
+            # Replace the cache at once, so it is never left half written
+            fd, temp_path = tempfile.mkstemp(dir=dirpath, prefix='.deploy-cache-')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(content, f)
+                os.replace(temp_path, self.path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+
+    def file_hash(self, path: str) -> str:
+        '''Return the SHA-256 of a host file, computed again only if it was modified'''
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._host_files.get(path)
+            if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+                return cached['sha256']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+
+        with self._lock:
+            self._host_files[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                      'sha256': digest.hexdigest()}
+
+        return digest.hexdigest()
+
+    def target_hashes(self, console: ConsoleBase, paths: List[str],
+                      test_name: str = None) -> Dict[str, str]:
+        '''Return the SHA-256 of files on the target, with a single command.
+
+        Files missing on the target are not part of the result.
+        '''
+        if not paths:
+            return {}
+
+        quoted_paths = ' '.join(shlex.quote(path) for path in paths)
+        output = CommandRunner.run(test_name=test_name or str(self), console=console,
+                                   command=f'sha256sum {quoted_paths} 2>/dev/null; true')
+
+        return {path: digest.lower() for digest, path in SHA256SUM_LINE.findall(output)
+                if path in paths}
+
+    def deploy(self, console: ConsoleBase, sources: List[str], destination: str,
+               timeout: float = 30, compression_level: Optional[int] = None,
+               test_name: str = None) -> Tuple[int, List[str]]:
+        '''Copy the files which are not up to date to the "destination" directory.
+
+        Return the bytes copied, and the list of files skipped.
+        '''
+        target = console.target_id
+        destinations = {source: posixpath.join(destination, os.path.basename(source))
+                        for source in sources}
+        hashes = {source: self.file_hash(source) for source in sources}
+
+        with self._lock:
+            deployed = dict(self._targets.get(target, {}))
+
+        candidates = [source for source in sources
+                      if deployed.get(destinations[source]) == hashes[source]]
+        target_hashes = self.target_hashes(
+            console, [destinations[source] for source in candidates], test_name=test_name)
+
+        skipped = [source for source in candidates
+                   if target_hashes.get(destinations[source]) == hashes[source]]
+        to_copy = [source for source in sources if source not in skipped]
+
+        copied = 0
+        if to_copy:
+            copied = console.copy_files_to_target(
+                sources=to_copy, destination=destination, timeout=timeout,
+                compression_level=compression_level)
+
+        log.log(f'Deploy cache: {len(skipped)} file(s) up to date, {len(to_copy)} copied',
+                level=LogLevel.DEBUG)
+
+        with self._lock:
+            target_files = self._targets.setdefault(target, {})
+            for source in sources:
+                target_files[destinations[source]] = hashes[source]
+            self.save()
+
+        return copied, skipped
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}[{self.path}]'
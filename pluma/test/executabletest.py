@@ -1,11 +1,11 @@
 import os
 from pluma.core.board import Board
-from typing import Tuple
+from typing import Collection, Tuple
 
-from pluma.test import TestBase, CommandRunner
+from pluma.test import TestBase, CommandRunner, DeployCache
 from pluma.core.baseclasses import ConsoleBase
 from pluma.utils import random_dir_name
-from pluma import HostConsole
+from pluma import HostConsolePool
 
 
 class ExecutableTest(TestBase):
@@ -14,16 +14,24 @@ class ExecutableTest(TestBase):
     By default, this test will try to deploy the executable on the target
     and run it. This can be changed to run an executable on the host, or on
     the target directly, skipping the deployment.
+
+    With "deploy_cache", the executable is deployed to a folder kept on the
+    target, and only copied again if it changed (see "DeployCache").
     '''
 
+    # Folder on the target keeping executables deployed with the cache
+    DEPLOY_CACHE_FOLDER = '/tmp/pluma-deploy-cache'
+
     def __init__(self, board: Board, executable_file: str, host_file: bool = True,
-                 run_on_host: bool = False, timeout: float = None):
+                 run_on_host: bool = False, timeout: float = None,
+                 deploy_cache: bool = False):
         abs_path = os.path.abspath(executable_file)
         super().__init__(board, test_name=executable_file)
         self.executable_file = os.path.abspath(executable_file)
         self.host_file = host_file
         self.run_on_host = run_on_host
         self.timeout = timeout if timeout is not None else 5
+        self.deploy_cache = deploy_cache
 
         if self.host_file and not os.path.isfile(abs_path):
             raise ValueError(
@@ -54,24 +62,32 @@ class ExecutableTest(TestBase):
                 f'The console used ({console}) does not support file copy. '
                 'Use a different console like SSH, or run the test on the host')
 
+    @property
+    def resources(self) -> Collection[str]:
+        return {'host'} if self.run_on_host else {'console'}
+
     def test_body(self):
-        filepath = ''
-        console = None
-        temp_folder = None
         if self.run_on_host:
-            console = HostConsole('sh')
-            filepath = self.executable_file
-        else:
-            console = self.board.console
-            if not console:
-                raise ValueError('Current console is null, cannot copy executable')
+            with HostConsolePool.shared().session() as console:
+                CommandRunner.run(test_name=self._test_name, command=self.executable_file,
+                                  console=console, timeout=self.timeout)
+            return
+
+        temp_folder = None
+        console = self.board.console
+        if not console:
+            raise ValueError('Current console is null, cannot copy executable')
 
-            if self.host_file:
-                self.check_console_supports_copy(console)
-                filepath, temp_folder = self.deploy_file_in_tmp_folder(
-                    file=self.executable_file, console=console)
-            else:
-                filepath = self.executable_file
+        if self.host_file and self.deploy_cache:
+            self.check_console_supports_copy(console)
+            filepath = self.deploy_file_in_cache_folder(
+                file=self.executable_file, console=console)
+        elif self.host_file:
+            self.check_console_supports_copy(console)
+            filepath, temp_folder = self.deploy_file_in_tmp_folder(
+                file=self.executable_file, console=console)
+        else:
+            filepath = self.executable_file
 
         try:
             CommandRunner.run(test_name=self._test_name, command=filepath,
@@ -94,3 +110,15 @@ class ExecutableTest(TestBase):
                                destination=destination)
 
         return destination, temp_folder
+
+    def deploy_file_in_cache_folder(self, file: str, console: ConsoleBase) -> str:
+        '''Deploy the file if not up to date on the target, and return its full path'''
+        # Consoles copying files one by one do not create the destination folder
+        CommandRunner.run(test_name=self._test_name,
+                          command=f'mkdir -p {self.DEPLOY_CACHE_FOLDER}',
+                          console=console, timeout=self.timeout)
+        DeployCache.shared().deploy(console, sources=[file],
+                                    destination=self.DEPLOY_CACHE_FOLDER,
+                                    timeout=self.timeout, test_name=self._test_name)
+
+        return os.path.join(self.DEPLOY_CACHE_FOLDER, os.path.basename(file))
@@ -0,0 +1,111 @@
+import binascii
+import re
+import shlex
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+FRAME_STATUS_TOKEN = 'pluma-status-'
+FRAME_STDOUT_TOKEN = 'pluma-stdout-'
+FRAME_STDERR_TOKEN = 'pluma-stderr-'
+FRAME_END_TOKEN = 'pluma-frame-end-'
+
+
+@dataclass
+class FramedCommandResult:
+    '''Exact output and return code of a command run with framing'''
+    command: str
+    stdout: bytes
+    stderr: bytes
+    retcode: int
+
+
+def framed_command(command: str, frame_id: str) -> str:
+    '''Return a shell command running "command" with its output framed.
+
+    The command runs in the current shell, with stdout and stderr saved to
+    temporary files on the target. They are then sent base64 encoded, after
+    the return code, each preceded by a marker line. Markers are quoted in
+    the command, so that its echo does not match them. Requires "base64" on
+    the target.
+    '''
+    def marker(token, suffix=''):
+        return f'echo {token}"{frame_id}"{suffix}'
+
+    files = f'"${{TMPDIR:-/tmp}}/pluma-{frame_id}"'
+    return (f'eval {shlex.quote(command)} >{files}.out 2>{files}.err; '
+            f'{marker(FRAME_STATUS_TOKEN, "=$?")}; '
+            f'{marker(FRAME_STDOUT_TOKEN)}; base64 {files}.out; '
+            f'{marker(FRAME_STDERR_TOKEN)}; base64 {files}.err; '
+            f'{marker(FRAME_END_TOKEN)}; rm -f {files}.out {files}.err')
+
+
+class FramedOutputDecoder():
+    '''Streaming decoder of the output of a command run with "framed_command".
+
+    Data received is fed as it comes, and decoded line by line, in linear
+    time. Anything before the frame (e.g. the command echo) is ignored.
+    '''
+
+    def __init__(self, frame_id: str):
+        self.frame_id = frame_id
+        self.retcode: Optional[int] = None
+        self.done = False
+        self._status_regex = re.compile(re.escape(FRAME_STATUS_TOKEN + frame_id) + r'=(-?\d+)')
+        self._pending_line = ''
+        self._section: Optional[str] = None
+        self._decoded: Dict[str, List[bytes]] = {'stdout': [], 'stderr': []}
+        self._undecoded = ''
+
+    @property
+    def stdout(self) -> bytes:
+        return b''.join(self._decoded['stdout'])
+
+    @property
+    def stderr(self) -> bytes:
+        return b''.join(self._decoded['stderr'])
+
+    def feed(self, text: str):
+        '''Decode text received, raise ValueError if the frame is invalid'''
+        if self.done or not text:
+            return
+
+        lines = (self._pending_line + text).split('\n')
+        self._pending_line = lines.pop()
+        for line in lines:
+            self._feed_line(line.strip())
+            if self.done:
+                break
+
+    def _feed_line(self, line: str):
+        if self.retcode is None:
+            status = self._status_regex.search(line)
+            if status:
+                self.retcode = int(status.group(1))
+            return
+
+        if line.endswith(FRAME_STDOUT_TOKEN + self.frame_id):
+            self._start_section('stdout')
+        elif line.endswith(FRAME_STDERR_TOKEN + self.frame_id):
+            self._start_section('stderr')
+        elif line.endswith(FRAME_END_TOKEN + self.frame_id):
+            self._start_section(None)
+            self.done = True
+        elif self._section and line:
+            self._decode(line)
+
+    def _start_section(self, section: Optional[str]):
+        if self._undecoded:
+            raise ValueError(f'Truncated base64 data in {self._section} frame')
+
+        self._section = section
+
+    def _decode(self, line: str):
+        # Decode whole base64 quanta only, in case lines are not aligned on them
+        data = self._undecoded + line
+        size = len(data) - len(data) % 4
+        self._undecoded = data[size:]
+        try:
+            self._decoded[self._section].append(binascii.a2b_base64(data[:size]))
+        except binascii.Error as e:
+            raise ValueError(f'Invalid base64 data in {self._section} frame: {e}')
@@ -1,20 +1,41 @@
-from typing import List, Optional, Union
-
-from pluma.core.baseclasses import Logger
-from pluma import HostConsole, Board
+import base64
+import hashlib
+import os
+import tempfile
+from typing import Collection, List, Optional, Union
+
+from pluma.core.baseclasses import Logger, LogLevel
+from pluma import HostConsolePool, Board
 from pluma.core.baseclasses import ConsoleBase
 from pluma.test import CommandRunner, TestBase, TaskFailed
 
 log = Logger()
 
+SCRIPT_CACHED_TOKEN = 'pluma-script-cached-'
+
 
 class ShellTest(TestBase):
-    '''Execute script within the target (or host) shell'''
+    '''Execute script within the target (or host) shell
+
+    With "pipelined", all the script commands are sent at once, and their
+    outputs and return codes read back together (see "CommandRunner.run_batch").
+    With "framed", the output of each command is read exactly, whatever it
+    contains (see "CommandRunner.run_framed"). Host shells are reused
+    across tests (see "HostConsolePool").
+    With "upload", all the script commands are uploaded once as a single
+    script, named after its content hash, and run with a single command
+    (see "run_uploaded_script").
+    '''
+
+    SCRIPTS_FOLDER = '/tmp/pluma-scripts'
+    # Larger scripts are uploaded with the console file copy, if supported
+    MAX_INLINE_SCRIPT_SIZE = 4096
 
     def __init__(self, board: Board, script: Union[str, List[str]], name: str = None,
                  should_match_regex: List[str] = None,  should_not_match_regex: List[str] = None,
                  run_on_host: bool = False, timeout: int = None,  runs_in_shell: bool = True,
-                 login_automatically: bool = False):
+                 login_automatically: bool = False, pipelined: bool = False,
+                 framed: bool = False, upload: bool = False):
         super().__init__(board, test_name=name)
         self.should_match_regex = should_match_regex
         self.should_not_match_regex = should_not_match_regex
@@ -22,6 +43,9 @@ class ShellTest(TestBase):
         self.timeout = timeout if timeout is not None else 5
         self.runs_in_shell = runs_in_shell
         self.login_automatically = login_automatically
+        self.pipelined = pipelined
+        self.framed = framed
+        self.upload = upload
 
         if isinstance(script, str):
             self.scripts = [script]
@@ -34,6 +58,10 @@ class ShellTest(TestBase):
                 ' was defined. Define a console in "pluma-target.yml", or use '
                 ' "run_on_host" test attribute to run on the host instead.')
 
+    @property
+    def resources(self) -> Collection[str]:
+        return {'host'} if self.run_on_host else {'console'}
+
     def test_body(self):
         self.run_commands()
 
@@ -44,7 +72,9 @@ class ShellTest(TestBase):
 
         if console is None:
             if self.run_on_host:
-                console = HostConsole('sh')
+                with HostConsolePool.shared().session() as host_console:
+                    return self.run_commands(console=host_console, scripts=scripts,
+                                             timeout=timeout)
             else:
                 console = self.board.console
                 if not console:
@@ -54,27 +84,121 @@ class ShellTest(TestBase):
         if self.runs_in_shell and self.login_automatically and console.requires_login:
             self.board.login()
 
+        if self.upload and self.runs_in_shell:
+            return self.run_uploaded_script(console=console, scripts=scripts,
+                                            timeout=timeout)
+
+        if self.pipelined and self.runs_in_shell:
+            return self.run_pipelined_commands(console=console, scripts=scripts,
+                                               timeout=timeout)
+
         output = ''
         for script in scripts:
             output += self.run_command(console=console, script=script, timeout=timeout)
 
         return output
 
+    def run_pipelined_commands(self, console: ConsoleBase, scripts: List[str],
+                               timeout: Optional[int] = None) -> str:
+        '''Run all commands at once, stopping at the first failed command'''
+        timeout = timeout or self.timeout
+        results = CommandRunner.run_batch(test_name=self._test_name, console=console,
+                                          commands=scripts, timeout=timeout,
+                                          stop_on_error=True)
+
+        output = ''
+        for result in results:
+            if result.retcode != 0:
+                CommandRunner.log_error(
+                    test_name=self._test_name, sent=result.command, output=result.output,
+                    error=f'Command "{result.command}" returned with exit code '
+                    f'{result.retcode}')
+
+            self.check_command_output(script=result.command, output=result.output)
+            output += result.output
+
+        if len(results) < len(scripts):
+            CommandRunner.log_error(test_name=self._test_name,
+                                    sent=scripts[len(results)], output=output,
+                                    error='Failed to retrieve the command output')
+
+        return output
+
+    def run_uploaded_script(self, console: ConsoleBase, scripts: List[str],
+                            timeout: Optional[int] = None) -> str:
+        '''Run all commands as a single script, stopping at the first failed command'''
+        timeout = timeout or self.timeout
+        path = self.upload_script(console=console, scripts=scripts, timeout=timeout)
+
+        command = f'sh {path}'
+        output = CommandRunner.run(test_name=self._test_name, console=console,
+                                   command=command, timeout=timeout * len(scripts),
+                                   framed=self.framed)
+        self.check_command_output(script=command, output=output)
+        return output
+
+    def upload_script(self, console: ConsoleBase, scripts: List[str],
+                      timeout: Optional[int] = None) -> str:
+        '''Upload the commands as a script, unless already on the target, and return its path.
+
+        The script is named after its content hash, and the target is always
+        checked for it, as it may have been cleared since (e.g. "/tmp" on
+        reboot). Small scripts are sent base64 encoded in a heredoc, and
+        larger ones copied with the console file copy, if supported.
+        '''
+        content = ('set -e\n' + '\n'.join(scripts) + '\n').encode()
+        digest = hashlib.sha256(content).hexdigest()[:16]
+        path = f'{self.SCRIPTS_FOLDER}/{digest}.sh'
+
+        # Token quoted in the command, so that its echo does not match it
+        output = CommandRunner.run(
+            test_name=self._test_name, console=console, timeout=timeout,
+            command=f'mkdir -p {self.SCRIPTS_FOLDER}; '
+            f'if [ -f {path} ]; then echo {SCRIPT_CACHED_TOKEN}"{digest}"; fi')
+
+        if SCRIPT_CACHED_TOKEN + digest not in output:
+            log.log(f'Uploading script {path} ({len(content)}B)', level=LogLevel.DEBUG)
+            if console.support_file_copy and len(content) > self.MAX_INLINE_SCRIPT_SIZE:
+                with tempfile.TemporaryDirectory() as folder:
+                    source = os.path.join(folder, os.path.basename(path))
+                    with open(source, 'wb') as f:
+                        f.write(content)
+
+                    console.copy_to_target(source=source, destination=f'{path}.tmp')
+                upload_command = f'mv {path}.tmp {path}'
+            else:
+                upload_command = self.inline_upload_command(content=content, path=path)
+
+            CommandRunner.run(test_name=self._test_name, console=console,
+                              command=upload_command, timeout=timeout)
+
+        return path
+
+    @staticmethod
+    def inline_upload_command(content: bytes, path: str) -> str:
+        '''Return a command writing "content" to "path", sent in a base64 heredoc'''
+        encoded = base64.encodebytes(content).decode('ascii')
+        return (f"base64 -d > {path}.tmp << 'PLUMA_SCRIPT_END'\n{encoded}"
+                f'PLUMA_SCRIPT_END\nmv {path}.tmp {path}')
+
     def run_command(self, console: ConsoleBase, script: str,
                     timeout: Optional[int] = None) -> str:
         timeout = timeout or self.timeout
 
         if self.runs_in_shell:
             output = CommandRunner.run(test_name=self._test_name, console=console,
-                                       command=script, timeout=timeout)
+                                       command=script, timeout=timeout, framed=self.framed)
         else:
             output = CommandRunner.run_raw(test_name=self._test_name, console=console,
                                            command=script, timeout=timeout)
 
+        self.check_command_output(script=script, output=output)
+        return output
+
+    def check_command_output(self, script: str, output: str):
         if self.should_match_regex or self.should_not_match_regex:
             CommandRunner.check_output(test_name=self._test_name, command=script, output=output,
                                        match_regex=self.should_match_regex,
                                        error_regex=self.should_not_match_regex)
 
         log.log(CommandRunner.format_command_log(sent=script, output=output))
-        return output
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Collection, Optional
 
 from pluma.core import Board
 
@@ -9,6 +10,12 @@ class TestBase(ABC):
     test_count = 0
     task_hooks = ['setup', 'test_body', 'teardown']
 
+    # Resources used by the test, that tests run concurrently cannot share
+    # (see "TestRunnerParallel"): "console" (the current board console),
+    # "console:<name>" (e.g. "console:ssh"), "host" or "power". None if
+    # unknown, in which case the test runs alone.
+    resources: Optional[Collection[str]] = None
+
     def __init__(self, board: Board = None, test_name: str = None):
         """Construct a TestBase with a board, and test suffix"""
         self.board = board
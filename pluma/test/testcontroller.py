@@ -7,7 +7,7 @@ from pluma.utils import send_exception_email, datetime_to_timestamp, \
     regex_filter_list
 
 from .unittest import deferred_function
-from pluma.test import TestRunner
+from pluma.test import TestRunnerBase
 
 from .resultsplotter import DefaultResultsPlotter
 from .resultsprocessor import DefaultResultsProcessor
@@ -115,7 +115,7 @@ class TestController():
                  setup_n_iterations=None, force_initial_run=False, email_on_except=True,
                  log_func=None, verbose_log_func=None, debug_log_func=None,
                  results_plotter=None, results_processor=None):
-        assert isinstance(testrunner, TestRunner)
+        assert isinstance(testrunner, TestRunnerBase)
 
         self.testrunner = testrunner
         self.setup = setup
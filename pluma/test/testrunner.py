@@ -2,11 +2,13 @@ from pluma.core.board import Board
 import traceback
 import time
 from abc import ABC, abstractmethod
-from typing import Iterable, List, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Collection, Dict, Iterable, List, Optional, Set, Union
 
 from pluma import utils
 from pluma.core.baseclasses import LogLevel, Logger
 from pluma.test import TestBase, TestGroup, AbortTesting
+from pluma.test.artifactcollector import ArtifactCollector
 
 global_logger = Logger()
 
@@ -15,10 +17,13 @@ class TestRunnerBase(ABC):
     '''Run a set of tests a single time and collect their settings and saved data'''
 
     def __init__(self, board: Board = None, tests: Union[TestBase, Iterable[TestBase]] = None,
-                 email_on_fail: bool = None, continue_on_fail: bool = None):
+                 email_on_fail: bool = None, continue_on_fail: bool = None,
+                 artifacts: Optional[ArtifactCollector] = None):
         self.board = board
         self.email_on_fail = email_on_fail if email_on_fail is not None else False
         self.continue_on_fail = continue_on_fail if continue_on_fail is not None else False
+        # Files collected from the board when a task fails
+        self.artifacts = artifacts
         self.test_fails = []
 
         # Use global logger if no board available
@@ -71,6 +76,9 @@ class TestRunnerBase(ABC):
         else:
             self.log('\n== ALL TESTS COMPLETED ==', color='blue', bold=True,
                      level=LogLevel.DEBUG)
+        finally:
+            if self.artifacts:
+                self.artifacts.wait()
 
         # Check if any tasks failed
         if self.test_fails:
@@ -142,6 +150,9 @@ class TestRunnerBase(ABC):
 
         try:
             task_func()
+            if self.board:
+                # Fail the task on a fatal console watcher match not raised into it
+                self.board.raise_watch_error()
         # If exception is one we deliberately caused, don't handle it
         except KeyboardInterrupt as e:
             raise e
@@ -186,6 +197,12 @@ class TestRunnerBase(ABC):
         }
         self.test_fails.append(failed)
 
+        if self.artifacts and self.board:
+            # Set once pulled, possibly in the background
+            failed['artifacts'] = None
+            self.artifacts.collect(self.board, f'{test}-{task_name}',
+                                   on_collected=lambda path: failed.update(artifacts=path))
+
         if self.email_on_fail:
             self.send_fail_email(exception, test, task_name)
 
@@ -231,9 +248,104 @@ class TestRunner(TestRunnerBase):
 
 
 class TestRunnerParallel(TestRunnerBase):
-    '''Run a set of tests in parallel'''
+    '''Run a set of tests concurrently, on a pool of "max_workers" threads.
+
+    Tests declare the resources they use (see "TestBase.resources"). Tests
+    sharing a resource run one at a time, in the order of the tests, as
+    tests without declared resources do with all other tests. The tasks
+    of each test run in order, as with "TestRunner", and the log output of
+    each test is held until it completes, so that outputs do not interleave.
+    Once a task fails without "continue_on_fail", no more tests are started.
+    If "artifacts" are collected over the current console when a task fails,
+    all tests are considered to use the "console" too.
+    '''
+
+    def __init__(self, *args, max_workers: Optional[int] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_workers = max_workers or 4
 
     def _run(self, tests: Iterable[TestBase]):
         self.log('== TESTING MODE: PARALLEL ==', color='blue', bold=True,
                  level=LogLevel.DEBUG)
-        self._run_tasks(tests, self.known_tasks)
+
+        tests = list(tests)
+        failure_resources = self._failure_resources()
+        # Tests which must complete before each test starts
+        dependencies = [{earlier for earlier in range(index)
+                         if self.resources_conflict(tests[earlier], tests[index],
+                                                    failure_resources)}
+                        for index in range(len(tests))]
+
+        pending = list(range(len(tests)))
+        completed: Set[int] = set()
+        running: Dict[Future, int] = {}
+        errors: Dict[int, BaseException] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers,
+                                    thread_name_prefix='TestRunnerParallel') as executor:
+                while pending or running:
+                    ready = [index for index in pending if dependencies[index] <= completed]
+                    for index in ready if not errors else []:
+                        pending.remove(index)
+                        running[executor.submit(self._run_test, tests[index])] = index
+
+                    if not running:
+                        break
+
+                    finished, __ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index = running.pop(future)
+                        completed.add(index)
+                        if future.exception():
+                            errors[index] = future.exception()
+        finally:
+            # Failures in the order of the tests, as when run sequentially
+            self.test_fails.sort(key=lambda failed: tests.index(failed['test']))
+
+        if errors:
+            raise errors[min(errors)]
+
+    def _run_test(self, test: TestBase):
+        '''Run all tasks of a test, holding its log output until done'''
+        self.hold_log()
+        try:
+            for task_name in self.known_tasks:
+                self._run_tasks(test, task_name)
+        finally:
+            self.release_log()
+
+    def _failure_resources(self) -> Set[str]:
+        '''Return the resources used by any test when one of its tasks fails'''
+        if not self.artifacts or not self.board:
+            return set()
+
+        # Artifacts copied in the background do not use the console shell
+        console = ArtifactCollector.select_console(self.board)
+        if not console or console.support_background_copy:
+            return set()
+
+        return {'console'}
+
+    @staticmethod
+    def resources_conflict(first: TestBase, second: TestBase,
+                           extra_resources: Collection[str] = ()) -> bool:
+        '''Return True if the tests cannot run at the same time.
+
+        "extra_resources" are used by both tests, in addition to their own.
+        '''
+        if first.resources is None or second.resources is None:
+            return True
+
+        first_resources = set(first.resources) | set(extra_resources)
+        second_resources = set(second.resources) | set(extra_resources)
+        if first_resources & second_resources:
+            return True
+
+        # The current console can be any of the board consoles
+        for resources, other in [(first_resources, second_resources),
+                                 (second_resources, first_resources)]:
+            if 'console' in resources and any(resource.startswith('console:')
+                                              for resource in other):
+                return True
+
+        return False
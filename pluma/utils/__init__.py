@@ -8,3 +8,5 @@ from .interactive import getch, seech
 from .asynchronous import AsyncSampler
 from .graphing import boot_graph
 from .system import random_dir_name
+from .ringbuffer import RingBuffer
+from .ahocorasick import AhoCorasick
@@ -0,0 +1,97 @@
+import re
+
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+
+class AhoCorasick():
+    '''Automaton finding any of a set of literal keywords in a single pass over data.
+
+    The cost of a search is linear in the size of the data searched,
+    regardless of the number of keywords. Keywords are bytes, and the
+    automaton is immutable once built.
+    '''
+
+    def __init__(self, keywords: Iterable[bytes]):
+        self.keywords: Tuple[bytes, ...] = tuple(keywords)
+        if not all(self.keywords):
+            raise ValueError('Keywords cannot be empty')
+
+        self.max_length = max((len(keyword) for keyword in self.keywords), default=0)
+
+        # Trie of the keywords, with the keywords ending on each node
+        children: List[dict] = [{}]
+        outputs: List[List[Tuple[int, int]]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for byte in keyword:
+                if byte not in children[state]:
+                    children.append({})
+                    outputs.append([])
+                    children[state][byte] = len(children) - 1
+                state = children[state][byte]
+            outputs[state].append((len(keyword), index))
+
+        # Full transition table, following failure links breadth-first
+        self._transitions: List[List[int]] = [[0] * 256 for __ in children]
+        failures = [0] * len(children)
+        queue = deque()
+        for byte, child in children[0].items():
+            self._transitions[0][byte] = child
+            queue.append(child)
+
+        while queue:
+            state = queue.popleft()
+            outputs[state].extend(outputs[failures[state]])
+            self._transitions[state] = list(self._transitions[failures[state]])
+            for byte, child in children[state].items():
+                failures[child] = self._transitions[failures[state]][byte]
+                self._transitions[state][byte] = child
+                queue.append(child)
+
+        # Longest keywords first, as they start the earliest
+        self._outputs = [sorted(output, key=lambda o: (-o[0], o[1])) for output in outputs]
+
+        # Bytes starting a keyword, to skip the data that cannot match in C
+        first_bytes = sorted(children[0])
+        self._first_bytes = re.compile(
+            b'[' + b''.join(re.escape(bytes([byte])) for byte in first_bytes) + b']'
+            if first_bytes else b'(?!)')
+
+    def search(self, data: bytes, start: int = 0) -> Optional[Tuple[int, int, int]]:
+        '''Return the leftmost keyword found in "data" from "start", or None.
+
+        The match is returned as (start, end, keyword index). Keywords found
+        at the same position are resolved in the order of the keywords.
+        '''
+        transitions = self._transitions
+        outputs = self._outputs
+        best: Optional[Tuple[int, int, int]] = None
+
+        state = 0
+        position = start
+        length = len(data)
+        while position < length:
+            if state == 0:
+                # Jump to the next byte starting a keyword
+                candidate = self._first_bytes.search(data, position)
+                if not candidate:
+                    break
+                position = candidate.start()
+
+            state = transitions[state][data[position]]
+            position += 1
+            for keyword_length, index in outputs[state]:
+                found = (position - keyword_length, index, position)
+                if best is None or found[:2] < best[:2]:
+                    best = found
+
+            # Keywords ending later cannot start before the best match found
+            if best is not None and position - self.max_length >= best[0]:
+                break
+
+        if best is None:
+            return None
+
+        match_start, index, match_end = best
+        return match_start, match_end, index
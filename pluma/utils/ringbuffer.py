@@ -0,0 +1,81 @@
+from typing import Optional
+
+
+class RingBuffer():
+    '''Bounded byte buffer keeping only the most recent "capacity" bytes.
+
+    Data is addressed with absolute stream offsets: "start" is the offset of
+    the oldest byte still available, and "end" the total number of bytes
+    ever appended. Appending is O(n) in the size of the data appended, and
+    the memory used never grows beyond "capacity".
+    '''
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f'Ring buffer capacity must be at least 1 byte, but got {capacity}')
+
+        self.capacity = capacity
+        self._buffer = bytearray()
+        # Index of the oldest byte in "_buffer", once the buffer is full
+        self._position = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def start(self) -> int:
+        '''Absolute offset of the oldest byte available'''
+        return self._end - len(self._buffer)
+
+    @property
+    def end(self) -> int:
+        '''Absolute offset following the last byte appended'''
+        return self._end
+
+    def append(self, data: bytes):
+        '''Append data, overwriting the oldest data if the capacity is reached'''
+        view = memoryview(data)
+        self._end += len(view)
+
+        if len(view) >= self.capacity:
+            self._buffer[:] = view[len(view) - self.capacity:]
+            self._position = 0
+            return
+
+        free = self.capacity - len(self._buffer)
+        if free > 0:
+            taken = min(free, len(view))
+            self._buffer += view[:taken]
+            view = view[taken:]
+            if not view:
+                return
+
+        # Buffer full, overwrite the oldest data and wrap around
+        first = min(len(view), self.capacity - self._position)
+        self._buffer[self._position:self._position + first] = view[:first]
+        self._buffer[:len(view) - first] = view[first:]
+        self._position = (self._position + len(view)) % self.capacity
+
+    def read(self, start: Optional[int] = None, end: Optional[int] = None) -> bytes:
+        '''Return the data between the absolute offsets "start" and "end".
+
+        Offsets are clamped to the data available, so data already
+        overwritten is silently skipped.
+        '''
+        start = self.start if start is None else max(start, self.start)
+        end = self.end if end is None else min(end, self.end)
+        if start >= end:
+            return b''
+
+        size = end - start
+        first = (self._position + start - self.start) % len(self._buffer)
+        if first + size <= len(self._buffer):
+            return bytes(self._buffer[first:first + size])
+
+        return bytes(self._buffer[first:]) + bytes(self._buffer[:first + size - len(self._buffer)])
+
+    def clear(self):
+        '''Discard all data, keeping the absolute offsets'''
+        self._buffer = bytearray()
+        self._position = 0
@@ -0,0 +1,92 @@
+'''Measure the console reception throughput of a pty-backed HostConsole.
+
+A large file is generated and printed with "cat" in a HostConsole, and
+the console is drained with "read_all" until all the content is received.
+The throughput (MB/s) and host CPU time per MB are reported for each of
+the read chunk sizes requested.
+
+Usage:
+    python3 tests/benchmarks/console_read_benchmark.py --size-mb 4 --chunk-sizes 1 4096 65536
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from pluma import HostConsole  # noqa: E402
+from pluma.core.baseclasses import PexpectEngine  # noqa: E402
+
+LINE = 'The quick brown fox jumps over the lazy dog 0123456789\n'
+
+
+def create_content_file(size_bytes: int) -> str:
+    '''Create a temporary file of "size_bytes" of printable text, and return its path'''
+    line_count = size_bytes // len(LINE) + 1
+    _, filename = tempfile.mkstemp(prefix='pluma-benchmark-')
+    with open(filename, 'w') as f:
+        f.write(LINE * line_count)
+
+    return filename
+
+
+def benchmark_read(filename: str, read_chunk_size: int, timeout: float) -> dict:
+    '''Drain the output of "cat" through a HostConsole, and return the measurements'''
+    expected_size = os.path.getsize(filename)
+
+    # "cat -" keeps the process alive after printing the file, reading from its stdin
+    console = HostConsole(f'cat {filename} -')
+    console.engine = PexpectEngine(read_chunk_size=read_chunk_size, raw_logfile='/dev/null')
+    console.open()
+
+    received_size = 0
+    start_time = time.perf_counter()
+    start_cpu = time.process_time()
+    try:
+        while received_size < expected_size and time.perf_counter() - start_time < timeout:
+            # The pty translates "\n" into "\r\n", only count the original content
+            received_size += len(console.read_all().replace('\r\n', '\n'))
+    finally:
+        elapsed = time.perf_counter() - start_time
+        cpu = time.process_time() - start_cpu
+        console.close()
+
+    received_mb = received_size / (1024 * 1024)
+    return {
+        'chunk_size': read_chunk_size,
+        'received_mb': received_mb,
+        'complete': received_size >= expected_size,
+        'elapsed_s': elapsed,
+        'mb_per_s': received_mb / elapsed if elapsed else 0,
+        'cpu_s_per_mb': cpu / received_mb if received_mb else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the console reception throughput')
+    parser.add_argument('--size-mb', type=float, default=4,
+                        help='size of the content printed on the console, in MB')
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[1, 4096, 65536],
+                        help='maximum read chunk sizes to benchmark, in bytes')
+    parser.add_argument('--timeout', type=float, default=120,
+                        help='maximum duration of each benchmark run, in seconds')
+    args = parser.parse_args()
+
+    filename = create_content_file(int(args.size_mb * 1024 * 1024))
+    try:
+        print(f'{"chunk size":>12} {"received":>10} {"time":>9} {"throughput":>12} '
+              f'{"CPU/MB":>10}')
+        for chunk_size in args.chunk_sizes:
+            result = benchmark_read(filename, read_chunk_size=chunk_size, timeout=args.timeout)
+            incomplete = '' if result['complete'] else ' (timeout)'
+            print(f'{result["chunk_size"]:>12} {result["received_mb"]:>8.2f}MB '
+                  f'{result["elapsed_s"]:>8.2f}s {result["mb_per_s"]:>8.2f}MB/s '
+                  f'{result["cpu_s_per_mb"]:>9.3f}s{incomplete}')
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 import pytest
+from unittest.mock import MagicMock, patch
 
+from pluma import HostConsole
 from pluma.test import CommandRunner, TaskFailed
 
 
@@ -75,3 +77,110 @@ def test_CommandRunner_check_output_should_error(match_regex, error_regex, outpu
     with pytest.raises(TaskFailed):
         CommandRunner.check_output(test_name='test', command='cmd', output=output,
                                    match_regex=match_regex, error_regex=error_regex)
+
+
+@pytest.fixture
+def shell_console():
+    console = HostConsole('sh')
+    yield console
+    console.close()
+
+
+def test_CommandRunner_run_batch_should_return_outputs_and_retcodes(shell_console):
+    results = CommandRunner.run_batch('test', shell_console,
+                                      ['echo abc', 'echo def; false', 'echo "x y" && echo z'],
+                                      timeout=5)
+
+    assert [result.output.splitlines() for result in results] == [
+        ['abc'], ['def'], ['x y', 'z']]
+    assert [result.retcode for result in results] == [0, 1, 0]
+    assert [result.command for result in results] == [
+        'echo abc', 'echo def; false', 'echo "x y" && echo z']
+
+
+def test_CommandRunner_run_batch_should_send_commands_at_once(shell_console):
+    with patch.object(shell_console, 'send_and_expect',
+                      wraps=shell_console.send_and_expect) as send_and_expect:
+        results = CommandRunner.run_batch('test', shell_console,
+                                          [f'echo {i}' for i in range(10)], timeout=5)
+
+    send_and_expect.assert_called_once()
+    assert [result.output for result in results] == [str(i) for i in range(10)]
+
+
+def test_CommandRunner_run_batch_should_keep_shell_state(shell_console):
+    results = CommandRunner.run_batch('test', shell_console,
+                                      ['cd /', 'pluma_var=abc', 'pwd; echo $pluma_var'],
+                                      timeout=5)
+
+    assert results[-1].output.splitlines() == ['/', 'abc']
+
+
+def test_CommandRunner_run_batch_should_stop_on_error(shell_console):
+    results = CommandRunner.run_batch('test', shell_console,
+                                      ['echo abc', 'exit_with() { return $1; }; exit_with 3',
+                                       'echo never'],
+                                      timeout=5, stop_on_error=True)
+
+    assert [(result.output, result.retcode) for result in results] == [('abc', 0), ('', 3)]
+
+
+def test_CommandRunner_run_batch_should_split_long_batches(shell_console):
+    commands = [f'echo {i} {"x" * 500}' for i in range(10)]
+    with patch.object(shell_console, 'send_and_expect',
+                      wraps=shell_console.send_and_expect) as send_and_expect:
+        results = CommandRunner.run_batch('test', shell_console, commands, timeout=5)
+
+    assert send_and_expect.call_count > 1
+    assert [result.output for result in results] == [f'{i} {"x" * 500}' for i in range(10)]
+
+
+def test_CommandRunner_run_batch_should_error_on_timeout(mock_console):
+    mock_console.send_and_expect.return_value = ('', None)
+    with pytest.raises(TaskFailed):
+        CommandRunner.run_batch('test', mock_console, ['echo abc'], timeout=1)
+
+
+def test_CommandRunner_run_framed_should_return_stdout_stderr_and_retcode(shell_console):
+    result = CommandRunner.run_framed('test', shell_console,
+                                      'echo out; echo err >&2; sh -c "exit 4"',
+                                      timeout=5)
+
+    assert result.stdout == b'out\n'
+    assert result.stderr == b'err\n'
+    assert result.retcode == 4
+
+
+def test_CommandRunner_run_framed_should_return_binary_output(shell_console):
+    result = CommandRunner.run_framed('test', shell_console,
+                                      r"printf 'a\000b\r\n\377'", timeout=5)
+
+    assert result.stdout == b'a\x00b\r\n\xff'
+    assert result.retcode == 0
+
+
+def test_CommandRunner_run_framed_should_return_output_containing_command(shell_console):
+    command = 'echo echo abc'
+    result = CommandRunner.run_framed('test', shell_console, command, timeout=5)
+
+    assert result.stdout == b'echo abc\n'
+
+
+def test_CommandRunner_run_framed_should_return_large_output(shell_console):
+    result = CommandRunner.run_framed('test', shell_console, 'seq 1 100000', timeout=10)
+
+    assert result.stdout == ''.join(f'{i}\n' for i in range(1, 100001)).encode()
+
+
+def test_CommandRunner_run_framed_should_error_on_timeout(mock_console):
+    mock_console.read_all.return_value = ''
+    mock_console.engine = MagicMock()
+    with pytest.raises(TaskFailed):
+        CommandRunner.run_framed('test', mock_console, 'echo abc', timeout=0.1)
+
+
+def test_CommandRunner_run_framed_mode_should_error_on_retcode(shell_console):
+    with pytest.raises(TaskFailed, match='exit code 1'):
+        CommandRunner.run('test', shell_console, 'false', framed=True)
+
+    assert CommandRunner.run('test', shell_console, 'echo abc', framed=True) == 'abc\n'
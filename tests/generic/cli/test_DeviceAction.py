@@ -1,6 +1,6 @@
 import time
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from pluma import Board
 from pluma.core.baseclasses import ConsoleBase
@@ -66,6 +66,76 @@ def test_WaitForPatternAction_should_succeed_when_matched(mock_board):
     action.execute()
 
 
+def test_WaitForPatternAction_should_search_data_since_previous_action(mock_board):
+    LoginAction(mock_board).test_body()
+    previous_start = time.time()
+    action = WaitForPatternAction(mock_board, pattern='abc')
+
+    action.test_body()
+
+    mock_board.console.read_all.assert_not_called()
+    since_time = mock_board.console.wait_for_match.call_args.kwargs['since_time']
+    assert previous_start - 1 < since_time <= previous_start
+
+
+def test_WaitForPatternAction_should_search_data_from_now(mock_board):
+    action = WaitForPatternAction(mock_board, pattern='abc', since='now')
+
+    action.test_body()
+
+    mock_board.console.read_all.assert_called_once()
+    assert mock_board.console.wait_for_match.call_args.kwargs['since_time'] is None
+
+
+def test_WaitForPatternAction_should_look_back_seconds(mock_board):
+    action = WaitForPatternAction(mock_board, pattern='abc', since=5)
+
+    action.test_body()
+
+    since_time = mock_board.console.wait_for_match.call_args.kwargs['since_time']
+    assert time.time() - 6 < since_time <= time.time() - 5
+
+
+def test_WaitForPatternAction_should_error_on_invalid_since(mock_board):
+    with pytest.raises(ValueError):
+        WaitForPatternAction(mock_board, pattern='abc', since='yesterday')
+
+
+def test_WaitForPatternAction_should_match_pattern_received_during_previous_action(
+        serial_console_proxy):
+    board = Board("board", console=serial_console_proxy.console)
+    serial_console_proxy.console.open()
+
+    class PrintAction(DeviceActionBase):
+        def execute(self):
+            serial_console_proxy.proxy.write('login:\n')
+            # Read already, e.g. by the previous action
+            time.sleep(0.2)
+            assert 'login:' in board.console.read_all()
+
+    PrintAction(board).test_body()
+    WaitForPatternAction(board, pattern='login:', timeout=1).test_body()
+
+    with pytest.raises(TaskFailed):
+        WaitForPatternAction(board, pattern='login:', timeout=0.5, since='now').test_body()
+
+
+def test_WaitForPatternAction_should_not_match_pattern_matched_by_previous_wait(
+        serial_console_proxy):
+    board = Board("board", console=serial_console_proxy.console)
+    serial_console_proxy.console.open()
+
+    class PrintAction(DeviceActionBase):
+        def execute(self):
+            serial_console_proxy.proxy.write('login:\n')
+
+    PrintAction(board).test_body()
+    WaitForPatternAction(board, pattern='login:', timeout=1).test_body()
+
+    with pytest.raises(TaskFailed):
+        WaitForPatternAction(board, pattern='login:', timeout=0.5).test_body()
+
+
 def test_WaitForPatternAction_should_succeed_when_matched_proxy_console(serial_console_proxy):
     mock_board = Board("board", console=serial_console_proxy.console)
     expected_pattern = 'abc'
@@ -142,19 +212,47 @@ def test_DeployAction_should_error_if_console_does_not_support_copy(mock_board):
 
 def test_DeployAction_should_deploy_files(mock_board):
     mock_board.console.support_file_copy = True
-    mock_board.console.copy_to_target = MagicMock()
+    mock_board.console.copy_files_to_target = MagicMock(return_value=1000)
     files = ['/a/abc.so', 'other']
     destination = '/some/where'
     timeout = 666
 
     action = DeployAction(board=mock_board, files=files, destination=destination,
-                          timeout=timeout)
+                          timeout=timeout, compression_level=6)
+    action.execute()
+
+    mock_board.console.copy_files_to_target.assert_called_once_with(
+        sources=files, destination=destination, timeout=timeout, compression_level=6)
+
+
+def test_DeployAction_should_save_throughput(mock_board):
+    mock_board.console.support_file_copy = True
+    mock_board.console.copy_files_to_target = MagicMock(return_value=1000)
+
+    action = DeployAction(board=mock_board, files=['myfile'], destination='there')
     action.execute()
 
-    assert mock_board.console.copy_to_target.call_count == len(files)
-    index = 0
-    for call in mock_board.console.copy_to_target.call_args_list:
-        assert call[1]['source'] == files[index]
-        assert call[1]['destination'] == destination
-        assert call[1]['timeout'] == timeout
-        index += 1
+    assert action.data['deployed_bytes'] == 1000
+    assert action.data['deploy_duration'] >= 0
+    assert action.data['deploy_throughput'] >= 0
+
+
+def test_DeployAction_should_error_on_invalid_compression_level(mock_board):
+    with pytest.raises(ValueError):
+        DeployAction(board=mock_board, files=['myfile'], destination='there',
+                     compression_level=10)
+
+
+def test_DeployAction_should_use_deploy_cache(mock_board):
+    mock_board.console.support_file_copy = True
+    files = ['/a/abc.so', 'other']
+
+    action = DeployAction(board=mock_board, files=files, destination='/there', cache=True)
+    with patch('pluma.cli.deviceactions.DeployCache.shared') as shared:
+        shared.return_value.deploy.return_value = (10, ['other'])
+        action.execute()
+
+    shared.return_value.deploy.assert_called_once()
+    assert shared.return_value.deploy.call_args[1]['sources'] == files
+    assert action.data['deployed_bytes'] == 10
+    assert action.data['deploy_skipped_files'] == ['other']
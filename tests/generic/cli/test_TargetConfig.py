@@ -4,7 +4,8 @@ import pytest
 from pluma.core.dataclasses import SystemContext
 from pluma.cli import TargetConfig, TargetFactory, TargetConfigError, \
     Configuration, Credentials, ConfigurationError
-from pluma import IPPowerPDU, SoftPower
+from pluma import IPPowerPDU, SoftPower, TransferSettings
+from pluma.core.baseclasses import LogRotation, PexpectEngine, SendPacing, SerialEngine
 
 
 def test_TargetConfig_create_context_should_work_with_minimal_config(target_config):
@@ -57,6 +58,44 @@ def test_TargetFactory_create_serial(serial_config):
     assert console.engine.raw_logfile == log_file
 
 
+@pytest.mark.parametrize('background_reader', [True, False])
+def test_TargetFactory_create_serial_should_set_background_reader(serial_config,
+                                                                  background_reader):
+    serial_config['background_reader'] = background_reader
+    console = TargetFactory.create_serial(Configuration(serial_config), SystemContext())
+    assert console.engine.background_reader is background_reader
+
+
+def test_TargetFactory_create_serial_should_set_log_rotation(serial_config):
+    serial_config['log_rotation'] = {'max_size': 1000, 'interval': 3600, 'compress': True,
+                                     'backup_count': 5}
+    console = TargetFactory.create_serial(Configuration(serial_config), SystemContext())
+    assert console.engine.raw_log_rotation == LogRotation(max_bytes=1000, interval=3600,
+                                                          compress=True, backup_count=5)
+
+
+@pytest.mark.parametrize('engine,engine_class', [('pexpect', PexpectEngine),
+                                                 ('serial', SerialEngine)])
+def test_TargetFactory_create_serial_should_set_engine(serial_config, engine, engine_class):
+    serial_config['engine'] = engine
+    log_file = serial_config['log_file']
+    console = TargetFactory.create_serial(Configuration(serial_config), SystemContext())
+    assert type(console.engine) is engine_class
+    assert console.engine.raw_logfile == log_file
+
+
+def test_TargetFactory_create_serial_should_error_on_unknown_engine(serial_config):
+    serial_config['engine'] = 'unknown'
+
+    with pytest.raises(ConfigurationError):
+        TargetFactory.create_serial(Configuration(serial_config), SystemContext())
+
+
+def test_TargetFactory_parse_log_rotation_should_error_if_unconsumed():
+    with pytest.raises(ConfigurationError):
+        TargetFactory.parse_log_rotation(Configuration({'max_size': 1000, 'unused': 'abc'}))
+
+
 def test_TargetFactory_create_serial_should_return_none_with_no_config():
     assert TargetFactory.create_serial(None, None) is None
 
@@ -122,6 +161,15 @@ def test_TargetFactory_create_ssh_should_prefer_ssh_credentials(ssh_config):
     assert console.system.credentials.password == sshpassword
 
 
+@pytest.mark.parametrize('connection_sharing', [False, True])
+def test_TargetFactory_create_ssh_should_set_connection_sharing(ssh_config,
+                                                                connection_sharing):
+    ssh_config['connection_sharing'] = connection_sharing
+
+    console = TargetFactory.create_ssh(Configuration(ssh_config), SystemContext())
+    assert console.connection_sharing is connection_sharing
+
+
 def test_TargetFactory_create_power_control_should_return_none_with_no_console():
     power = TargetFactory.create_power_control(power_config=None, console=None)
     assert power is None
@@ -184,3 +232,44 @@ def test_TargetFactory_SoftPower_parameters_can_be_specified(mock_console):
     assert power.on_cmd == on_cmd
     assert power.off_cmd == off_cmd
     assert power.reboot_delay == reboot_delay
+
+
+def test_TargetFactory_create_serial_should_set_send_pacing(serial_config):
+    serial_config['send_pacing'] = {'chunk_size': 8, 'delay': 0, 'echo': True,
+                                    'echo_timeout': 0.5}
+    console = TargetFactory.create_serial(Configuration(serial_config), SystemContext())
+    assert console.engine.send_pacing == SendPacing(chunk_size=8, delay=0, echo=True,
+                                                    echo_timeout=0.5)
+
+
+def test_TargetFactory_parse_send_pacing_should_error_on_invalid_chunk_size():
+    with pytest.raises(ConfigurationError):
+        TargetFactory.parse_send_pacing(Configuration({'chunk_size': 0}))
+
+
+def test_TargetFactory_create_serial_should_set_file_transfer(serial_config):
+    serial_config['file_transfer'] = {'chunk_size': 512, 'window': 8, 'compression_level': 6}
+    console = TargetFactory.create_serial(Configuration(serial_config), SystemContext())
+    assert console.file_transfer == TransferSettings(chunk_size=512, window=8,
+                                                     compression_level=6)
+
+
+def test_TargetFactory_parse_file_transfer_should_error_on_invalid_window():
+    with pytest.raises(ConfigurationError):
+        TargetFactory.parse_file_transfer(Configuration({'window': 0}))
+
+
+def test_TargetConfig_create_context_should_add_watchers_to_board(target_config):
+    target_config['watchers'] = [{'patterns': ['Kernel panic'], 'name': 'panic',
+                                  'fatal': True}]
+    context = TargetConfig.create_context(Configuration(target_config))
+
+    watcher, = context.board.watchers
+    assert watcher.name == 'panic'
+    assert watcher.fatal
+    assert watcher.matcher.patterns == ('Kernel panic',)
+
+
+def test_TargetFactory_create_watchers_should_error_on_invalid_pattern():
+    with pytest.raises(ConfigurationError):
+        TargetFactory.create_watchers([{'patterns': ['(']}])
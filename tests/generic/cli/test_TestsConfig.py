@@ -3,7 +3,10 @@ import pytest
 from pytest import fixture
 from unittest.mock import MagicMock
 
+from pluma import Board
 from pluma.cli import TestsConfig, Configuration, TestsProvider, TestsConfigError
+from pluma.cli.resultsconfig import ResultsConfig
+from pluma.test import TestRunnerParallel
 
 MINIMAL_CONFIG = {
     'sequence': []
@@ -102,3 +105,46 @@ def test_TestsConfig_tests_from_action_should_return_all_tests():
 def test_TestsConfig_tests_from_action_should_error_if_action_unsupported():
     with pytest.raises(TestsConfigError):
         TestsConfig.tests_from_action('abc', {'some': 'settings'}, {'def': MockTestsProvider})
+
+
+def test_TestsConfig_create_test_controller_should_set_artifacts_next_to_results():
+    config = copy.deepcopy(MINIMAL_CONFIG)
+    config['settings'] = {'artifacts': {'patterns': ['/var/log'], 'compression_level': 9}}
+    tests_config = TestsConfig(Configuration(config), [MockTestsProvider()])
+
+    controller = tests_config.create_test_controller(
+        Board('board'), ResultsConfig(path='some/folder/results.json'))
+
+    artifacts = controller.testrunner.artifacts
+    assert artifacts.patterns == ['/var/log']
+    assert artifacts.folder == 'some/folder'
+    assert artifacts.compression_level == 9
+
+
+def test_TestsConfig_create_test_controller_should_error_on_invalid_artifacts():
+    config = copy.deepcopy(MINIMAL_CONFIG)
+    config['settings'] = {'artifacts': {'patterns': []}}
+    tests_config = TestsConfig(Configuration(config), [MockTestsProvider()])
+
+    with pytest.raises(TestsConfigError):
+        tests_config.create_test_controller(Board('board'))
+
+
+def test_TestsConfig_create_test_controller_should_run_tests_in_parallel():
+    config = copy.deepcopy(MINIMAL_CONFIG)
+    config['settings'] = {'parallel_workers': 3}
+    tests_config = TestsConfig(Configuration(config), [MockTestsProvider()])
+
+    controller = tests_config.create_test_controller(Board('board'))
+
+    assert isinstance(controller.testrunner, TestRunnerParallel)
+    assert controller.testrunner.max_workers == 3
+
+
+def test_TestsConfig_create_test_controller_should_error_on_invalid_parallel_workers():
+    config = copy.deepcopy(MINIMAL_CONFIG)
+    config['settings'] = {'parallel_workers': 0}
+    tests_config = TestsConfig(Configuration(config), [MockTestsProvider()])
+
+    with pytest.raises(TestsConfigError):
+        tests_config.create_test_controller(Board('board'))
@@ -236,3 +236,39 @@ def test_cli_should_create_results_file_with_correct_settings(pluma_cli,
     finally:
         if os.path.isfile(results_file):
             os.remove(results_file)
+
+
+def test_cli_log_should_extract_time_window(pluma_cli, tmp_path):
+    from pluma.core.baseclasses.rawlogindex import RawLogIndexWriter, index_path
+
+    raw_log = tmp_path / 'raw.log'
+    raw_log.write_bytes(b'first second')
+    index = RawLogIndexWriter(index_path(str(raw_log)), interval_bytes=1)
+    index.add(100, 0)
+    index.add(200, 6)
+    index.close()
+    output = tmp_path / 'window.log'
+
+    pluma_cli(['--config', TEST_YAML, '--target', TARGET_YAML, 'log',
+               '--raw-log', str(raw_log), '--start', '200', '--end', '250',
+               '--output', str(output)])
+
+    assert output.read_bytes() == b'second'
+
+
+@pytest.mark.parametrize('arg', ['2021-03-04 05:06:07', '2021-03-04T05:06:07',
+                                 '2021-03-04 05:06:07.000'])
+def test_cli_arg_is_time_should_parse_local_date_and_time(arg):
+    from datetime import datetime
+    from pluma.__main__ import arg_is_time
+
+    assert arg_is_time(arg) == datetime(2021, 3, 4, 5, 6, 7).timestamp()
+
+
+def test_cli_arg_is_time_should_parse_timestamp_and_reject_invalid_time():
+    from argparse import ArgumentTypeError
+    from pluma.__main__ import arg_is_time
+
+    assert arg_is_time('1614834367.5') == 1614834367.5
+    with pytest.raises(ArgumentTypeError):
+        arg_is_time('04/03/2021')
@@ -1,6 +1,7 @@
 from pluma import __main__
 from pluma.core.dataclasses import SystemContext, Credentials
-from pluma.core.baseclasses import ConsoleBase, ConsoleEngine, MatchResult
+from pluma.core.baseclasses import ConsoleBase, ConsoleEngine, MatchResult, PexpectEngine, \
+    SerialEngine
 from pluma import Board, SerialConsole, SoftPower, SSHConsole
 from utils import OsFile
 import os
@@ -42,7 +43,7 @@ class MockConsoleEngine(ConsoleEngine):
     def _read_from_console(self):
         received = self.received
         self.received = ''
-        return received
+        return self.encode(received)
 
     def _close_fd(self):
         self._is_open = False
@@ -56,7 +57,8 @@ class MockConsoleEngine(ConsoleEngine):
     def send_control(self, char: bytes):
         pass
 
-    def wait_for_match(self, match: List[str], timeout: int = None) -> MatchResult:
+    def wait_for_match(self, match: List[str], timeout: int = None,
+                       since: int = None) -> MatchResult:
         return MatchResult(None, None, '')
 
     def interact(self):
@@ -96,8 +98,8 @@ def soft_power():
     )
 
 
-@fixture
-def serial_console_proxy():
+@fixture(params=[PexpectEngine, SerialEngine])
+def serial_console_proxy(request):
     # === Setup ===
     master, slave = pty.openpty()
 
@@ -106,7 +108,8 @@ def serial_console_proxy():
     console = SerialConsole(
         port=slave_device,
         baud=115200,  # Baud Doesn't really matter as virtual tty,
-        encoding='utf-8'
+        encoding='utf-8',
+        engine=request.param(encoding='utf-8')
     )
 
     proxy = OsFile(master, console.engine.encoding)
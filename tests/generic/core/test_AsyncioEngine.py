@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from utils import run_async
+
+from pluma import HostConsole
+from pluma.core.baseclasses import AsyncioEngine, PatternMatcher
+
+
+def test_AsyncioEngine_wait_for_data_async_returns_false_after_timeout(pty_pair):
+    engine = AsyncioEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    start = time.time()
+    assert run_async(engine.wait_for_data_async(timeout=0.2)) is False
+    assert 0.15 < time.time() - start < 0.3
+
+
+def test_AsyncioEngine_wait_for_data_async_returns_when_readable(pty_pair):
+    engine = AsyncioEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    async def wait_and_write():
+        loop = asyncio.get_event_loop()
+        loop.call_later(0.1, pty_pair.secondary.write, 'abc')
+        start = time.time()
+        received = await engine.wait_for_data_async(timeout=2)
+        return received, time.time() - start
+
+    received, elapsed = run_async(wait_and_write())
+    assert received is True
+    assert elapsed < 0.2
+    assert engine.read_all() == 'abc'
+
+
+def test_AsyncioEngine_wait_for_match_async_matches_pattern(pty_pair):
+    engine = AsyncioEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    async def wait_and_write():
+        loop = asyncio.get_event_loop()
+        loop.call_later(0.05, pty_pair.secondary.write, 'abc ')
+        loop.call_later(0.1, pty_pair.secondary.write, 'def ')
+        return await engine.wait_for_match_async(match='de.', timeout=2)
+
+    result = run_async(wait_and_write())
+    assert result.regex_matched == 'de.'
+    assert result.text_matched == 'def'
+    assert result.text_received == 'abc def'
+
+
+def test_AsyncioEngine_wait_for_match_async_returns_no_match_after_timeout(pty_pair):
+    engine = AsyncioEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+    pty_pair.secondary.write('abc')
+
+    result = run_async(engine.wait_for_match_async(match='def', timeout=0.2))
+    assert result.regex_matched is None
+    assert result.text_received == 'abc'
+
+
+def test_AsyncioEngine_drives_many_consoles_in_one_loop():
+    consoles = [HostConsole('cat', engine=AsyncioEngine()) for _ in range(10)]
+    matcher = PatternMatcher([r'reply-\d+'])
+
+    async def send_and_expect_all():
+        return await asyncio.gather(*[
+            console.send_and_expect_async(f'reply-{i}', match=matcher, timeout=2)
+            for i, console in enumerate(consoles)])
+
+    try:
+        start = time.time()
+        results = run_async(send_and_expect_all())
+        elapsed = time.time() - start
+    finally:
+        for console in consoles:
+            console.close()
+
+    assert [matched for _, matched in results] == [f'reply-{i}' for i in range(10)]
+    assert elapsed < 1
@@ -0,0 +1,170 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from pluma import ConsoleFileTransfer, HostConsole
+from pluma.core.baseclasses import ConsoleAgent, ConsoleAgentError, ConsoleBase
+from pluma.core.baseclasses.targetagent import handle_request
+from pluma.test import CommandRunner, TaskFailed
+
+
+@pytest.fixture
+def agent_console(tmp_path):
+    console = HostConsole('sh')
+    console.start_agent(path=str(tmp_path / 'agent.py'), timeout=10)
+    yield console
+    console.close()
+
+
+def test_targetagent_should_report_unknown_method():
+    response = handle_request({'jsonrpc': '2.0', 'id': 3, 'method': 'abc'})
+
+    assert response['id'] == 3
+    assert response['error']['code'] == -32601
+
+
+def test_targetagent_should_report_invalid_params():
+    response = handle_request({'jsonrpc': '2.0', 'id': 1, 'method': 'stat', 'params': {}})
+
+    assert response['error']['code'] == -32602
+
+
+def test_targetagent_batch_should_stop_on_error():
+    response = handle_request({'jsonrpc': '2.0', 'id': 1, 'method': 'batch', 'params': {
+        'stop_on_error': True,
+        'requests': [{'method': 'exec', 'params': {'command': command}}
+                     for command in ['true', 'false', 'true']]}})
+
+    assert [r['result']['retcode'] for r in response['result']] == [0, 1]
+
+
+def test_ConsoleAgent_start_should_error_if_agent_does_not_start():
+    console = HostConsole('sh')
+    try:
+        with pytest.raises(ConsoleAgentError):
+            console.start_agent(python='pluma-no-such-python', timeout=2)
+        assert console.agent is None
+    finally:
+        console.close()
+
+
+def test_ConsoleAgent_exec_should_return_exact_output(agent_console):
+    result = agent_console.agent.exec('printf "a\\nb\\0"; echo err >&2; exit 3')
+
+    assert result.stdout == b'a\nb\0'
+    assert result.stderr == b'err\n'
+    assert result.retcode == 3
+
+
+def test_ConsoleAgent_exec_should_keep_shell_state(agent_console, tmp_path):
+    agent = agent_console.agent
+    for command in [f'cd {tmp_path}', 'export PLUMA_VAR=abc', 'f() { echo "f $1"; }']:
+        assert agent.exec(command, timeout=5).retcode == 0
+
+    assert agent.exec('pwd; echo $PLUMA_VAR; f x', timeout=5).stdout == \
+        f'{tmp_path}\nabc\nf x\n'.encode()
+
+
+def test_ConsoleAgent_exec_should_restart_shell_after_exit_or_timeout(agent_console):
+    agent = agent_console.agent
+    assert agent.exec('exit 4', timeout=5).retcode == 4
+    with pytest.raises(ConsoleAgentError, match='timed out'):
+        agent.exec('sleep 10', timeout=0.5)
+
+    assert agent.exec('echo abc', timeout=5).stdout == b'abc\n'
+
+
+def test_ConsoleAgent_exec_many_should_return_results_in_order(agent_console):
+    results = agent_console.agent.exec_many([f'echo {i}' for i in range(20)], timeout=5)
+
+    assert [result.stdout for result in results] == [f'{i}\n'.encode() for i in range(20)]
+
+
+def test_ConsoleAgent_exec_many_should_stop_on_error(agent_console):
+    results = agent_console.agent.exec_many(['true', 'false', 'echo x'], timeout=5,
+                                            stop_on_error=True)
+
+    assert [result.retcode for result in results] == [0, 1]
+
+
+def test_ConsoleAgent_should_write_read_and_stat_files(agent_console, tmp_path):
+    path = str(tmp_path / 'file')
+    agent = agent_console.agent
+
+    agent.write_file(path, b'\x00\x01abc', mode=0o600)
+
+    assert agent.read_file(path) == b'\x00\x01abc'
+    assert agent.stat(path)['size'] == 5
+    assert agent.stat(path)['mode'] & 0o777 == 0o600
+    assert agent.stat(str(tmp_path / 'missing')) is None
+
+
+def test_ConsoleAgent_check_files_should_return_sizes_and_hashes(agent_console, tmp_path):
+    path = str(tmp_path / 'file')
+    with open(path, 'wb') as f:
+        f.write(b'abc')
+
+    results = agent_console.agent.check_files([path, str(tmp_path / 'missing')], sha256=True)
+
+    assert results[path] == {
+        'size': 3,
+        'sha256': 'ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad'}
+    assert results[str(tmp_path / 'missing')] is None
+
+
+def test_ConsoleAgent_read_file_should_error_on_missing_file(agent_console, tmp_path):
+    with pytest.raises(ConsoleAgentError):
+        agent_console.agent.read_file(str(tmp_path / 'missing'))
+
+
+def test_ConsoleAgent_stop_should_return_to_shell(agent_console):
+    agent_console.stop_agent()
+
+    assert agent_console.agent is None
+    assert CommandRunner.run('test', agent_console, 'echo pluma-shell') == 'pluma-shell'
+
+
+def test_ConsoleBase_shell_users_should_stop_agent(agent_console, tmp_path):
+    ConsoleFileTransfer(agent_console, timeout=5).make_directory(str(tmp_path / 'folder'))
+
+    assert agent_console.agent is None
+    assert (tmp_path / 'folder').is_dir()
+    assert 'pluma-shell' in CommandRunner.run_raw('test', agent_console, 'echo pluma-"shell"',
+                                                  timeout=1)
+
+
+def test_ConsoleAgent_send_request_should_error_if_not_running():
+    with pytest.raises(ConsoleAgentError):
+        ConsoleAgent(MagicMock(ConsoleBase)).send_request('ping')
+
+
+def test_ConsoleAgent_send_request_should_send_json_rpc_line():
+    console = MagicMock(ConsoleBase)
+    console.engine = MagicMock()
+    agent = ConsoleAgent(console)
+    agent.running = True
+
+    request_id = agent.send_request('stat', {'path': '/tmp'})
+
+    sent = json.loads(console.engine.send_line.call_args[0][0])
+    assert sent == {'jsonrpc': '2.0', 'id': request_id, 'method': 'stat',
+                    'params': {'path': '/tmp'}}
+
+
+def test_CommandRunner_run_should_use_running_agent(agent_console):
+    output = CommandRunner.run('test', agent_console, 'echo abc; echo def >&2')
+
+    assert output == 'abc\ndef\n'
+
+
+def test_CommandRunner_run_should_error_on_retcode_with_agent(agent_console):
+    with pytest.raises(TaskFailed):
+        CommandRunner.run('test', agent_console, 'false')
+
+
+def test_CommandRunner_run_batch_should_use_running_agent(agent_console):
+    results = CommandRunner.run_batch('test', agent_console, ['echo a', 'false', 'echo b'],
+                                      timeout=5)
+
+    assert [(result.output, result.retcode) for result in results] == [
+        ('a', 0), ('', 1), ('b', 0)]
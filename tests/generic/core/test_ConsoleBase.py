@@ -3,7 +3,7 @@ import pytest
 import time
 from unittest.mock import MagicMock
 
-from utils import nonblocking
+from utils import nonblocking, run_async
 
 from pluma.core.baseclasses import (ConsoleError, ConsoleInvalidJSONReceivedError,
                                     MatchResult)
@@ -32,14 +32,25 @@ def test_ConsoleBase_send_should_discard_reception_with_read_all(
 
 
 @pytest.mark.parametrize('sleep_time', [0.2, 1])
-def test_ConsoleBase_wait_for_quiet_should_wait_at_least_sleep_time(basic_console,
-                                                                    sleep_time):
+def test_ConsoleBase_wait_for_quiet_should_not_wait_for_sleep_time(basic_console,
+                                                                   sleep_time):
     start = time.time()
     success = basic_console.wait_for_quiet(quiet=0, sleep_time=sleep_time, timeout=2)
     elapsed = time.time() - start
 
     assert success is True
-    assert 0.8*sleep_time < elapsed < 1.2*sleep_time
+    assert elapsed < 0.05
+
+
+@pytest.mark.parametrize('quiet_time', [0.1, 0.3])
+def test_ConsoleBase_wait_for_quiet_should_wait_quiet_time_when_no_data(basic_console,
+                                                                        quiet_time):
+    start = time.time()
+    success = basic_console.wait_for_quiet(quiet=quiet_time, timeout=2)
+    elapsed = time.time() - start
+
+    assert success is True
+    assert quiet_time <= elapsed < quiet_time + 0.05
 
 
 @pytest.mark.parametrize('timeout', [0.2, 1])
@@ -72,6 +83,40 @@ def test_ConsoleBase_wait_for_quiet_should_return_when_quiet(basic_console,
     assert 0.8*total_time < elapsed < 1.2*total_time
 
 
+def test_ConsoleBase_wait_for_quiet_should_detect_quiet_shortly_after_last_data(basic_console):
+    quiet_time = 0.2
+    async_result = nonblocking(basic_console.wait_for_quiet,
+                               quiet=quiet_time, sleep_time=1, timeout=5)
+
+    for _ in range(5):
+        time.sleep(0.05)
+        basic_console.engine.received += 'abc'
+    last_data_time = time.time()
+
+    assert async_result.get() is True
+    assert time.time() - last_data_time < quiet_time + 0.05
+
+
+def test_ConsoleBase_wait_for_bytes_should_return_shortly_after_data_received(basic_console):
+    async_result = nonblocking(basic_console.wait_for_bytes, timeout=2, sleep_time=1)
+
+    time.sleep(0.1)
+    basic_console.engine.received += 'abc'
+    data_time = time.time()
+
+    assert async_result.get() is True
+    assert time.time() - data_time < 0.05
+
+
+def test_ConsoleBase_wait_for_bytes_should_return_false_after_timeout(basic_console):
+    timeout = 0.2
+    start = time.time()
+    success = basic_console.wait_for_bytes(timeout=timeout)
+
+    assert success is False
+    assert 0.8*timeout < time.time() - start < 1.2*timeout
+
+
 def test_ConsoleBase_send_and_read_sends_data(basic_console):
     sent = 'abc'
     basic_console.send_and_read(cmd=sent, send_newline=False, timeout=0.1)
@@ -274,4 +319,80 @@ def test_ConsoleBase_should_call_open_for_send_control(basic_console):
     basic_console.open = MagicMock(side_effect=basic_console.open)
 
     basic_console.send_control('C')
-    basic_console.open.assert_called()
\ No newline at end of file
+    basic_console.open.assert_called()
+
+def test_ConsoleBase_wait_for_quiet_async_should_wait_quiet_time_when_no_data(basic_console):
+    quiet_time = 0.2
+    start = time.time()
+    success = run_async(basic_console.wait_for_quiet_async(quiet=quiet_time, timeout=2))
+    elapsed = time.time() - start
+
+    assert success is True
+    assert quiet_time <= elapsed < quiet_time + 0.1
+
+
+def test_ConsoleBase_wait_for_quiet_async_should_wait_at_most_timeout(basic_console):
+    timeout = 0.2
+    start = time.time()
+    success = run_async(basic_console.wait_for_quiet_async(quiet=timeout*2, timeout=timeout))
+
+    assert success is False
+    assert 0.8*timeout < time.time() - start < 1.5*timeout
+
+
+def test_ConsoleBase_send_and_read_async_sends_data(basic_console):
+    sent = 'abc'
+    run_async(basic_console.send_and_read_async(cmd=sent, send_newline=False, timeout=0.1))
+    assert basic_console.engine.sent == sent
+
+
+def test_ConsoleBase_send_and_expect_async_returns_received_and_matched_text(basic_console):
+    match_result = MatchResult(regex_matched='ab*c',
+                               text_matched='abc',
+                               text_received='abc\ndef')
+    async def wait_for_match_async(*args, **kwargs):
+        return match_result
+
+    basic_console.engine.wait_for_match_async = wait_for_match_async
+
+    received, matched = run_async(
+        basic_console.send_and_expect_async(cmd='', match='anything', timeout=0.2))
+
+    assert received == match_result.text_received
+    assert matched == match_result.text_matched
+
+
+def test_ConsoleBase_send_and_expect_async_raises_on_excepts(basic_console):
+    match_result = MatchResult(regex_matched='error',
+                               text_matched='error',
+                               text_received='error')
+    async def wait_for_match_async(*args, **kwargs):
+        return match_result
+
+    basic_console.engine.wait_for_match_async = wait_for_match_async
+
+    with pytest.raises(ConsoleError):
+        run_async(basic_console.send_and_expect_async(
+            cmd='', match='anything', excepts='error', timeout=0.2))
+
+
+def test_ConsoleBase_wait_for_match_async_returns_matched_text(basic_console):
+    basic_console.open()
+    basic_console.engine.received = 'abc def'
+
+    matched = run_async(basic_console.wait_for_match_async(match=['de.'], timeout=0.5))
+    assert matched == 'def'
+
+
+def test_ConsoleBase_copy_files_to_target_copies_files_one_by_one(basic_console, tmp_path):
+    files = [tmp_path / 'a', tmp_path / 'b']
+    files[0].write_bytes(b'abc')
+    files[1].write_bytes(b'defgh')
+    basic_console.copy_to_target = MagicMock()
+
+    copied = basic_console.copy_files_to_target([str(f) for f in files], '/there', timeout=3)
+
+    assert copied == 8
+    assert basic_console.copy_to_target.call_count == 2
+    basic_console.copy_to_target.assert_called_with(source=str(files[1]),
+                                                    destination='/there', timeout=3)
@@ -0,0 +1,176 @@
+import os
+import stat
+import subprocess
+import pytest
+from unittest.mock import patch
+
+from pluma import ConsoleFileTransfer, HostConsole, TransferSettings
+from pluma.core.consolefiletransfer import TTY_INPUT_BUFFER_SIZE, posix_cksum
+
+
+@pytest.fixture
+def shell_console():
+    console = HostConsole('sh')
+    console.open()
+    yield console
+    console.close()
+
+
+@pytest.fixture
+def host_file(tmp_path):
+    path = tmp_path / 'source.bin'
+    path.write_bytes(os.urandom(5000) + b'\n\r\x00' + b'pluma-end\n' * 100)
+    return path
+
+
+@pytest.mark.parametrize('data', [b'', b'a', b'abc\n', bytes(range(256)) * 12])
+def test_posix_cksum_should_match_cksum_command(data):
+    output = subprocess.run(['cksum'], input=data, stdout=subprocess.PIPE, check=True).stdout
+
+    assert output.split()[:2] == [str(posix_cksum(data)).encode(), str(len(data)).encode()]
+
+
+@pytest.mark.parametrize('compression_level', [None, 6])
+def test_ConsoleFileTransfer_upload_should_copy_file(shell_console, host_file, tmp_path,
+                                                     compression_level):
+    destination = tmp_path / 'destination.bin'
+    transfer = ConsoleFileTransfer(
+        shell_console, TransferSettings(compression_level=compression_level), timeout=20)
+
+    stats = transfer.upload(str(host_file), str(destination))
+
+    assert destination.read_bytes() == host_file.read_bytes()
+    assert stats.size == host_file.stat().st_size
+    assert stats.throughput > 0
+    assert stats.retransmitted_chunks == 0
+    assert not list(tmp_path.glob('*.pluma-*'))
+
+
+@pytest.mark.parametrize('compression_level', [None, 6])
+def test_ConsoleFileTransfer_upload_should_keep_file_mode(shell_console, host_file, tmp_path,
+                                                          compression_level):
+    destination = tmp_path / 'destination.bin'
+    host_file.chmod(0o755)
+    transfer = ConsoleFileTransfer(
+        shell_console, TransferSettings(compression_level=compression_level), timeout=20)
+
+    transfer.upload(str(host_file), str(destination))
+
+    assert stat.S_IMODE(destination.stat().st_mode) == 0o755
+    assert not list(tmp_path.glob('*.pluma-*'))
+
+
+def test_ConsoleFileTransfer_upload_should_copy_to_directory(shell_console, host_file,
+                                                             tmp_path):
+    destination = tmp_path / 'folder'
+    destination.mkdir()
+
+    ConsoleFileTransfer(shell_console, timeout=20).upload(str(host_file), str(destination))
+
+    assert (destination / host_file.name).read_bytes() == host_file.read_bytes()
+
+
+def test_ConsoleFileTransfer_upload_should_copy_empty_file(shell_console, tmp_path):
+    source = tmp_path / 'empty'
+    source.write_bytes(b'')
+
+    ConsoleFileTransfer(shell_console, timeout=20).upload(str(source), str(tmp_path / 'copy'))
+
+    assert (tmp_path / 'copy').read_bytes() == b''
+
+
+def test_ConsoleFileTransfer_upload_should_send_corrupted_chunks_again(shell_console,
+                                                                       host_file, tmp_path):
+    destination = tmp_path / 'destination.bin'
+    send_line = shell_console.engine.send_line
+    corrupted = []
+
+    def corrupt_second_chunk(line):
+        if line.startswith('1 ') and not corrupted:
+            corrupted.append(line)
+            line = line[:-10] + 'AAAAAAAAAA'
+        send_line(line)
+
+    transfer = ConsoleFileTransfer(shell_console, TransferSettings(chunk_size=512), timeout=20)
+    with patch.object(shell_console.engine, 'send_line', side_effect=corrupt_second_chunk):
+        stats = transfer.upload(str(host_file), str(destination))
+
+    assert corrupted
+    assert stats.retransmitted_chunks > 0
+    assert destination.read_bytes() == host_file.read_bytes()
+
+
+def test_ConsoleFileTransfer_upload_should_error_on_invalid_destination(shell_console,
+                                                                        host_file, tmp_path):
+    with pytest.raises(IOError):
+        ConsoleFileTransfer(shell_console, timeout=5).upload(
+            str(host_file), str(tmp_path / 'missing' / 'destination'))
+
+    # The shell is usable again
+    assert shell_console.send_and_expect('echo pluma-"ok"', match='pluma-ok')[1]
+
+
+@pytest.mark.parametrize('compression_level', [None, 6])
+def test_ConsoleFileTransfer_download_should_copy_file(shell_console, host_file, tmp_path,
+                                                       compression_level):
+    destination = tmp_path / 'destination.bin'
+    transfer = ConsoleFileTransfer(
+        shell_console, TransferSettings(compression_level=compression_level), timeout=20)
+
+    stats = transfer.download(str(host_file), str(destination))
+
+    assert destination.read_bytes() == host_file.read_bytes()
+    assert stats.size == host_file.stat().st_size
+
+
+def test_ConsoleFileTransfer_download_should_request_corrupted_chunks_again(
+        shell_console, host_file, tmp_path):
+    destination = tmp_path / 'destination.bin'
+    read_all = shell_console.read_all
+    corrupted = []
+
+    def corrupt_once(*args, **kwargs):
+        received = read_all(*args, **kwargs)
+        if not corrupted and received.count('\n') > 10:
+            corrupted.append(received)
+            lines = received.split('\n')
+            lines[-5] = lines[-5][:-6] + 'AAAA\r'
+            received = '\n'.join(lines)
+        return received
+
+    transfer = ConsoleFileTransfer(shell_console, TransferSettings(chunk_size=256), timeout=20)
+    with patch.object(shell_console, 'read_all', side_effect=corrupt_once):
+        stats = transfer.download(str(host_file), str(destination))
+
+    assert corrupted
+    assert stats.retransmitted_chunks > 0
+    assert destination.read_bytes() == host_file.read_bytes()
+
+
+def test_ConsoleFileTransfer_download_should_error_on_missing_file(shell_console, tmp_path):
+    with pytest.raises(IOError):
+        ConsoleFileTransfer(shell_console, timeout=5).download(
+            str(tmp_path / 'missing'), str(tmp_path / 'destination'))
+
+
+def test_ConsoleFileTransfer_make_directory_should_create_parents(shell_console, tmp_path):
+    ConsoleFileTransfer(shell_console, timeout=5).make_directory(str(tmp_path / 'a' / 'b'))
+
+    assert (tmp_path / 'a' / 'b').is_dir()
+
+
+def test_ConsoleFileTransfer_make_directory_should_error_on_failure(shell_console, host_file):
+    with pytest.raises(IOError):
+        ConsoleFileTransfer(shell_console, timeout=5).make_directory(str(host_file / 'a'))
+
+
+def test_TransferSettings_should_error_on_invalid_values():
+    with pytest.raises(ValueError):
+        TransferSettings(window=0)
+    with pytest.raises(ValueError):
+        TransferSettings(compression_level=10)
+
+
+def test_TransferSettings_defaults_should_fit_in_tty_input_buffer():
+    assert TransferSettings().in_flight_size <= TTY_INPUT_BUFFER_SIZE
+    assert TransferSettings(window=4).in_flight_size > TTY_INPUT_BUFFER_SIZE
@@ -0,0 +1,159 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+
+from pluma import Board, HostConsole
+from pluma.core.baseclasses import ConsoleBase, ConsoleWatcher, ConsoleWatchError, \
+    Literal, PexpectEngine
+
+
+def test_ConsoleWatcher_should_find_successive_matches():
+    watcher = ConsoleWatcher(['error \\d'])
+
+    found = watcher.search(b'error 1, error 2, error')
+
+    assert [match.text for match in found] == [b'error 1', b'error 2']
+
+
+def test_ConsoleWatcher_should_error_without_patterns():
+    with pytest.raises(ValueError):
+        ConsoleWatcher([])
+
+
+def test_ConsoleEngine_should_record_matches_in_received_chunks(basic_console):
+    watcher = ConsoleWatcher([Literal('Kernel panic')])
+    basic_console.add_watcher(watcher)
+    engine = basic_console.engine
+
+    for chunk in [b'boot\nKer', b'nel pan', b'ic - not syncing\nKernel panic']:
+        engine._receive(chunk)
+
+    assert [event.offset for event in watcher.events] == [5, 32]
+    assert watcher.events[0].text == 'Kernel panic'
+
+
+def test_ConsoleEngine_should_only_watch_data_received_once_added(basic_console):
+    engine = basic_console.engine
+    engine._receive(b'Oops: ')
+    watcher = ConsoleWatcher(['Oops'])
+
+    basic_console.add_watcher(watcher)
+    engine._receive(b'none')
+
+    assert not watcher.events
+
+
+def test_ConsoleEngine_should_call_watcher_callback(basic_console):
+    callback = MagicMock()
+    watcher = ConsoleWatcher(['BUG: .*\n'], callback=callback)
+    basic_console.add_watcher(watcher)
+
+    basic_console.engine._receive(b'BUG: soft lockup\n')
+
+    callback.assert_called_once_with(watcher.events[0])
+
+
+def test_ConsoleEngine_should_stop_watching_removed_watcher(basic_console):
+    watcher = ConsoleWatcher(['Oops'])
+    basic_console.add_watcher(watcher)
+    basic_console.remove_watcher(watcher)
+
+    basic_console.engine._receive(b'Oops')
+
+    assert not watcher.events
+    assert basic_console.engine.watchers == []
+
+
+def test_ConsoleEngine_should_raise_fatal_match_once(basic_console):
+    basic_console.add_watcher(ConsoleWatcher(['Kernel panic'], fatal=True))
+    basic_console.engine._receive(b'Kernel panic')
+
+    with pytest.raises(ConsoleWatchError) as error:
+        basic_console.read_all()
+
+    assert error.value.event.text == 'Kernel panic'
+    assert basic_console.read_all() == 'Kernel panic'
+
+
+@pytest.mark.parametrize('background_reader', [False, True])
+def test_ConsoleBase_should_abort_wait_on_fatal_match(background_reader):
+    console = HostConsole('sh', engine=PexpectEngine(background_reader=background_reader))
+    console.add_watcher(ConsoleWatcher([Literal('Kernel panic')], fatal=True))
+    try:
+        console.open()
+        start = time.time()
+        with pytest.raises(ConsoleWatchError):
+            console.send_and_expect('sleep 0.2; echo "Kernel" "panic"; sleep 10', match='done',
+                                    timeout=10)
+        assert time.time() - start < 5
+    finally:
+        console.close()
+
+
+def test_Board_should_add_watchers_to_all_consoles():
+    consoles = {'serial': MagicMock(ConsoleBase), 'ssh': MagicMock(ConsoleBase)}
+    watcher = ConsoleWatcher(['Oops'])
+    board = Board('board', console=consoles)
+
+    board.add_watcher(watcher)
+    new_console = MagicMock(ConsoleBase)
+    board.consoles = {'serial': new_console}
+
+    for console in [*consoles.values(), new_console]:
+        console.add_watcher.assert_called_once_with(watcher)
+    assert board.watchers == [watcher]
+
+
+def test_Board_should_raise_fatal_match_into_all_consoles_once(basic_console_class):
+    serial, ssh = basic_console_class(), basic_console_class()
+    board = Board('board', console={'serial': serial, 'ssh': ssh})
+    board.add_watcher(ConsoleWatcher(['Kernel panic'], fatal=True))
+
+    serial.engine._receive(b'Kernel panic')
+
+    with pytest.raises(ConsoleWatchError) as error:
+        ssh.read_all()
+    assert error.value.event.text == 'Kernel panic'
+    serial.read_all()
+    board.raise_watch_error()
+
+
+def test_Board_should_raise_fatal_match_not_raised_by_consoles(basic_console):
+    board = Board('board', console=basic_console)
+    board.add_watcher(ConsoleWatcher(['Kernel panic'], fatal=True))
+    basic_console.engine._receive(b'Kernel panic')
+
+    with pytest.raises(ConsoleWatchError):
+        board.raise_watch_error()
+    basic_console.read_all()
+    board.raise_watch_error()
+
+
+def test_Board_should_abort_wait_on_fatal_match_on_other_console(basic_console):
+    console = HostConsole('sh', engine=PexpectEngine(background_reader=True))
+    board = Board('board', console={'serial': basic_console, 'ssh': console})
+    board.add_watcher(ConsoleWatcher([Literal('Kernel panic')], fatal=True))
+    panic = threading.Timer(0.2, basic_console.engine._receive, args=[b'Kernel panic'])
+    try:
+        console.open()
+        start = time.time()
+        panic.start()
+        with pytest.raises(ConsoleWatchError):
+            console.send_and_expect('sleep 10', match='done', timeout=10)
+        assert time.time() - start < 5
+    finally:
+        panic.cancel()
+        console.close()
+
+
+def test_Board_should_stop_listening_to_removed_consoles(basic_console_class):
+    serial, ssh = basic_console_class(), basic_console_class()
+    board = Board('board', console={'serial': serial, 'ssh': ssh})
+    board.add_watcher(ConsoleWatcher(['Kernel panic'], fatal=True))
+
+    board.consoles = {'ssh': ssh}
+    serial.engine._receive(b'Kernel panic')
+
+    ssh.read_all()
+    board.raise_watch_error()
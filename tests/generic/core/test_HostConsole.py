@@ -2,6 +2,8 @@ import os
 import pytest
 
 from pluma import HostConsole
+from pluma.core.baseclasses import Literal
+from pluma.core.exceptions import ConsoleExceptionKeywordReceivedError
 
 
 @pytest.mark.xfail(os.getenv('PLUMA_ENV') == 'CI', reason='CI fails to properly spawn a shell')
@@ -14,3 +16,12 @@ def test_hostconsole_bin_sh_send():
                                           )
 
     assert matched
+
+
+def test_hostconsole_send_and_expect_should_raise_on_literal_except():
+    console = HostConsole('/bin/sh')
+
+    with pytest.raises(ConsoleExceptionKeywordReceivedError):
+        console.send_and_expect(cmd='echo "Oops: [1]"', match=r'\$ ',
+                                excepts=[Literal('Kernel panic'), Literal('Oops: [')],
+                                timeout=0.5)
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import patch
+
+from pluma import HostConsolePool
+from pluma.test import CommandRunner
+
+
+@pytest.fixture
+def pool():
+    pool = HostConsolePool(health_check_timeout=1)
+    yield pool
+    pool.close()
+
+
+def test_HostConsolePool_should_reuse_released_console(pool):
+    with pool.session() as console:
+        first = console
+
+    with pool.session() as console:
+        assert console is first
+        assert CommandRunner.run('test', console, 'echo pluma') == 'pluma'
+
+    assert pool.spawned == 1
+
+
+def test_HostConsolePool_should_spawn_console_per_concurrent_user(pool):
+    with pool.session() as first, pool.session() as second:
+        assert first is not second
+
+    assert pool.spawned == 2
+    assert pool.idle_count == 2
+
+
+def test_HostConsolePool_should_respawn_closed_console(pool):
+    with pool.session() as console:
+        first = console
+
+    first.close()
+
+    with pool.session() as console:
+        assert console is not first
+        assert console.is_open
+
+    assert pool.spawned == 2
+
+
+def test_HostConsolePool_should_discard_busy_console(pool):
+    with pool.session() as console:
+        console.send('sleep 10')
+
+    assert pool.idle_count == 0
+    assert not console.is_open
+
+
+def test_HostConsolePool_should_restore_working_directory(pool, tmp_path):
+    with pool.session() as console:
+        CommandRunner.run('test', console, f'cd {tmp_path}')
+
+    with pool.session() as console:
+        assert CommandRunner.run('test', console, 'pwd') == pool.cwd
+
+
+def test_HostConsolePool_should_keep_at_most_max_idle_consoles():
+    pool = HostConsolePool(max_idle=1)
+    try:
+        with pool.session() as first, pool.session() as second:
+            pass
+
+        assert pool.idle_count == 1
+        assert not first.is_open or not second.is_open
+    finally:
+        pool.close()
+
+
+def test_HostConsolePool_shared_should_return_same_pool():
+    with patch('atexit.register'):
+        assert HostConsolePool.shared('sh') is HostConsolePool.shared('sh')
+
+
+def test_HostConsolePool_should_not_leak_shell_state_between_users(pool):
+    with pool.session() as console:
+        CommandRunner.run('test', console, 'export PLUMA_A=1; PLUMA_B=2; f() { true; }')
+        CommandRunner.run('test', console, 'trap "echo trapped" INT; set -u')
+
+    with pool.session() as console:
+        output = CommandRunner.run('test', console, 'echo "${PLUMA_A:-none}${PLUMA_B:-none}"; '
+                                   'type f >/dev/null 2>&1 || echo no-f; trap')
+
+    assert output.splitlines() == ['nonenone', 'no-f']
+
+    assert pool.spawned == 1
+
+
+def test_HostConsolePool_should_reuse_console_after_session_shell_exited(pool):
+    with pool.session() as console:
+        first = console
+        console.send('exit')
+
+    with pool.session() as console:
+        assert console is first
+        assert CommandRunner.run('test', console, 'echo pluma') == 'pluma'
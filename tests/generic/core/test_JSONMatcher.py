@@ -0,0 +1,167 @@
+import json
+import pytest
+from unittest.mock import patch
+
+from pluma import HostConsole
+from pluma.core.baseclasses import JSONMatcher, JSONStreamScanner, extract_json_objects
+
+
+def test_JSONStreamScanner_should_extract_object_from_text():
+    assert extract_json_objects('abc {"a": {"b": [1, 2]}} def') == [{'a': {'b': [1, 2]}}]
+
+
+def test_JSONStreamScanner_should_ignore_braces_in_strings():
+    text = 'x {"a": "}{", "b": "\\"}"} y'
+
+    assert extract_json_objects(text) == [{'a': '}{', 'b': '"}'}]
+
+
+def test_JSONStreamScanner_should_extract_object_fed_byte_per_byte():
+    data = b'prompt$ cmd\r\n{\n  "a": "\\\\",\n  "b": {"c": null}\n}\r\n{"d": 1}'
+    scanner = JSONStreamScanner()
+
+    found = []
+    for index in range(len(data)):
+        found += scanner.feed(data[index:index + 1])
+
+    assert [match.value for match in found] == [{'a': '\\', 'b': {'c': None}}, {'d': 1}]
+    assert data[found[1].start:found[1].end] == b'{"d": 1}'
+
+
+def test_JSONStreamScanner_should_skip_invalid_objects():
+    assert extract_json_objects('${var} {not json} {"a": 1}') == [{'a': 1}]
+
+
+def test_JSONStreamScanner_ndjson_should_skip_unbalanced_lines():
+    text = 'log { unbalanced\n{"a": 1}\n{"b": 2}\n'
+
+    assert extract_json_objects(text, ndjson=True) == [{'a': 1}, {'b': 2}]
+    assert extract_json_objects(text) == []
+
+
+def test_JSONStreamScanner_should_not_keep_scanned_data():
+    scanner = JSONStreamScanner(ndjson=True)
+    for index in range(1000):
+        scanner.feed(f'{{"index": {index}}}\n'.encode())
+
+    assert len(scanner.objects) == 1000
+    assert len(scanner._buffer) <= 1
+
+
+def test_JSONStreamScanner_should_scan_large_object():
+    value = {f'key{i}': ['x' * 100, {'i': i}] for i in range(20000)}
+
+    assert extract_json_objects(f'out: {json.dumps(value, indent=2)}\n$ ') == [value]
+
+
+def test_JSONMatcher_should_match_count_objects():
+    matcher = JSONMatcher(count=2)
+    data = b'abc {"a": 1} def {"b": 2} {"c": 3}'
+
+    found = matcher.search(data)
+
+    assert found.text == b'{"a": 1} def {"b": 2}'
+    assert found.end == data.index(b' {"c"')
+
+
+def test_JSONMatcher_should_search_incrementally():
+    search = JSONMatcher().start_search()
+    data = b'{"a": [1, '
+
+    assert search(data) is None
+    assert search(data + b'2]}', new_data_start=len(data)).text == b'{"a": [1, 2]}'
+
+
+def test_JSONMatcher_should_skip_command_echo():
+    search = JSONMatcher(skip='echo \'{"a": 1}\'').start_search()
+
+    assert search(b'echo \'{"a"') is None
+    assert search(b'echo \'{"a": 1}\'\r\n{"a": 1}').start == 17
+
+
+def test_JSONMatcher_should_keep_scan_state_per_search():
+    matcher = JSONMatcher()
+    first, second = matcher.start_search(), matcher.start_search()
+
+    assert first(b'{"a": ') is None
+    assert second(b'{"b": 2}').text == b'{"b": 2}'
+    assert first(b'{"a": 1}', new_data_start=6).text == b'{"a": 1}'
+    assert matcher.search(b'x {"c": 3}').text == b'{"c": 3}'
+
+
+def test_JSONMatcher_search_should_only_be_given_new_data():
+    search = JSONMatcher(count=2).start_search()
+    data = b'out {"a": [1, 2]} and {"b": 3} $ '
+
+    # As the engine does, pass the new data only, with one byte already searched
+    for end in range(1, len(data)):
+        found = search(data[end - 1:end + 1], new_data_start=1, offset=end - 1)
+        if found:
+            break
+
+    assert found.text == b'{"a": [1, 2]} and {"b": 3}'
+    assert end - 1 + found.end == data.index(b' $')
+
+
+def test_JSONMatcher_search_should_restart_after_data_dropped():
+    search = JSONMatcher().start_search()
+
+    assert search(b'{"a": [1, ', offset=0) is None
+    found = search(b'2]} {"b": 3}', offset=100)
+
+    assert found.text == b'{"b": 3}'
+    assert found.start == 4
+
+
+def test_ConsoleEngine_should_scan_json_data_once(shell_console):
+    value = {'a': list(range(1, 20001))}
+    shell_console.open()
+    searched = []
+    start_search = JSONMatcher.start_search
+
+    def spy_start_search(matcher):
+        search = start_search(matcher)
+
+        def spy(data, new_data_start=0, offset=0):
+            searched.append(len(data) - new_data_start)
+            return search(data, new_data_start=new_data_start, offset=offset)
+        return spy
+
+    with patch.object(JSONMatcher, 'start_search', spy_start_search):
+        assert shell_console.get_json_data('printf \'{"a": [\'; seq -s, 1 20000; echo "]}"',
+                                           timeout=5) == value
+
+    # New data only, with the command echo in the first read
+    assert sum(searched) < 2 * len(json.dumps(value)) + 100
+
+
+def test_JSONMatcher_should_error_on_invalid_count():
+    with pytest.raises(ValueError):
+        JSONMatcher(count=0)
+
+
+@pytest.fixture
+def shell_console():
+    console = HostConsole('sh')
+    yield console
+    console.close()
+
+
+def test_ConsoleBase_get_json_data_should_return_object_from_shell(shell_console):
+    data = shell_console.get_json_data('echo \'{"a": {"b": "c"}}\'', timeout=5)
+
+    assert data == {'a': {'b': 'c'}}
+
+
+def test_ConsoleBase_get_json_data_should_return_ndjson_objects(shell_console):
+    command = 'for i in 1 2 3 4; do echo "{\\"i\\": $i}"; done'
+
+    assert shell_console.get_json_data(command, count=3, ndjson=True, timeout=5) == [
+        {'i': 1}, {'i': 2}, {'i': 3}]
+    assert shell_console.wait_for_json_data(ndjson=True, timeout=5) == {'i': 4}
+
+
+def test_ConsoleBase_get_json_data_should_return_object_received_in_chunks(shell_console):
+    command = 'printf "{\\"a\\": "; sleep 0.2; printf "[1, "; sleep 0.2; echo "2]}"'
+
+    assert shell_console.get_json_data(command, timeout=5) == {'a': [1, 2]}
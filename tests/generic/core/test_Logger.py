@@ -0,0 +1,17 @@
+import os
+
+from pluma.core.baseclasses import Logger, LogLevel
+
+
+def test_Logger_release_should_print_nested_holds_once(capsys):
+    logger = Logger()
+    logger.hold()
+    logger.hold()
+    logger.log('abc', level=LogLevel.IMPORTANT)
+    logger.release()
+
+    assert capsys.readouterr().out == ''
+
+    logger.release()
+
+    assert capsys.readouterr().out == 'abc' + os.linesep * 2
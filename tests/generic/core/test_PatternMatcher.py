@@ -0,0 +1,124 @@
+import pytest
+
+from pluma.core.baseclasses import Literal, PatternMatcher, get_matcher
+
+
+def test_PatternMatcher_search_should_return_match():
+    matcher = PatternMatcher([r'ab\S+yz'])
+
+    found = matcher.search(b'abcd abcdyz abc')
+
+    assert found.pattern == r'ab\S+yz'
+    assert found.text == b'abcdyz'
+    assert (found.start, found.end) == (5, 11)
+
+
+def test_PatternMatcher_search_should_return_none_if_not_matched():
+    assert PatternMatcher(['abc', 'def']).search(b'ab de') is None
+
+
+def test_PatternMatcher_search_should_return_earliest_match():
+    found = PatternMatcher(['def', 'abc']).search(b'xx abc def')
+
+    assert found.pattern == 'abc'
+
+
+def test_PatternMatcher_search_should_prefer_first_pattern_on_same_start():
+    found = PatternMatcher(['abc', 'ab']).search(b'xx abc')
+
+    assert found.pattern == 'abc'
+
+
+def test_PatternMatcher_search_should_match_across_lines():
+    found = PatternMatcher(['abc.*def']).search(b'abc\r\ndef')
+
+    assert found.text == b'abc\r\ndef'
+
+
+@pytest.mark.parametrize('pattern,overlap', [('abc', 3), (r'ab\d{2,5}', 7)])
+def test_PatternMatcher_overlap_should_be_max_match_length(pattern, overlap):
+    assert PatternMatcher([pattern]).overlap == overlap
+
+
+def test_PatternMatcher_search_should_search_all_data_again_for_unbounded_pattern():
+    data = b'ab' + b'x' * 10000 + b'cd'
+
+    found = PatternMatcher(['ab.*cd']).search(data, new_data_start=len(data) - 2)
+
+    assert found.start == 0
+    assert found.end == len(data)
+
+
+def test_PatternMatcher_overlap_should_be_limited_to_search_window():
+    assert PatternMatcher(['ab.*cd'], search_window=100).overlap == 100
+
+
+def test_PatternMatcher_search_should_find_match_spanning_new_data():
+    data = b'x' * 1000 + b'abcd'
+
+    found = PatternMatcher(['abcd']).search(data, new_data_start=1002)
+
+    assert found.start == 1000
+
+
+def test_PatternMatcher_search_should_not_rescan_data_already_searched():
+    data = b'abcd' + b'x' * 1000
+
+    assert PatternMatcher(['abcd']).search(data, new_data_start=1000) is None
+
+
+def test_get_matcher_should_return_cached_matcher():
+    assert get_matcher(['abc', 'def']) is get_matcher(['abc', 'def'])
+    assert get_matcher('abc') is get_matcher(['abc'])
+
+
+def test_get_matcher_should_cache_by_encoding():
+    assert get_matcher('abc', encoding='ascii') is not get_matcher('abc', encoding='utf-8')
+
+
+def test_get_matcher_should_return_matcher_given():
+    matcher = PatternMatcher(['abc'])
+
+    assert get_matcher(matcher) is matcher
+
+
+def test_PatternMatcher_search_should_match_literal():
+    found = PatternMatcher([Literal('a.c')]).search(b'abc a.c')
+
+    assert found.pattern == 'a.c'
+    assert isinstance(found.pattern, Literal)
+    assert found.start == 4
+
+
+def test_PatternMatcher_search_should_return_earliest_of_regex_and_literal():
+    matcher = PatternMatcher([r'login:', Literal('Kernel panic'), Literal('Oops')])
+
+    assert matcher.search(b'Oops: 0000 Kernel panic login:').pattern == 'Oops'
+    assert matcher.search(b'Kernel panic login:').pattern == 'Kernel panic'
+    assert matcher.search(b'buildroot login:').pattern == 'login:'
+
+
+def test_PatternMatcher_search_should_prefer_first_pattern_between_regex_and_literal():
+    assert PatternMatcher([Literal('abc'), 'abc']).search(b'abc').pattern == Literal('abc')
+    assert not isinstance(PatternMatcher(['abc', Literal('abc')]).search(b'abc').pattern,
+                          Literal)
+
+
+def test_PatternMatcher_overlap_should_include_literals():
+    assert PatternMatcher(['abc', Literal('Kernel panic')]).overlap == 12
+
+
+def test_PatternMatcher_search_should_find_literal_spanning_new_data():
+    data = b'x' * 1000 + b'Kernel panic'
+
+    found = PatternMatcher([Literal('Kernel panic')]).search(data, new_data_start=1005)
+
+    assert found.start == 1000
+
+
+def test_get_matcher_should_not_mix_literals_and_regexes():
+    regex_matcher = get_matcher(['a.c'])
+    literal_matcher = get_matcher([Literal('a.c')])
+
+    assert regex_matcher is not literal_matcher
+    assert literal_matcher.search(b'abc') is None
@@ -1,7 +1,11 @@
 import time
 import pytest
+from unittest.mock import patch
 
-from pluma.core.baseclasses import PexpectEngine
+from utils import nonblocking
+
+from pluma.core.baseclasses import Literal, PexpectEngine, PatternMatcher, RawLogWriter, \
+    SendPacing
 
 
 def test_PexpectEngine_open_shell_should_succeed():
@@ -71,6 +75,75 @@ def test_PexpectEngine_read_all_can_preserve_buffer(pty_pair):
     assert received3_actual == ''
 
 
+@pytest.mark.parametrize('read_chunk_size', [1, 7, None])
+def test_PexpectEngine_read_all_reads_large_content_in_chunks(pty_pair, read_chunk_size):
+    received = 'abcdefghij' * 1000
+    engine = PexpectEngine(read_chunk_size=read_chunk_size)
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write(received)
+    received_actual = ''
+    while len(received_actual) < len(received):
+        received_chunk = engine.read_all()
+        assert received_chunk
+        received_actual += received_chunk
+
+    assert received_actual == received
+
+
+@pytest.mark.parametrize('read_chunk_size', [0, -1])
+def test_PexpectEngine_should_error_on_invalid_read_chunk_size(read_chunk_size):
+    with pytest.raises(ValueError):
+        PexpectEngine(read_chunk_size=read_chunk_size)
+
+
+def test_PexpectEngine_read_all_decodes_characters_split_across_reads(pty_pair_raw):
+    engine = PexpectEngine(encoding='utf-8')
+    engine.open(console_fd=pty_pair_raw.main.fd)
+
+    pty_pair_raw.secondary.write('abcé'.encode('utf-8')[:-1])
+    received1_actual = engine.read_all()
+    pty_pair_raw.secondary.write('é'.encode('utf-8')[-1:])
+    received2_actual = engine.read_all()
+
+    assert received1_actual == 'abc'
+    assert received2_actual == 'é'
+
+
+def test_PexpectEngine_read_all_keeps_only_ring_buffer_size(pty_pair):
+    engine = PexpectEngine(ring_buffer_size=4)
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write('abc')
+    engine.read_all(preserve_read_buffer=True)
+    pty_pair.secondary.write('def')
+
+    assert engine.read_all() == 'cdef'
+
+
+def test_PexpectEngine_read_all_does_not_read_more_than_ring_buffer_size(pty_pair):
+    engine = PexpectEngine(ring_buffer_size=4)
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write('abcdef')
+    time.sleep(0.1)
+
+    assert engine.read_all() == 'abcd'
+    assert engine.read_all() == 'ef'
+
+
+def test_PexpectEngine_reception_buffer_size_is_in_bytes(pty_pair_raw):
+    received = 'aé'
+    engine = PexpectEngine(encoding='utf-8')
+    engine.open(console_fd=pty_pair_raw.main.fd)
+
+    pty_pair_raw.secondary.write(received.encode('utf-8'))
+    engine.read_all(preserve_read_buffer=True)
+
+    assert engine.reception_buffer == received
+    assert engine.reception_buffer_size == 3
+
+
 def test_PexpectEngine_wait_for_match_return_match_and_if_matched(pty_pair):
     pattern = r'ab\S+yz'
     pattern_text = 'abcdyz'
@@ -166,3 +239,320 @@ def test_PexpectEngine_error_on_invalid_code(pty_pair_raw):
 
     with pytest.raises(Exception):
         engine.send_control('!')
+
+
+@pytest.mark.parametrize('background_reader', [False, True])
+def test_PexpectEngine_wait_for_data_returns_when_data_received(pty_pair, background_reader):
+    engine = PexpectEngine(background_reader=background_reader)
+    engine.open(console_fd=pty_pair.main.fd)
+
+    async_result = nonblocking(engine.wait_for_data, timeout=2)
+    time.sleep(0.1)
+    pty_pair.secondary.write('abc')
+    data_time = time.time()
+
+    assert async_result.get() is True
+    assert time.time() - data_time < 0.05
+    assert engine.read_all() == 'abc'
+
+
+@pytest.mark.parametrize('background_reader', [False, True])
+def test_PexpectEngine_wait_for_data_returns_false_after_timeout(pty_pair, background_reader):
+    timeout = 0.2
+    engine = PexpectEngine(background_reader=background_reader)
+    engine.open(console_fd=pty_pair.main.fd)
+
+    start_time = time.time()
+    assert engine.wait_for_data(timeout=timeout) is False
+    assert 0.8 * timeout < time.time() - start_time < 1.2*timeout
+
+
+def test_PexpectEngine_background_reader_should_drain_console(pty_pair):
+    received = 'abcdef'
+    engine = PexpectEngine(background_reader=True)
+    engine.open(console_fd=pty_pair.main.fd)
+    assert engine.background_reader_running
+
+    pty_pair.secondary.write(received)
+    time.sleep(0.2)
+
+    assert engine.reception_buffer_size == len(received)
+    assert engine.read_all(preserve_read_buffer=True) == received
+    assert engine.read_all() == received
+    assert engine.read_all() == ''
+
+
+def test_PexpectEngine_background_reader_should_stop_on_close(pty_pair):
+    engine = PexpectEngine(background_reader=True)
+    engine.open(console_fd=pty_pair.main.fd)
+    engine.close()
+
+    assert engine.background_reader_running is False
+
+
+def test_PexpectEngine_background_reader_keeps_only_ring_buffer_size(pty_pair):
+    engine = PexpectEngine(background_reader=True, ring_buffer_size=4)
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write('abcdef')
+    time.sleep(0.2)
+
+    assert engine.read_all() == 'cdef'
+
+
+def test_PexpectEngine_background_reader_wait_for_match(pty_pair):
+    pattern = r'ab\S+yz'
+    received = 'abcd abcdyz efgh'
+
+    engine = PexpectEngine(background_reader=True)
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write(received)
+    match = engine.wait_for_match(match=[pattern], timeout=0.5)
+
+    assert match.regex_matched == pattern
+    assert match.text_matched == 'abcdyz'
+    assert match.text_received == 'abcd abcdyz'
+    assert engine.read_all() == ' efgh'
+
+
+def test_PexpectEngine_background_reader_wait_for_match_should_return_after_timeout(pty_pair):
+    timeout = 0.3
+    engine = PexpectEngine(background_reader=True)
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write('abc')
+    start_time = time.time()
+    match = engine.wait_for_match(match=['not matching'], timeout=timeout)
+
+    assert 0.8 * timeout < time.time() - start_time < 1.2*timeout
+    assert match.regex_matched is None
+    assert match.text_received == 'abc'
+
+
+def test_PexpectEngine_background_reader_keeps_data_read_before_start(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write('abc')
+    engine.read_all(preserve_read_buffer=True)
+    engine.start_background_reader()
+    pty_pair.secondary.write('def')
+    time.sleep(0.2)
+    engine.stop_background_reader()
+
+    assert engine.read_all() == 'abcdef'
+
+
+def test_PexpectEngine_wait_for_match_should_accept_matcher(pty_pair):
+    matcher = PatternMatcher([r'ab\S+yz'])
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write('abcd abcdyz')
+    match = engine.wait_for_match(match=matcher, timeout=0.5)
+
+    assert match.text_matched == 'abcdyz'
+
+
+def test_PexpectEngine_wait_for_match_should_match_across_reads(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    def write_later():
+        time.sleep(0.2)
+        pty_pair.secondary.write('xyz')
+
+    pty_pair.secondary.write('abc')
+    async_result = nonblocking(write_later)
+    match = engine.wait_for_match(match=['abcxyz'], timeout=2)
+    async_result.get()
+
+    assert match.text_matched == 'abcxyz'
+
+
+def test_PexpectEngine_wait_for_match_should_search_only_new_data(pty_pair):
+    matcher = PatternMatcher(['not matching'])
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    def write_later():
+        time.sleep(0.2)
+        pty_pair.secondary.write('x' * 100)
+
+    pty_pair.secondary.write('a' * 1000)
+    async_result = nonblocking(write_later)
+    with patch.object(PatternMatcher, 'search', autospec=True,
+                      side_effect=PatternMatcher.search) as search:
+        engine.wait_for_match(match=matcher, timeout=0.5)
+    async_result.get()
+
+    searches = [(call.args[1], call.kwargs['new_data_start']) for call in search.call_args_list]
+    assert searches[0][1] == 0
+    # Each data received is searched once, with only the overlap searched again
+    assert sum(len(data) - new_data_start for data, new_data_start in searches) == 1100
+    for data, new_data_start in searches[1:]:
+        assert new_data_start <= matcher.overlap + 1
+
+
+def test_PexpectEngine_wait_for_match_should_find_long_unbounded_match_across_reads(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    def write_later():
+        time.sleep(0.2)
+        pty_pair.secondary.write('x' * 2000 + 'end')
+
+    pty_pair.secondary.write('begin' + 'x' * 5000)
+    async_result = nonblocking(write_later)
+    match = engine.wait_for_match(match='begin.*end', timeout=2)
+    async_result.get()
+
+    assert match.text_matched == 'begin' + 'x' * 7000 + 'end'
+
+
+def test_PexpectEngine_wait_for_match_should_decode_once_without_match(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    def write_later():
+        for __ in range(5):
+            time.sleep(0.05)
+            pty_pair.secondary.write('x' * 100)
+
+    async_result = nonblocking(write_later)
+    with patch.object(engine, 'decode', side_effect=engine.decode) as decode:
+        match = engine.wait_for_match(match=['not matching'], timeout=0.5)
+    async_result.get()
+
+    assert match.text_received == 'x' * 500
+    decode.assert_called_once()
+
+
+def test_PexpectEngine_wait_for_match_should_match_literals_and_regexes(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    pty_pair.secondary.write('Starting kernel... Kernel panic - not syncing')
+    match = engine.wait_for_match(match=[r'\w+ login:', Literal('Kernel panic')], timeout=0.5)
+
+    assert match.regex_matched == 'Kernel panic'
+    assert match.text_received == 'Starting kernel... Kernel panic'
+
+
+def test_PexpectEngine_should_write_raw_log_through_writer(tmp_path):
+    path = tmp_path / 'raw.log'
+    engine = PexpectEngine(raw_logfile=str(path))
+    engine.open(console_cmd='cat')
+    assert isinstance(engine.raw_log_writer, RawLogWriter)
+
+    engine.send_line('hello')
+    engine.wait_for_match('hello', timeout=1)
+    engine.close()
+
+    assert engine.raw_log_writer is None
+    assert b'hello' in path.read_bytes()
+
+
+def test_PexpectEngine_wait_for_match_should_match_output_of_process_exiting():
+    engine = PexpectEngine()
+    engine.open(console_cmd='sh -c "sleep 0.2; echo hello"')
+
+    match = engine.wait_for_match('hello', timeout=1)
+
+    assert match.text_matched == 'hello'
+
+
+def test_PexpectEngine_send_should_pace_chunks():
+    engine = PexpectEngine()
+    engine.send_pacing = SendPacing(chunk_size=4, delay=0.05)
+    engine.open(console_cmd='cat')
+
+    start = time.time()
+    engine.send_line('abcdefghijkl')
+
+    assert 0.15 <= time.time() - start < 0.5
+    assert engine.wait_for_match(Literal('abcdefghijkl\r\nabcdefghijkl'), timeout=1).regex_matched
+    assert engine.last_send_throughput > 0
+
+
+def test_PexpectEngine_send_should_wait_for_echo_of_each_chunk():
+    engine = PexpectEngine()
+    engine.send_pacing = SendPacing(chunk_size=3, echo=True, echo_timeout=1)
+    engine.open(console_cmd='cat')
+
+    with patch.object(engine, '_wait_for_echo', wraps=engine._wait_for_echo) as wait_for_echo:
+        start = time.time()
+        engine.send_line('abcabcabc')
+
+    assert time.time() - start < 1
+    assert wait_for_echo.call_count == 4
+    # Echoes are not consumed
+    assert engine.read_all().startswith('abcabcabc')
+
+
+def test_PexpectEngine_send_should_stop_waiting_for_echo_if_none():
+    engine = PexpectEngine()
+    engine.send_pacing = SendPacing(chunk_size=2, echo=True, echo_timeout=0.2)
+    engine.open(console_cmd='sh -c "stty -echo; sleep 5"')
+    # Let the echo be disabled
+    time.sleep(0.2)
+
+    start = time.time()
+    engine.send('abcdefgh')
+
+    assert 0.2 <= time.time() - start < 0.6
+    engine.close()
+
+
+def test_SendPacing_should_error_on_invalid_values():
+    with pytest.raises(ValueError):
+        SendPacing(chunk_size=0)
+    with pytest.raises(ValueError):
+        SendPacing(delay=-1)
+
+
+def test_PexpectEngine_wait_for_match_since_should_match_data_already_read(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+    since = engine.reception_offset
+
+    pty_pair.secondary.write('boot... login: ')
+    assert engine.wait_for_data(timeout=1)
+    engine.read_all()
+    assert not engine.wait_for_match('boot', timeout=0.1).regex_matched
+
+    start = time.time()
+    match = engine.wait_for_match('boot', timeout=5, since=since)
+
+    assert match.text_matched == 'boot'
+    assert time.time() - start < 1
+
+
+def test_PexpectEngine_wait_for_match_since_should_not_match_previous_match_again(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+    since = engine.reception_offset
+
+    pty_pair.secondary.write('boot... login: ')
+    assert engine.wait_for_match('login: ', timeout=1, since=since).regex_matched
+    assert not engine.wait_for_match(['login: ', 'boot'], timeout=0.1,
+                                     since=since).regex_matched
+
+    pty_pair.secondary.write('login: ')
+    assert engine.wait_for_match('login: ', timeout=1, since=since).regex_matched
+
+
+def test_PexpectEngine_offset_at_should_return_offset_received_at_time(pty_pair):
+    engine = PexpectEngine()
+    engine.open(console_fd=pty_pair.main.fd)
+
+    with patch('pluma.core.baseclasses.consoleengine.time.time', side_effect=[100, 200]):
+        engine._receive(b'abc')
+        engine._receive(b'def')
+
+    assert engine.offset_at(50) == 0
+    assert engine.offset_at(100.001) == 0
+    assert engine.offset_at(150) == 3
+    assert engine.offset_at(200) == 3
+    assert engine.offset_at(300) == 6
@@ -0,0 +1,130 @@
+import gzip
+import shutil
+import pytest
+
+from pluma.core.baseclasses import RawLogIndex, RawLogWriter, read_log_window
+from pluma.core.baseclasses.rawlogindex import RawLogIndexWriter, index_path
+
+
+def write_log(path: str, chunks: list):
+    '''Write a log of (timestamp, data) chunks, indexing every chunk'''
+    index = RawLogIndexWriter(index_path(path), interval_bytes=1, interval_time=1)
+    offset = 0
+    with open(path, 'wb') as f:
+        for timestamp, data in chunks:
+            index.add(timestamp, offset)
+            f.write(data)
+            offset += len(data)
+    index.close()
+
+
+CHUNKS = [(100.0, b'first '), (200.0, b'second '), (300.0, b'third '), (400.0, b'fourth')]
+
+
+def test_RawLogIndex_should_read_entries(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    write_log(path, CHUNKS)
+
+    with RawLogIndex(index_path(path)) as index:
+        assert len(index) == 4
+        assert index.entry(1) == (200.0, 6)
+
+
+def test_RawLogIndex_should_error_on_invalid_file(tmp_path):
+    path = tmp_path / 'raw.log.idx'
+    path.write_bytes(b'not an index')
+
+    with pytest.raises(ValueError):
+        RawLogIndex(str(path))
+
+
+def test_RawLogIndexWriter_should_add_entries_by_size_or_time(tmp_path):
+    path = str(tmp_path / 'raw.log.idx')
+    writer = RawLogIndexWriter(path, interval_bytes=10, interval_time=5)
+    for timestamp, offset in [(0, 0), (1, 5), (2, 10), (3, 12), (8, 13)]:
+        writer.add(timestamp, offset)
+    writer.close()
+
+    with RawLogIndex(path) as index:
+        assert [index.entry(i) for i in range(len(index))] == [(0, 0), (2, 10), (8, 13)]
+
+
+def test_RawLogIndexWriter_should_keep_timestamps_increasing(tmp_path):
+    path = str(tmp_path / 'raw.log.idx')
+    writer = RawLogIndexWriter(path, interval_bytes=1)
+    writer.add(100, 0)
+    writer.add(50, 10)
+    writer.close()
+
+    with RawLogIndex(path) as index:
+        assert index.entry(1) == (100, 10)
+
+
+def test_RawLogIndexWriter_should_append_to_index(tmp_path):
+    path = str(tmp_path / 'raw.log.idx')
+    writer = RawLogIndexWriter(path, interval_bytes=1)
+    writer.add(100, 0)
+    writer.close()
+
+    writer = RawLogIndexWriter(path, append=True, interval_bytes=100, interval_time=100)
+    writer.add(150, 10)
+    writer.add(300, 20)
+    writer.close()
+
+    with RawLogIndex(path) as index:
+        assert [index.entry(i) for i in range(len(index))] == [(100, 0), (300, 20)]
+
+
+@pytest.mark.parametrize('start,end,expected', [
+    (None, None, b'first second third fourth'),
+    (200, 300, b'second third '),
+    (250, 350, b'second third '),
+    (50, 150, b'first '),
+    (350, None, b'third fourth'),
+    (None, 50, b''),
+    (500, None, b'fourth'),
+])
+def test_read_log_window_should_return_window(tmp_path, start, end, expected):
+    path = str(tmp_path / 'raw.log')
+    write_log(path, CHUNKS)
+
+    assert read_log_window(path, start=start, end=end) == expected
+
+
+def test_read_log_window_should_read_gzipped_log(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    write_log(path, CHUNKS)
+    with open(path, 'rb') as source, gzip.open(path + '.gz', 'wb') as destination:
+        shutil.copyfileobj(source, destination)
+    shutil.copy(index_path(path), index_path(path + '.gz'))
+
+    assert read_log_window(path + '.gz', start=200, end=300) == b'second third '
+
+
+def test_read_log_window_should_read_empty_log(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    RawLogWriter(path).close()
+
+    assert read_log_window(path, start=0, end=1) == b''
+
+
+def test_RawLogWriter_should_index_written_data(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path)
+    writer.write(b'abc')
+    writer.write(b'def')
+    writer.close()
+
+    with RawLogIndex(index_path(path)) as index:
+        # Written within the time and size intervals, only the first chunk is indexed
+        assert len(index) == 1
+        assert index.entry(0)[1] == 0
+
+    assert read_log_window(path, start=0) == b'abcdef'
+
+
+def test_RawLogWriter_should_not_index_devices():
+    writer = RawLogWriter('/dev/null')
+    writer.close()
+
+    assert not writer.index
@@ -0,0 +1,143 @@
+import gzip
+import time
+import pytest
+
+from pluma.core.baseclasses import RawLogWriter, LogRotation
+
+
+def read(path: str) -> bytes:
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            return f.read()
+
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_RawLogWriter_should_write_data(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path)
+
+    writer.write(b'abc')
+    writer.write(b'def')
+    writer.close()
+
+    assert read(path) == b'abcdef'
+
+
+def test_RawLogWriter_sync_should_write_data_queued(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path)
+
+    writer.write(b'abc')
+    assert writer.sync(timeout=1)
+    assert read(path) == b'abc'
+
+    writer.close()
+
+
+def test_RawLogWriter_should_truncate_by_default(tmp_path):
+    path = tmp_path / 'raw.log'
+    path.write_bytes(b'old')
+
+    RawLogWriter(str(path)).close()
+
+    assert read(str(path)) == b''
+
+
+def test_RawLogWriter_should_append_if_requested(tmp_path):
+    path = tmp_path / 'raw.log'
+    path.write_bytes(b'old')
+
+    writer = RawLogWriter(str(path), append=True)
+    writer.write(b'new')
+    writer.close()
+
+    assert read(str(path)) == b'oldnew'
+
+
+def test_RawLogWriter_write_should_ignore_data_after_close(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path)
+    writer.close()
+
+    assert writer.write(b'abc') == 0
+    assert writer.closed
+
+
+def test_RawLogWriter_should_drop_data_instead_of_blocking(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path, max_queue_size=1)
+    # Keep the writer thread busy
+    writer._file.write = lambda data: time.sleep(0.2)
+
+    start = time.time()
+    for __ in range(10):
+        writer.write(b'abc')
+
+    assert time.time() - start < 0.1
+    assert writer.dropped_bytes > 0
+    writer.close()
+
+
+def test_RawLogWriter_should_rotate_by_size(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path, rotation=LogRotation(max_bytes=10))
+
+    for data in [b'0123456789', b'abcdefghij', b'ABC']:
+        writer.write(data)
+    writer.close()
+
+    segments = writer.segments()
+    assert [read(segment) for segment in segments] == [b'0123456789', b'abcdefghij']
+    assert read(path) == b'ABC'
+
+
+def test_RawLogWriter_should_rotate_by_time(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path, rotation=LogRotation(interval=0.2))
+
+    writer.write(b'abc')
+    writer.sync(timeout=1)
+    time.sleep(0.3)
+    writer.write(b'def')
+    writer.close()
+
+    assert [read(segment) for segment in writer.segments()] == [b'abc']
+    assert read(path) == b'def'
+
+
+def test_RawLogWriter_should_compress_rotated_segments(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path, rotation=LogRotation(max_bytes=3, compress=True))
+
+    writer.write(b'abc')
+    writer.write(b'def')
+    writer.close()
+
+    segment, = writer.segments()
+    assert segment.endswith('.gz')
+    assert read(segment) == b'abc'
+
+
+@pytest.mark.parametrize('backup_count', [0, 2])
+def test_RawLogWriter_should_keep_backup_count_segments(tmp_path, backup_count):
+    path = str(tmp_path / 'raw.log')
+    writer = RawLogWriter(path, rotation=LogRotation(max_bytes=1, backup_count=backup_count))
+
+    for data in [b'a', b'b', b'c', b'd', b'e']:
+        writer.write(data)
+    writer.close()
+
+    assert [read(segment) for segment in writer.segments()] == [b'c', b'd'][2-backup_count:]
+    assert read(path) == b'e'
+
+
+def test_RawLogWriter_segments_should_ignore_other_files(tmp_path):
+    path = str(tmp_path / 'raw.log')
+    (tmp_path / 'raw.log.lock').write_bytes(b'')
+    writer = RawLogWriter(path)
+    writer.close()
+
+    assert writer.segments() == []
+
@@ -1,2 +1,142 @@
+import os
+import pytest
+import tarfile
+from unittest.mock import patch
+
+from pluma import SSHConsole
+from pluma.core.dataclasses import Credentials, SystemContext
+
+
+def open_shared_console(credentials: Credentials) -> SSHConsole:
+    '''Open a console sharing its connection, without connecting to the target'''
+    console = SSHConsole(target='localhost', system=SystemContext(credentials=credentials),
+                         connection_sharing=True)
+    with patch('pluma.core.hostconsole.HostConsole.open'), \
+            patch.object(SSHConsole, 'wait_for_prompt'):
+        console.open()
+
+    return console
+
+
 def test_SSHConsole_does_require_login(minimal_ssh_console):
     assert minimal_ssh_console.requires_login is False
+
+
+def test_SSHConsole_should_not_share_connection_by_default(minimal_ssh_console):
+    assert minimal_ssh_console.control_path is None
+    assert 'ControlPath' not in minimal_ssh_console.command
+    assert 'ControlPath=' not in ' '.join(minimal_ssh_console.ssh_command('ls'))
+
+
+def test_SSHConsole_open_should_start_control_master_when_sharing():
+    console = open_shared_console(Credentials('root'))
+
+    control_path = console.control_path
+    try:
+        assert os.path.isdir(os.path.dirname(control_path))
+        assert f'ControlPath={control_path}' in console.command
+        assert 'ControlMaster=auto' in console.command
+        assert 'ControlPersist=yes' in console.command
+    finally:
+        console.close()
+
+
+def test_SSHConsole_close_should_exit_control_master():
+    console = open_shared_console(Credentials('root'))
+
+    control_path = console.control_path
+    # Pretend the master is running
+    open(control_path, 'w').close()
+
+    with patch('pluma.core.sshconsole.subprocess.run') as run:
+        console.close()
+
+    run.assert_called_once()
+    command = run.call_args[0][0]
+    assert command[:4] == ['ssh', '-o', f'ControlPath={control_path}', '-O']
+    assert 'exit' in command
+    assert console.control_path is None
+    assert not os.path.exists(os.path.dirname(control_path))
+
+
+def test_SSHConsole_scp_should_reuse_shared_connection():
+    console = open_shared_console(Credentials('root', 'pass'))
+
+    try:
+        with patch('pluma.core.sshconsole.subprocess.check_output') as check_output:
+            console.copy_to_target('source', 'destination')
+
+        command = check_output.call_args[0][0]
+        assert command[:3] == ['sshpass', '-p', 'pass']
+        assert 'scp' in command
+        assert f'ControlPath={console.control_path}' in command
+        assert 'ControlMaster=no' in command
+        assert command[-2:] == ['source', 'root@localhost:destination']
+    finally:
+        console.close()
+
+
+def test_SSHConsole_ssh_command_should_reuse_shared_connection():
+    console = open_shared_console(Credentials('root'))
+
+    try:
+        command = console.ssh_command('uname -a')
+        assert command[0] == 'ssh'
+        assert f'ControlPath={console.control_path}' in command
+        assert command[-2:] == ['root@localhost', 'uname -a']
+    finally:
+        console.close()
+
+
+def local_shell_command(remote_command=None):
+    '''Run "remote_command" locally instead of on the target'''
+    return ['sh', '-c', remote_command]
+
+
+@pytest.mark.parametrize('compression_level', [None, 6])
+def test_SSHConsole_copy_files_to_target_should_extract_files(minimal_ssh_console, tmp_path,
+                                                              compression_level):
+    files = [tmp_path / 'abc', tmp_path / 'def.bin']
+    files[0].write_text('abc')
+    files[1].write_bytes(bytes(range(256)) * 64)
+    destination = tmp_path / 'some' / 'where'
+
+    with patch.object(minimal_ssh_console, 'ssh_command', side_effect=local_shell_command):
+        copied = minimal_ssh_console.copy_files_to_target(
+            [str(f) for f in files], str(destination), compression_level=compression_level)
+
+    assert copied == 3 + 256 * 64
+    for f in files:
+        assert (destination / f.name).read_bytes() == f.read_bytes()
+
+
+def test_SSHConsole_copy_files_to_target_should_error_on_failure(minimal_ssh_console, tmp_path):
+    source = tmp_path / 'abc'
+    source.write_text('abc')
+
+    with patch.object(minimal_ssh_console, 'ssh_command',
+                      return_value=['sh', '-c', 'cat > /dev/null; exit 1']):
+        with pytest.raises(Exception, match='Failed to copy'):
+            minimal_ssh_console.copy_files_to_target([str(source)], '/there')
+
+
+def test_SSHConsole_archive_to_host_should_stream_matching_files(minimal_ssh_console, tmp_path):
+    logs = tmp_path / 'logs'
+    logs.mkdir()
+    (logs / 'a.log').write_text('abc')
+    (logs / 'b.txt').write_text('def')
+    archive = tmp_path / 'archive.tar.gz'
+
+    with patch.object(minimal_ssh_console, 'ssh_command', side_effect=local_shell_command):
+        size = minimal_ssh_console.archive_to_host([f'{logs}/*.log', '/missing/*'],
+                                                   str(archive))
+
+    assert size == archive.stat().st_size
+    with tarfile.open(archive) as tar:
+        assert [os.path.basename(name) for name in tar.getnames()] == ['a.log']
+
+
+def test_SSHConsole_archive_to_host_should_error_on_failure(minimal_ssh_console, tmp_path):
+    with patch.object(minimal_ssh_console, 'ssh_command', return_value=['sh', '-c', 'exit 1']):
+        with pytest.raises(Exception, match='Failed to archive'):
+            minimal_ssh_console.archive_to_host(['/var/log'], str(tmp_path / 'archive.tar.gz'))
@@ -2,6 +2,7 @@ import os
 import pytest
 import tempfile
 import time
+from unittest.mock import patch
 from pluma.core.exceptions import ConsoleLoginFailedError
 from pluma.core import SerialConsole
 
@@ -332,3 +333,27 @@ def test_SerialConsole_raw_log_file(pty_pair):
         console.close()
 
         assert tmpfile.read() == received.encode(console.engine.encoding)
+
+
+@pytest.mark.parametrize('destination,directory', [('/opt/app/file', '/opt/app'),
+                                                   ('/opt/app/', '/opt/app/')])
+def test_SerialConsole_copy_to_target_should_create_destination_directory(destination,
+                                                                          directory):
+    console = SerialConsole('/dev/null', 115200)
+    with patch.object(console, 'require_open'), \
+            patch('pluma.core.serialconsole.ConsoleFileTransfer') as transfer:
+        console.copy_to_target('file', destination)
+
+    transfer.return_value.make_directory.assert_called_once_with(directory)
+    transfer.return_value.upload.assert_called_once_with('file', destination)
+
+
+def test_SerialConsole_copy_files_to_target_should_create_destination_directory(tmp_path):
+    source = tmp_path / 'file'
+    source.write_bytes(b'abc')
+    console = SerialConsole('/dev/null', 115200)
+    with patch.object(console, 'require_open'), \
+            patch('pluma.core.serialconsole.ConsoleFileTransfer') as transfer:
+        assert console.copy_files_to_target([str(source)], '/opt/app') == 3
+
+    transfer.return_value.make_directory.assert_called_once_with('/opt/app')
@@ -0,0 +1,133 @@
+import os
+import pty
+import time
+import pytest
+
+from serial import Serial
+
+from pluma.core.baseclasses import SendPacing, SerialEngine
+from pluma.core.exceptions import ConsoleCannotOpenError, ConsoleError
+
+
+@pytest.fixture
+def serial_pair():
+    main, secondary = pty.openpty()
+    serial = Serial(port=os.ttyname(secondary), timeout=0.001)
+
+    yield main, serial
+
+    serial.close()
+    for fd in [main, secondary]:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def read_main(fd: int, size: int, timeout: float = 1) -> bytes:
+    received = b''
+    deadline = time.time() + timeout
+    while len(received) < size and time.time() < deadline:
+        received += os.read(fd, size - len(received))
+    return received
+
+
+def test_SerialEngine_should_open_serial(serial_pair):
+    __, serial = serial_pair
+    engine = SerialEngine(raw_logfile='/dev/null')
+    engine.open_serial(serial)
+
+    assert engine.is_open
+    engine.close()
+    assert not engine.is_open
+    assert not serial.is_open
+
+
+def test_SerialEngine_should_not_open_process():
+    with pytest.raises(ConsoleCannotOpenError):
+        SerialEngine(raw_logfile='/dev/null').open(console_cmd='sh')
+
+
+def test_SerialEngine_interact_should_error():
+    with pytest.raises(ConsoleError):
+        SerialEngine(raw_logfile='/dev/null').interact()
+
+
+def test_SerialEngine_should_error_with_invalid_write_chunk_size():
+    with pytest.raises(ValueError):
+        SerialEngine(write_chunk_size=0)
+
+
+def test_SerialEngine_write_chunk_size_should_set_send_pacing():
+    engine = SerialEngine(write_chunk_size=8, write_delay=0.01)
+
+    assert engine.send_pacing == SendPacing(chunk_size=8, delay=0.01)
+
+
+def test_SerialEngine_read_all_should_read_data_available(serial_pair):
+    main, serial = serial_pair
+    engine = SerialEngine(raw_logfile='/dev/null')
+    engine.open_serial(serial)
+
+    os.write(main, b'abc def')
+    engine.wait_for_data(timeout=1)
+
+    assert engine.read_all() == 'abc def'
+
+
+def test_SerialEngine_should_read_in_chunks(serial_pair):
+    main, serial = serial_pair
+    engine = SerialEngine(raw_logfile='/dev/null', read_chunk_size=3)
+    engine.open_serial(serial)
+
+    os.write(main, b'0123456789')
+    time.sleep(0.1)
+
+    assert engine._read_from_console() == b'0123456789'
+
+
+def test_SerialEngine_wait_for_match_should_match(serial_pair):
+    main, serial = serial_pair
+    engine = SerialEngine(raw_logfile='/dev/null')
+    engine.open_serial(serial)
+
+    os.write(main, b'booting... login: ')
+    match = engine.wait_for_match(r'\w+:', timeout=1)
+
+    assert match.text_matched == 'login:'
+    assert match.text_received == 'booting... login:'
+
+
+def test_SerialEngine_send_should_write_data(serial_pair):
+    main, serial = serial_pair
+    engine = SerialEngine(raw_logfile='/dev/null')
+    engine.open_serial(serial)
+
+    engine.send('abc')
+
+    assert read_main(main, 3) == b'abc'
+
+
+def test_SerialEngine_send_should_pace_chunks(serial_pair):
+    main, serial = serial_pair
+    engine = SerialEngine(raw_logfile='/dev/null', write_chunk_size=2, write_delay=0.1)
+    engine.open_serial(serial)
+
+    start = time.time()
+    engine.send('abcdef')
+
+    assert 0.2 <= time.time() - start < 0.4
+    assert read_main(main, 6) == b'abcdef'
+
+
+def test_SerialEngine_should_log_data_received(serial_pair, tmp_path):
+    main, serial = serial_pair
+    raw_logfile = tmp_path / 'raw.log'
+    engine = SerialEngine(raw_logfile=str(raw_logfile))
+    engine.open_serial(serial)
+
+    os.write(main, b'abc')
+    engine.wait_for_match('abc', timeout=1)
+    engine.close()
+
+    assert raw_logfile.read_bytes() == b'abc'
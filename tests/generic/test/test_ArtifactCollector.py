@@ -0,0 +1,115 @@
+import os
+import shutil
+import tarfile
+import threading
+import pytest
+from unittest.mock import MagicMock, PropertyMock, patch
+
+from pluma import Board, HostConsole
+from pluma.core.baseclasses import ConsoleBase
+from pluma.test import ArtifactCollector
+
+
+def mock_console(file_copy: bool = True, background: bool = False) -> ConsoleBase:
+    console = MagicMock(ConsoleBase)
+    console.support_file_copy = file_copy
+    console.support_background_copy = background
+    console.archive_to_host.return_value = 123
+    return console
+
+
+def test_ArtifactCollector_should_pull_archive_with_current_console(tmp_path):
+    console = mock_console()
+    board = Board('board', console=console)
+    collector = ArtifactCollector(['/var/log'], folder=str(tmp_path), compression_level=3)
+
+    on_collected = MagicMock()
+    path = collector.collect(board, 'MyTest-test_body', on_collected=on_collected)
+
+    on_collected.assert_called_once_with(path)
+    assert path.startswith(str(tmp_path))
+    assert path.endswith('-1-MyTest-test_body.tar.gz')
+    console.archive_to_host.assert_called_once_with(['/var/log'], path, timeout=120,
+                                                    compression_level=3)
+    assert collector.collected == [path]
+
+
+def test_ArtifactCollector_should_pull_in_background_when_supported():
+    serial = mock_console()
+    ssh = mock_console(background=True)
+    pulling = threading.Event()
+    release = threading.Event()
+
+    def archive_to_host(*args, **kwargs):
+        pulling.set()
+        release.wait(5)
+        return 123
+
+    ssh.archive_to_host.side_effect = archive_to_host
+    collector = ArtifactCollector(['/var/log'])
+
+    path = collector.collect(Board('board', console={'serial': serial, 'ssh': ssh}), 'test')
+
+    assert pulling.wait(5)
+    assert collector.collected == []
+    release.set()
+    collector.wait()
+    serial.archive_to_host.assert_not_called()
+    assert collector.collected == [path]
+
+
+def test_ArtifactCollector_should_skip_without_file_copy_support():
+    console = mock_console(file_copy=False)
+
+    assert ArtifactCollector(['/var/log']).collect(Board('board', console=console), 'a') is None
+    console.archive_to_host.assert_not_called()
+
+
+def test_ArtifactCollector_should_not_raise_on_collection_failure():
+    console = mock_console()
+    console.archive_to_host.side_effect = Exception('Failed')
+    collector = ArtifactCollector(['/var/log'])
+
+    on_collected = MagicMock()
+    collector.collect(Board('board', console=console), 'a', on_collected=on_collected)
+
+    assert collector.collected == []
+    on_collected.assert_not_called()
+
+
+def test_ArtifactCollector_should_name_archives_uniquely():
+    console = mock_console()
+    collector = ArtifactCollector(['/var/log'])
+    board = Board('board', console=console)
+
+    assert collector.collect(board, 'My[Test]') != collector.collect(board, 'My[Test]')
+
+
+def test_ArtifactCollector_should_error_on_invalid_settings():
+    with pytest.raises(ValueError):
+        ArtifactCollector([])
+    with pytest.raises(ValueError):
+        ArtifactCollector(['/var/log'], compression_level=0)
+
+
+def test_ConsoleBase_archive_to_host_should_copy_archive_created_on_target(tmp_path):
+    logs = tmp_path / 'logs'
+    logs.mkdir()
+    (logs / 'a.log').write_text('abc')
+    archive = tmp_path / 'archive.tar.gz'
+
+    console = HostConsole('sh')
+    try:
+        with patch.object(HostConsole, 'support_file_copy', new_callable=PropertyMock,
+                          return_value=True), \
+                patch.object(console, 'copy_to_host',
+                             side_effect=lambda source, destination, timeout:
+                             shutil.copy(source, destination)) as copy_to_host:
+            console.archive_to_host([str(logs)], str(archive), timeout=5)
+
+        temporary = copy_to_host.call_args[0][0]
+        assert not os.path.exists(temporary)
+        with tarfile.open(archive) as tar:
+            assert tar.extractfile(f'{str(logs)[1:]}/a.log').read() == b'abc'
+    finally:
+        console.close()
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+
+from pytest import fixture
+from unittest.mock import MagicMock, patch
+
+from pluma.core.baseclasses import ConsoleBase
+from pluma.test import DeployCache
+
+
+@fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'cache' / 'deploy-cache.json')
+
+
+@fixture
+def target_console():
+    console = MagicMock(ConsoleBase)
+    console.target_id = 'ssh://root@target'
+    console.copy_files_to_target.side_effect = \
+        lambda sources, **kwargs: sum(os.path.getsize(source) for source in sources)
+    return console
+
+
+@fixture
+def host_files(tmp_path):
+    files = []
+    for name, content in [('abc', b'abc'), ('def', b'defgh')]:
+        path = tmp_path / name
+        path.write_bytes(content)
+        files.append(str(path))
+
+    return files
+
+
+def sha256sum_output(files, destination='/dest'):
+    '''Return the output of sha256sum on the target, for files deployed unchanged'''
+    lines = []
+    for f in files:
+        with open(f, 'rb') as content:
+            digest = hashlib.sha256(content.read()).hexdigest()
+        lines.append(f'{digest}  {destination}/{os.path.basename(f)}')
+
+    return '\n'.join(lines)
+
+
+def test_DeployCache_file_hash_returns_sha256(cache_path, host_files):
+    cache = DeployCache(cache_path)
+    assert cache.file_hash(host_files[0]) == hashlib.sha256(b'abc').hexdigest()
+
+
+def test_DeployCache_file_hash_updated_when_file_modified(cache_path, host_files):
+    cache = DeployCache(cache_path)
+    cache.file_hash(host_files[0])
+
+    with open(host_files[0], 'wb') as f:
+        f.write(b'abcd')
+
+    assert cache.file_hash(host_files[0]) == hashlib.sha256(b'abcd').hexdigest()
+
+
+def test_DeployCache_target_hashes_parses_sha256sum_output(cache_path, host_files,
+                                                           target_console):
+    cache = DeployCache(cache_path)
+    with patch('pluma.test.deploycache.CommandRunner.run',
+               return_value=sha256sum_output(host_files)) as run:
+        hashes = cache.target_hashes(target_console, ['/dest/abc', '/dest/def'])
+
+    run.assert_called_once()
+    assert 'sha256sum /dest/abc /dest/def' in run.call_args[1]['command']
+    assert hashes == {'/dest/abc': hashlib.sha256(b'abc').hexdigest(),
+                      '/dest/def': hashlib.sha256(b'defgh').hexdigest()}
+
+
+def test_DeployCache_deploy_copies_all_files_first(cache_path, host_files, target_console):
+    cache = DeployCache(cache_path)
+    with patch('pluma.test.deploycache.CommandRunner.run') as run:
+        copied, skipped = cache.deploy(target_console, host_files, '/dest')
+
+    run.assert_not_called()
+    assert copied == 8
+    assert skipped == []
+    target_console.copy_files_to_target.assert_called_once()
+    assert target_console.copy_files_to_target.call_args[1]['sources'] == host_files
+
+
+def test_DeployCache_deploy_skips_unchanged_files(cache_path, host_files, target_console):
+    cache = DeployCache(cache_path)
+    with patch('pluma.test.deploycache.CommandRunner.run'):
+        cache.deploy(target_console, host_files, '/dest')
+
+    target_console.copy_files_to_target.reset_mock()
+    with patch('pluma.test.deploycache.CommandRunner.run',
+               return_value=sha256sum_output(host_files)) as run:
+        copied, skipped = cache.deploy(target_console, host_files, '/dest')
+
+    # A single command checks all files on the target
+    run.assert_called_once()
+    assert copied == 0
+    assert skipped == host_files
+    target_console.copy_files_to_target.assert_not_called()
+
+
+def test_DeployCache_deploy_copies_files_modified_on_host(cache_path, host_files,
+                                                          target_console):
+    cache = DeployCache(cache_path)
+    with patch('pluma.test.deploycache.CommandRunner.run'):
+        cache.deploy(target_console, host_files, '/dest')
+
+    target_sha256sum = sha256sum_output(host_files)
+    with open(host_files[1], 'wb') as f:
+        f.write(b'modified')
+
+    with patch('pluma.test.deploycache.CommandRunner.run', return_value=target_sha256sum):
+        copied, skipped = cache.deploy(target_console, host_files, '/dest')
+
+    assert skipped == host_files[:1]
+    assert target_console.copy_files_to_target.call_args[1]['sources'] == host_files[1:]
+
+
+def test_DeployCache_deploy_copies_files_missing_on_target(cache_path, host_files,
+                                                           target_console):
+    cache = DeployCache(cache_path)
+    with patch('pluma.test.deploycache.CommandRunner.run'):
+        cache.deploy(target_console, host_files, '/dest')
+
+    with patch('pluma.test.deploycache.CommandRunner.run',
+               return_value=sha256sum_output(host_files[:1])):
+        _, skipped = cache.deploy(target_console, host_files, '/dest')
+
+    assert skipped == host_files[:1]
+    assert target_console.copy_files_to_target.call_args[1]['sources'] == host_files[1:]
+
+
+def test_DeployCache_deploy_is_keyed_by_target_and_destination(cache_path, host_files,
+                                                               target_console):
+    cache = DeployCache(cache_path)
+    with patch('pluma.test.deploycache.CommandRunner.run'):
+        cache.deploy(target_console, host_files, '/dest')
+
+    with patch('pluma.test.deploycache.CommandRunner.run') as run:
+        cache.deploy(target_console, host_files, '/other')
+        target_console.target_id = 'ssh://root@other'
+        cache.deploy(target_console, host_files, '/dest')
+
+    run.assert_not_called()
+    assert target_console.copy_files_to_target.call_count == 3
+
+
+def test_DeployCache_persists_across_instances(cache_path, host_files, target_console):
+    with patch('pluma.test.deploycache.CommandRunner.run'):
+        DeployCache(cache_path).deploy(target_console, host_files, '/dest')
+
+    with open(cache_path) as f:
+        assert json.load(f)['targets']['ssh://root@target']['/dest/abc'] == \
+            hashlib.sha256(b'abc').hexdigest()
+
+    target_console.copy_files_to_target.reset_mock()
+    with patch('pluma.test.deploycache.CommandRunner.run',
+               return_value=sha256sum_output(host_files)):
+        _, skipped = DeployCache(cache_path).deploy(target_console, host_files, '/dest')
+
+    assert skipped == host_files
+    target_console.copy_files_to_target.assert_not_called()
+
+
+def test_DeployCache_ignores_invalid_cache_file(cache_path, host_files):
+    os.makedirs(os.path.dirname(cache_path))
+    with open(cache_path, 'w') as f:
+        f.write('not json')
+
+    cache = DeployCache(cache_path)
+    assert cache.file_hash(host_files[0]) == hashlib.sha256(b'abc').hexdigest()
+
+
+def test_DeployCache_shared_returns_same_instance(cache_path):
+    assert DeployCache.shared(cache_path) is DeployCache.shared(cache_path)
@@ -143,3 +143,23 @@ def test_ExecutableTest_test_body_on_target_execute_file(executable_test,
 
         run.assert_called_once()
         assert run.call_args[1]['command'] == executable_test.executable_file
+
+
+def test_ExecutableTest_test_body_deploy_cache_on_target(mock_board):
+    with tempfile.NamedTemporaryFile() as f:
+        executable_test = ExecutableTest(mock_board, executable_file=f.name,
+                                         deploy_cache=True)
+
+        with patch('pluma.test.CommandRunner.run') as run, \
+                patch('pluma.test.executabletest.DeployCache.shared') as shared:
+            executable_test.test_body()
+
+        shared.return_value.deploy.assert_called_once()
+        deploy_kwargs = shared.return_value.deploy.call_args[1]
+        assert deploy_kwargs['sources'] == [f.name]
+        assert deploy_kwargs['destination'] == ExecutableTest.DEPLOY_CACHE_FOLDER
+
+        # Cache folder created, and executed from it, the folder being kept
+        assert [call[1]['command'] for call in run.call_args_list] == [
+            f'mkdir -p {ExecutableTest.DEPLOY_CACHE_FOLDER}',
+            f'{ExecutableTest.DEPLOY_CACHE_FOLDER}/{Path(f.name).name}']
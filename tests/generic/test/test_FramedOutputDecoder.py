@@ -0,0 +1,65 @@
+import base64
+import pytest
+
+from pluma.test import FramedOutputDecoder
+from pluma.test.framedoutput import framed_command
+
+
+def frame(frame_id, stdout=b'', stderr=b'', retcode=0, echo=True):
+    '''Return the console output of a framed command'''
+    text = framed_command('mycommand', frame_id) + '\r\n' if echo else ''
+    text += f'pluma-status-{frame_id}={retcode}\r\n'
+    text += f'pluma-stdout-{frame_id}\r\n'
+    text += ''.join(line + '\r\n' for line in
+                    base64.encodebytes(stdout).decode().splitlines())
+    text += f'pluma-stderr-{frame_id}\r\n'
+    text += ''.join(line + '\r\n' for line in
+                    base64.encodebytes(stderr).decode().splitlines())
+    text += f'pluma-frame-end-{frame_id}\r\n$ '
+    return text
+
+
+def test_FramedOutputDecoder_decodes_frame():
+    decoder = FramedOutputDecoder('abc')
+    decoder.feed(frame('abc', stdout=b'out\n', stderr=b'err\n', retcode=3))
+
+    assert decoder.done
+    assert decoder.stdout == b'out\n'
+    assert decoder.stderr == b'err\n'
+    assert decoder.retcode == 3
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 100])
+def test_FramedOutputDecoder_decodes_frame_received_in_chunks(chunk_size):
+    stdout = bytes(range(256)) * 20
+    text = frame('abc', stdout=stdout, stderr=b'err')
+
+    decoder = FramedOutputDecoder('abc')
+    for start in range(0, len(text), chunk_size):
+        decoder.feed(text[start:start + chunk_size])
+
+    assert decoder.done
+    assert decoder.stdout == stdout
+    assert decoder.stderr == b'err'
+
+
+def test_FramedOutputDecoder_ignores_other_frames():
+    decoder = FramedOutputDecoder('abc')
+    decoder.feed(frame('def', stdout=b'other'))
+    decoder.feed(frame('abc', stdout=b'mine'))
+
+    assert decoder.stdout == b'mine'
+
+
+def test_FramedOutputDecoder_is_not_done_without_end_marker():
+    decoder = FramedOutputDecoder('abc')
+    decoder.feed(frame('abc', stdout=b'out').rsplit('pluma-frame-end', 1)[0])
+
+    assert not decoder.done
+    assert decoder.retcode == 0
+
+
+def test_FramedOutputDecoder_errors_on_truncated_data():
+    decoder = FramedOutputDecoder('abc')
+    with pytest.raises(ValueError):
+        decoder.feed('pluma-status-abc=0\npluma-stdout-abc\nYWJj\nYW\npluma-stderr-abc\n')
@@ -0,0 +1,117 @@
+import pytest
+import shutil
+from unittest.mock import PropertyMock, patch
+
+from pluma import HostConsole
+from pluma.test import ShellTest, TaskFailed
+
+
+@pytest.fixture
+def shell_console():
+    console = HostConsole('sh')
+    yield console
+    console.close()
+
+
+def test_ShellTest_pipelined_should_return_output(mock_board, shell_console):
+    test = ShellTest(mock_board, script=['echo abc', 'echo def'], pipelined=True)
+    output = test.run_commands(console=shell_console)
+
+    assert output == 'abcdef'
+
+
+def test_ShellTest_pipelined_should_fail_on_error(mock_board, shell_console):
+    test = ShellTest(mock_board, script=['echo abc', 'false', 'echo def'], pipelined=True)
+    with pytest.raises(TaskFailed, match='exit code 1'):
+        test.run_commands(console=shell_console)
+
+
+def test_ShellTest_pipelined_should_check_output(mock_board, shell_console):
+    test = ShellTest(mock_board, script=['echo abc', 'echo def'], pipelined=True,
+                     should_not_match_regex=['de.'])
+    with pytest.raises(TaskFailed, match='error pattern'):
+        test.run_commands(console=shell_console)
+
+
+@pytest.fixture
+def scripts_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(ShellTest, 'SCRIPTS_FOLDER', str(tmp_path))
+    return tmp_path
+
+
+def test_ShellTest_upload_should_run_script(mock_board, shell_console, scripts_folder):
+    test = ShellTest(mock_board, script=['cd /', 'pwd', 'echo "a  b"'], upload=True)
+    output = test.run_commands(console=shell_console)
+
+    assert output.splitlines() == ['/', 'a  b']
+    assert len(list(scripts_folder.glob('*.sh'))) == 1
+
+
+def test_ShellTest_upload_should_fail_on_error(mock_board, shell_console, scripts_folder):
+    test = ShellTest(mock_board, script=['echo abc', 'false', 'echo def'], upload=True)
+    with pytest.raises(TaskFailed, match='exit code 1'):
+        test.run_commands(console=shell_console)
+
+
+def test_ShellTest_upload_should_not_upload_cached_script(mock_board, shell_console,
+                                                          scripts_folder):
+    test = ShellTest(mock_board, script=['echo abc'], upload=True)
+    test.run_commands(console=shell_console)
+
+    with patch.object(ShellTest, 'inline_upload_command') as inline_upload_command:
+        assert test.run_commands(console=shell_console) == 'abc'
+
+    inline_upload_command.assert_not_called()
+
+
+def test_ShellTest_upload_should_upload_script_removed_from_target(mock_board, shell_console,
+                                                                  scripts_folder):
+    test = ShellTest(mock_board, script=['echo abc'], upload=True)
+    test.run_commands(console=shell_console)
+
+    for script in scripts_folder.glob('*.sh'):
+        script.unlink()
+
+    assert test.run_commands(console=shell_console) == 'abc'
+
+
+def test_ShellTest_upload_should_copy_large_script(mock_board, shell_console, scripts_folder):
+    script = [f'echo {"x" * 100}' for _ in range(100)]
+    test = ShellTest(mock_board, script=script, upload=True)
+
+    with patch.object(HostConsole, 'support_file_copy', new_callable=PropertyMock,
+                      return_value=True), \
+            patch.object(shell_console, 'copy_to_target',
+                         side_effect=lambda source, destination: shutil.copy(
+                             source, destination)) as copy_to_target:
+        output = test.run_commands(console=shell_console)
+
+    copy_to_target.assert_called_once()
+    assert output.splitlines() == ['x' * 100] * 100
+
+
+def test_ShellTest_upload_should_wait_timeout_for_each_command(mock_board, shell_console,
+                                                              scripts_folder):
+    test = ShellTest(mock_board, script=['sleep 0.6', 'sleep 0.6'], upload=True, timeout=1)
+
+    assert test.run_commands(console=shell_console) == ''
+
+
+def test_ShellTest_upload_should_not_limit_script_to_10s(mock_board, shell_console,
+                                                         scripts_folder):
+    test = ShellTest(mock_board, script=['true'] * 3, upload=True, timeout=5)
+
+    with patch.object(shell_console, 'send_and_expect',
+                      wraps=shell_console.send_and_expect) as send_and_expect:
+        test.run_commands(console=shell_console)
+
+    # Script run, after the upload
+    assert send_and_expect.call_args[1]['timeout'] == 15
+
+
+@pytest.mark.parametrize('run_on_host,resources', [(True, {'host'}), (False, {'console'})])
+def test_ShellTest_resources_should_depend_on_where_script_runs(mock_board, run_on_host,
+                                                                resources):
+    test = ShellTest(mock_board, script=['true'], run_on_host=run_on_host)
+
+    assert test.resources == resources
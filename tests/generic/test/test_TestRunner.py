@@ -1,6 +1,10 @@
+import threading
+import time
 from pluma.test.testrunner import TestRunnerParallel
 from unittest.mock import Mock, patch
-from pluma.test import TestRunner, TestBase
+from pluma import Board
+from pluma.core.baseclasses import ConsoleWatcher, ConsoleWatchError, Logger, LogLevel
+from pluma.test import ArtifactCollector, TestRunner, TestBase
 from utils import PlumaOutputMatcher
 
 
@@ -235,6 +239,22 @@ def test_TestRunner_should_not_run_more_tests_if_failure_and_no_continue_on_fail
     test2.test_body.assert_not_called()
 
 
+def test_TestRunner_should_fail_task_on_fatal_match_not_raised_into_it(basic_console):
+    board = Board('board', console=basic_console)
+    board.add_watcher(ConsoleWatcher(['Kernel panic'], fatal=True))
+
+    class HostTest(TestBase):
+        def test_body(self):
+            # Test not using the board consoles after the match, e.g. on the host
+            basic_console.engine._receive(b'Kernel panic')
+
+    runner = TestRunner(board=board, tests=HostTest(board), continue_on_fail=True)
+    runner.run()
+
+    assert [failed['task'] for failed in runner.test_fails] == ['test_body']
+    assert isinstance(runner.test_fails[0]['exception'], ConsoleWatchError)
+
+
 def test_TestRunner_should_run_more_tests_if_failure_but_continue_on_fail(mock_board):
     class MyTest1(TestBase):
         def test_body(self):
@@ -275,6 +295,42 @@ def test_TestRunner_should_attempt_email_if_tests_failure_and_email_on_fail(mock
         send_exception_email.assert_called_once()
 
 
+def test_TestRunner_should_collect_artifacts_on_failure(mock_board):
+    class MyTest(TestBase):
+        def test_body(self):
+            raise RuntimeError
+
+    test = MyTest(mock_board)
+    artifacts = Mock(ArtifactCollector)
+    artifacts.collect.side_effect = lambda board, name, on_collected: on_collected(
+        'artifacts.tar.gz')
+    runner = TestRunner(
+        board=mock_board,
+        tests=test,
+        artifacts=artifacts
+    )
+
+    runner.run()
+
+    assert artifacts.collect.call_args[0] == (mock_board, f'{test}-test_body')
+    artifacts.wait.assert_called_once()
+    assert runner.test_fails[0]['artifacts'] == 'artifacts.tar.gz'
+
+
+def test_TestRunner_should_not_record_artifacts_not_collected(mock_board):
+    class MyTest(TestBase):
+        def test_body(self):
+            raise RuntimeError
+
+    artifacts = Mock(ArtifactCollector)
+    artifacts.collect.return_value = 'artifacts.tar.gz'
+    runner = TestRunner(board=mock_board, tests=MyTest(mock_board), artifacts=artifacts)
+
+    runner.run()
+
+    assert runner.test_fails[0]['artifacts'] is None
+
+
 def test_TestRunner_should_not_attempt_email_if_tests_failure_and_email_on_fail_false(mock_board):
     class MyTest(TestBase):
         def test_body(self):
@@ -569,3 +625,145 @@ def test_TestRunner_board_should_be_optional():
     )
 
     runner.run()
+
+
+class ResourceTest(TestBase):
+    '''Test recording when it runs, using "resources"'''
+
+    def __init__(self, board, resources, events, duration=0, fail=False, barrier=None):
+        super().__init__(board)
+        self.resources = resources
+        self.events = events
+        self.duration = duration
+        self.fail = fail
+        self.barrier = barrier
+
+    def test_body(self):
+        self.events.append(('start', self))
+        if self.barrier:
+            self.barrier.wait(timeout=5)
+        time.sleep(self.duration)
+        self.events.append(('end', self))
+        if self.fail:
+            raise RuntimeError(f'{self} failed')
+
+
+def test_TestRunnerParallel_should_run_tests_using_different_resources_concurrently(
+        mock_board):
+    events = []
+    barrier = threading.Barrier(3)
+    tests = [ResourceTest(mock_board, {'console:serial'}, events, barrier=barrier),
+             ResourceTest(mock_board, {'console:ssh'}, events, barrier=barrier),
+             ResourceTest(mock_board, {'host'}, events, barrier=barrier)]
+
+    runner = TestRunnerParallel(board=mock_board, tests=tests)
+
+    assert runner.run()
+    assert not barrier.broken
+
+
+def test_TestRunnerParallel_should_run_tests_sharing_resources_in_order(mock_board):
+    events = []
+    tests = [ResourceTest(mock_board, {'host'}, events, duration=0.2),
+             ResourceTest(mock_board, {'host', 'power'}, events),
+             ResourceTest(mock_board, {'power'}, events)]
+
+    runner = TestRunnerParallel(board=mock_board, tests=tests)
+    runner.run()
+
+    tests = runner.tests
+    assert events == [('start', tests[0]), ('end', tests[0]), ('start', tests[1]),
+                      ('end', tests[1]), ('start', tests[2]), ('end', tests[2])]
+
+
+def test_TestRunnerParallel_should_run_tests_without_resources_alone(mock_board):
+    events = []
+    tests = [ResourceTest(mock_board, {'host'}, events, duration=0.2),
+             ResourceTest(mock_board, None, events),
+             ResourceTest(mock_board, {'console'}, events)]
+
+    runner = TestRunnerParallel(board=mock_board, tests=tests)
+    runner.run()
+
+    tests = runner.tests
+    assert [test for __, test in events] == [tests[0], tests[0], tests[1], tests[1],
+                                             tests[2], tests[2]]
+
+
+def test_TestRunnerParallel_should_report_as_sequential_runner(mock_board):
+    def create_tests():
+        return [ResourceTest(mock_board, {'host'}, [], duration=0.1, fail=True),
+                ResourceTest(mock_board, {'console'}, [], fail=True),
+                ResourceTest(mock_board, {'power'}, [])]
+
+    sequential = TestRunner(board=mock_board, tests=create_tests(), continue_on_fail=True)
+    parallel = TestRunnerParallel(board=mock_board, tests=create_tests(),
+                                  continue_on_fail=True)
+
+    assert sequential.run() is parallel.run() is False
+    assert [failed['task'] for failed in parallel.test_fails] == ['test_body', 'test_body']
+    assert [failed['test'] for failed in parallel.test_fails] == parallel.tests[:2]
+    assert [(data['order'], data['tasks']['ran'], list(data['tasks']['failed']))
+            for data in parallel.data.values()] == \
+        [(data['order'], data['tasks']['ran'], list(data['tasks']['failed']))
+         for data in sequential.data.values()]
+
+
+def test_TestRunnerParallel_should_not_start_tests_after_failure(mock_board):
+    events = []
+    tests = [ResourceTest(mock_board, {'host'}, events, fail=True),
+             ResourceTest(mock_board, {'host'}, events)]
+
+    runner = TestRunnerParallel(board=mock_board, tests=tests, continue_on_fail=False)
+
+    assert runner.run() is False
+    assert ('start', runner.tests[1]) not in events
+
+
+def test_TestRunnerParallel_should_not_interleave_test_output(capsys):
+    barrier = threading.Barrier(2)
+
+    class LoggingTest(TestBase):
+        def __init__(self, resources):
+            super().__init__()
+            self.resources = resources
+
+        def test_body(self):
+            Logger().log(f'{self} first', level=LogLevel.IMPORTANT)
+            barrier.wait(timeout=5)
+            Logger().log(f'{self} second', level=LogLevel.IMPORTANT)
+
+    tests = [LoggingTest({'host'}), LoggingTest({'console'})]
+    TestRunnerParallel(tests=tests).run()
+
+    lines = [line for line in capsys.readouterr().out.splitlines()
+             if ' first' in line or ' second' in line]
+    assert len(lines) == 4
+    assert lines[0].split()[-2] == lines[1].split()[-2]
+    assert lines[2].split()[-2] == lines[3].split()[-2]
+
+
+def test_TestRunnerParallel_resources_conflict_should_check_current_console(mock_board):
+    def test(resources):
+        return ResourceTest(mock_board, resources, [])
+
+    assert TestRunnerParallel.resources_conflict(test({'console'}), test({'console:ssh'}))
+    assert TestRunnerParallel.resources_conflict(test({'host'}), test(None))
+    assert not TestRunnerParallel.resources_conflict(test({'console:serial'}),
+                                                     test({'console:ssh'}))
+
+
+def test_TestRunnerParallel_should_run_tests_in_order_if_artifacts_use_console(mock_board):
+    mock_board.console.support_file_copy = True
+    mock_board.console.support_background_copy = False
+    mock_board.consoles = {'serial': mock_board.console}
+    events = []
+    tests = [ResourceTest(mock_board, {'host'}, events, duration=0.2),
+             ResourceTest(mock_board, {'console'}, events)]
+
+    runner = TestRunnerParallel(board=mock_board, tests=tests,
+                                artifacts=ArtifactCollector(['/var/log']))
+    runner.run()
+
+    tests = runner.tests
+    assert [test for __, test in events] == [tests[0], tests[0], tests[1], tests[1]]
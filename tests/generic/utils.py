@@ -1,3 +1,4 @@
+import asyncio
 import os
 from select import select
 from multiprocessing.pool import ThreadPool
@@ -50,6 +51,15 @@ def nonblocking(f, *args, **kwargs):
     return async_result
 
 
+def run_async(coroutine):
+    ''' Run coroutine to completion in a new event loop, and return its result '''
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
 class PlumaOutputMatcher:
     ''' 
     Match a Pluma output object with an expected output, ignoring any
@@ -0,0 +1,52 @@
+import pytest
+
+from pluma.utils import AhoCorasick
+
+
+def test_AhoCorasick_search_should_find_keyword():
+    automaton = AhoCorasick([b'Oops', b'Kernel panic'])
+
+    assert automaton.search(b'[ 1.0] Kernel panic - not syncing') == (7, 19, 1)
+
+
+def test_AhoCorasick_search_should_return_none_if_not_found():
+    assert AhoCorasick([b'Oops', b'segfault']).search(b'Booting Linux') is None
+
+
+def test_AhoCorasick_search_should_return_leftmost_keyword():
+    automaton = AhoCorasick([b'he', b'she', b'hers'])
+
+    assert automaton.search(b'ushers') == (1, 4, 1)
+
+
+def test_AhoCorasick_search_should_prefer_longest_keyword_starting_first():
+    automaton = AhoCorasick([b'bcd', b'abcdef'])
+
+    assert automaton.search(b'xabcdefx') == (1, 7, 1)
+
+
+def test_AhoCorasick_search_should_prefer_first_keyword_on_same_position():
+    automaton = AhoCorasick([b'abc', b'abc'])
+
+    assert automaton.search(b'abc') == (0, 3, 0)
+
+
+def test_AhoCorasick_search_should_find_keywords_through_failure_links():
+    automaton = AhoCorasick([b'abcx', b'bcd'])
+
+    assert automaton.search(b'abcd') == (1, 4, 1)
+
+
+def test_AhoCorasick_search_should_start_at_offset():
+    automaton = AhoCorasick([b'abc'])
+
+    assert automaton.search(b'abc abc', start=1) == (4, 7, 0)
+
+
+def test_AhoCorasick_search_without_keywords_should_return_none():
+    assert AhoCorasick([]).search(b'abc') is None
+
+
+def test_AhoCorasick_should_reject_empty_keyword():
+    with pytest.raises(ValueError):
+        AhoCorasick([b'abc', b''])
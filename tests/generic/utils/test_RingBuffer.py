@@ -0,0 +1,58 @@
+import pytest
+
+from pluma.utils import RingBuffer
+
+
+def test_RingBuffer_read_returns_appended_data():
+    buffer = RingBuffer(capacity=10)
+    buffer.append(b'abc')
+    buffer.append(b'def')
+
+    assert buffer.read() == b'abcdef'
+    assert buffer.start == 0
+    assert buffer.end == 6
+
+
+def test_RingBuffer_keeps_only_last_capacity_bytes():
+    buffer = RingBuffer(capacity=4)
+    buffer.append(b'abc')
+    buffer.append(b'def')
+
+    assert buffer.read() == b'cdef'
+    assert len(buffer) == 4
+    assert buffer.start == 2
+    assert buffer.end == 6
+
+
+def test_RingBuffer_append_larger_than_capacity_keeps_last_bytes():
+    buffer = RingBuffer(capacity=4)
+    buffer.append(b'ab')
+    buffer.append(b'0123456789')
+
+    assert buffer.read() == b'6789'
+    assert buffer.start == 8
+
+
+@pytest.mark.parametrize('start, end, expected', [(None, None, b'56789'), (6, None, b'6789'),
+                                                  (6, 8, b'67'), (0, 7, b'56'),
+                                                  (9, 20, b'9'), (8, 6, b'')])
+def test_RingBuffer_read_with_absolute_offsets_across_wrap(start, end, expected):
+    buffer = RingBuffer(capacity=5)
+    for byte in b'0123456789':
+        buffer.append(bytes([byte]))
+
+    assert buffer.read(start, end) == expected
+
+
+def test_RingBuffer_clear_keeps_offsets():
+    buffer = RingBuffer(capacity=5)
+    buffer.append(b'abc')
+    buffer.clear()
+
+    assert buffer.read() == b''
+    assert buffer.start == buffer.end == 3
+
+
+def test_RingBuffer_should_error_on_invalid_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(capacity=0)